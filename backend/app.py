@@ -1,21 +1,38 @@
 # app.py
+import base64
+import hashlib
+import json
 import logging
 import os
+import threading
+import time as pytime
 import uuid
 from datetime import datetime, time, timedelta
+from itertools import islice
 
+import jwt as pyjwt
 from apscheduler.schedulers.background import BackgroundScheduler
+from audit_log import AuditLog
+from compression import CompressedBody, ResponseCompressor
+from db_engines import READ_BIND, configure_sqlite_engine, read_only
 from dotenv import load_dotenv
+from event_hub import EventHub, default_socket_dir
 from email_service import (event_decline, event_footer, event_header,
                            event_no_decline, send_email)
-from flask import Flask, jsonify, request, session
+from flask import Flask, jsonify, request, session, stream_with_context
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token
 # Add this import at the top of app.py
 from invitation_email import send_invitation_email
-from models import (Band, BandMembership, Invitation, LogEntry, Rehearsal,
-                    Response, User, db)
-from sqlalchemy import text
+from membership_index import MembershipIndex
+from models import (ArchivedRehearsal, AuditRollup, Band, BandMembership,
+                    Invitation, LogEntry, RecurrenceRule, Rehearsal, Response,
+                    User, db)
+from principal_cache import Principal, PrincipalCache
+from serialization import RowEncoder, as_int, formatted
+from sqlalchemy import bindparam, inspect, make_url, text
+from sqlalchemy.orm import aliased
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
 from werkzeug.security import check_password_hash, generate_password_hash
 
 # Configure logging
@@ -34,6 +51,81 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key')  # Change in production
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
 
+# Authenticated-principal cache (see get_user_from_token)
+app.config['PRINCIPAL_CACHE_SIZE'] = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 1024))
+app.config['PRINCIPAL_CACHE_TTL'] = int(os.environ.get('PRINCIPAL_CACHE_TTL', 300))  # Seconds
+app.config['MEMBERSHIP_INDEX_TTL'] = int(os.environ.get('MEMBERSHIP_INDEX_TTL', 60))  # Seconds
+
+# Recurring series are stored as rules and only materialised this far ahead
+app.config['RECURRENCE_HORIZON_DAYS'] = int(os.environ.get('RECURRENCE_HORIZON_DAYS', 84))
+
+# Bulk imports are committed in chunks so they don't hold the write lock throughout
+app.config['BULK_CHUNK_SIZE'] = int(os.environ.get('BULK_CHUNK_SIZE', 200))
+app.config['BULK_MAX_CHUNK_SIZE'] = int(os.environ.get('BULK_MAX_CHUNK_SIZE', 1000))
+app.config['BULK_CHUNK_PAUSE'] = float(os.environ.get('BULK_CHUNK_PAUSE', 0.01))  # Seconds between chunks
+
+# Past rehearsals are moved to the archive tables by a nightly job
+app.config['ARCHIVE_BATCH_SIZE'] = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+app.config['ARCHIVE_MAX_PAGE_SIZE'] = int(os.environ.get('ARCHIVE_MAX_PAGE_SIZE', 100))
+
+# Page sizes for the rehearsal and response listings (?limit=, capped)
+app.config['LIST_PAGE_SIZE'] = int(os.environ.get('LIST_PAGE_SIZE', 500))
+app.config['LIST_MAX_PAGE_SIZE'] = int(os.environ.get('LIST_MAX_PAGE_SIZE', 2000))
+
+# Delta sync: watermarks trail the clock so slow transactions aren't skipped,
+# and tombstones older than the retention window force a full reload
+app.config['SYNC_LAG_SECONDS'] = int(os.environ.get('SYNC_LAG_SECONDS', 5))
+app.config['TOMBSTONE_RETENTION_DAYS'] = int(os.environ.get('TOMBSTONE_RETENTION_DAYS', 30))
+
+# Live updates: per-subscriber queue bound, SSE heartbeat interval, and the
+# private (0700) directory where worker processes meet to share events (empty
+# disables that). Each open event stream occupies a worker thread for as long
+# as the browser stays connected, so serve the app with threaded or gevent
+# workers (e.g. gunicorn --worker-class gthread --threads 32, or -k gevent),
+# not the default sync workers, which one stream would block entirely
+app.config['EVENTS_QUEUE_SIZE'] = int(os.environ.get('EVENTS_QUEUE_SIZE', 100))
+app.config['EVENTS_HEARTBEAT_SECONDS'] = int(os.environ.get('EVENTS_HEARTBEAT_SECONDS', 15))
+app.config['EVENTS_SOCKET_DIR'] = os.environ.get('EVENTS_SOCKET_DIR', default_socket_dir())
+
+# Response compression: bodies below the threshold are sent as is, and
+# compressed bodies of version-tagged responses are cached up to a byte budget
+app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # Bytes
+app.config['COMPRESSION_GZIP_LEVEL'] = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+app.config['COMPRESSION_BROTLI_QUALITY'] = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+app.config['COMPRESSION_CACHE_BYTES'] = int(os.environ.get('COMPRESSION_CACHE_BYTES', 16 * 1024 * 1024))
+
+# Largest number of responses PATCH /api/responses/batch takes at once
+app.config['RESPONSE_BATCH_MAX_SIZE'] = int(os.environ.get('RESPONSE_BATCH_MAX_SIZE', 500))
+
+# Audit log entries are queued and written in batches by a background thread
+app.config['AUDIT_QUEUE_SIZE'] = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+app.config['AUDIT_BATCH_SIZE'] = int(os.environ.get('AUDIT_BATCH_SIZE', 200))
+app.config['AUDIT_FLUSH_SECONDS'] = float(os.environ.get('AUDIT_FLUSH_SECONDS', 1.0))
+app.config['AUDIT_PUT_TIMEOUT'] = float(os.environ.get('AUDIT_PUT_TIMEOUT', 5.0))  # Then written inline
+app.config['AUDIT_RETRY_LIMIT'] = int(os.environ.get('AUDIT_RETRY_LIMIT', 10000))  # Entries of failed batches kept
+
+# Audit log entries older than this are rolled into daily per-band counts
+app.config['AUDIT_RETENTION_DAYS'] = int(os.environ.get('AUDIT_RETENTION_DAYS', 90))
+
+# Sparse attendance storage: only store responses that deviate from the default "Ja"
+app.config['SPARSE_RESPONSES'] = os.environ.get('SPARSE_RESPONSES', 'false').lower() == 'true'
+
+# SQLite connection profile, applied to every new connection. WAL lets
+# readers carry on while a write commits; NORMAL sync is durable across
+# application crashes in WAL mode; sizes are in bytes (mmap) and KiB (cache,
+# negative). Writers start with BEGIN IMMEDIATE so they queue for the write
+# lock rather than fail on upgrading it (see configure_sqlite_engine); an
+# empty SQLITE_BEGIN leaves transactions to the driver as before.
+app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+app.config['SQLITE_BUSY_TIMEOUT'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 30000))  # Milliseconds
+app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+app.config['SQLITE_CACHE_SIZE'] = int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024))
+app.config['SQLITE_BEGIN'] = os.environ.get('SQLITE_BEGIN', 'IMMEDIATE').upper()
+# Views marked @read_only get their own pool of query-only connections
+app.config['SQLITE_READ_ENGINE'] = os.environ.get('SQLITE_READ_ENGINE', 'true').lower() == 'true'
+app.config['SQLITE_READ_POOL_SIZE'] = int(os.environ.get('SQLITE_READ_POOL_SIZE', 20))
+
 # Enhanced SQLite configuration to avoid database locks
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'connect_args': {
@@ -44,32 +136,181 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'pool_size': 10,  # Limit concurrent connections
 }
 
+# A second engine on the same file for read-only views. Not for in-memory
+# databases, where a second engine would open a second, empty database.
+database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+if (database_url.get_backend_name() == 'sqlite' and database_url.database not in (None, '', ':memory:')
+        and app.config['SQLITE_READ_ENGINE']):
+    app.config['SQLALCHEMY_BINDS'] = {
+        READ_BIND: {'url': app.config['SQLALCHEMY_DATABASE_URI'], 'pool_size': app.config['SQLITE_READ_POOL_SIZE']}
+    }
+
 # Initialize extensions
 db.init_app(app)
+
+def sqlite_pragmas():
+    """The per-connection pragmas; foreign keys (and so ON DELETE CASCADE) are only enforced when asked for"""
+    return {
+        'busy_timeout': app.config['SQLITE_BUSY_TIMEOUT'],  # First, so the rest can wait for locks
+        'journal_mode': app.config['SQLITE_JOURNAL_MODE'],
+        'synchronous': app.config['SQLITE_SYNCHRONOUS'],
+        'mmap_size': app.config['SQLITE_MMAP_SIZE'],
+        'cache_size': app.config['SQLITE_CACHE_SIZE'],
+        'foreign_keys': 'ON'
+    }
+
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        configure_sqlite_engine(db.engine, sqlite_pragmas(), begin=app.config['SQLITE_BEGIN'] or None)
+        if READ_BIND in db.engines:
+            # journal_mode is a property of the database file, set by the writer
+            read_pragmas = {name: value for name, value in sqlite_pragmas().items() if name != 'journal_mode'}
+            configure_sqlite_engine(db.engines[READ_BIND], {**read_pragmas, 'query_only': 'ON'})
 jwt = JWTManager(app)
+principal_cache = PrincipalCache(
+    max_size=app.config['PRINCIPAL_CACHE_SIZE'],
+    ttl=app.config['PRINCIPAL_CACHE_TTL']
+)
+membership_index = MembershipIndex(ttl=app.config['MEMBERSHIP_INDEX_TTL'])
+event_hub = EventHub(
+    queue_size=app.config['EVENTS_QUEUE_SIZE'],
+    socket_dir=app.config['EVENTS_SOCKET_DIR'] or None
+)
+response_compressor = ResponseCompressor(
+    min_size=app.config['COMPRESSION_MIN_SIZE'],
+    gzip_level=app.config['COMPRESSION_GZIP_LEVEL'],
+    brotli_quality=app.config['COMPRESSION_BROTLI_QUALITY'],
+    cache_bytes=app.config['COMPRESSION_CACHE_BYTES']
+)
+
+def write_audit_entries(entries):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(LogEntry.__table__.insert(), entries)
+
+audit_log = AuditLog(
+    write_audit_entries,
+    queue_size=app.config['AUDIT_QUEUE_SIZE'],
+    batch_size=app.config['AUDIT_BATCH_SIZE'],
+    flush_interval=app.config['AUDIT_FLUSH_SECONDS'],
+    put_timeout=app.config['AUDIT_PUT_TIMEOUT'],
+    retry_limit=app.config['AUDIT_RETRY_LIMIT']
+)
 # More permissive CORS configuration to allow all routes from localhost:3000
-CORS(app, origins=["http://localhost:3000"], supports_credentials=True)
+CORS(app, origins=["http://localhost:3000"], supports_credentials=True,
+     expose_headers=['ETag', 'X-Next-Cursor'])
+
+# create_all() leaves existing tables alone, so columns added to the models
+# later are added here (SQLite can add a column, not change one)
+def add_missing_columns():
+    """Returns the (table, column) names it added"""
+    added = []
+    with db.engine.begin() as conn:
+        # Inspect on the same connection: writers begin IMMEDIATE, so a second
+        # connection would wait on this one's lock
+        inspector = inspect(conn)
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_sql = CreateColumn(column).compile(dialect=db.engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_sql}"))
+                    logger.info(f"Added column {table.name}.{column.name}")
+                    added.append((table.name, column.name))
+    return added
+
+# SQLite can't alter a constraint in place, so tables created before their
+# foreign keys declared ON DELETE rules (responses removed with their
+# rehearsal, and so on) are recreated from the models with their rows copied
+def rebuild_foreign_keys():
+    """Returns the names of the tables it rebuilt"""
+    if db.engine.dialect.name != 'sqlite':
+        return []
+    rebuilt = []
+    with db.engine.connect() as conn:
+        # Must be switched off outside a transaction, otherwise dropping a
+        # parent table would cascade into its children. The engine opens a
+        # transaction before any statement, so this goes to the driver.
+        conn.connection.dbapi_connection.execute('PRAGMA foreign_keys=OFF')
+        try:
+            # Checked inside the (IMMEDIATE) transaction, so a worker that
+            # waited for another's rebuild finds nothing left to do
+            with conn.begin():
+                for table in db.metadata.sorted_tables:  # Parents before children
+                    existing_columns = {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table.name})')}
+                    declared = {(fk.parent.name, (fk.ondelete or 'NO ACTION').upper())
+                                for fk in table.foreign_keys}
+                    existing = {(row[3], row[6].upper())
+                                for row in conn.exec_driver_sql(f'PRAGMA foreign_key_list({table.name})')}
+                    if not existing_columns or declared == existing:
+                        continue
+                    create_sql = str(CreateTable(table).compile(conn)).replace(
+                        f'CREATE TABLE {table.name} ', f'CREATE TABLE {table.name}_new ', 1
+                    )
+                    columns = ', '.join(c.name for c in table.columns if c.name in existing_columns)
+                    # Create, copy, drop, rename, in that order, so references
+                    # from other tables keep pointing at the original name
+                    conn.exec_driver_sql(create_sql)
+                    conn.exec_driver_sql(f'INSERT INTO {table.name}_new ({columns}) SELECT {columns} FROM {table.name}')
+                    conn.exec_driver_sql(f'DROP TABLE {table.name}')
+                    conn.exec_driver_sql(f'ALTER TABLE {table.name}_new RENAME TO {table.name}')
+                    for index in table.indexes:
+                        conn.execute(CreateIndex(index, if_not_exists=True))
+                    logger.info(f"Rebuilt {table.name} with its foreign key rules")
+                    rebuilt.append(table.name)
+            if rebuilt:
+                violations = conn.exec_driver_sql('PRAGMA foreign_key_check').fetchall()
+                conn.rollback()  # Ends the transaction the check began
+                for table_name, rowid, parent, _ in violations:
+                    logger.warning(f"{table_name} row {rowid} references a missing {parent} row")
+        finally:
+            conn.connection.dbapi_connection.execute('PRAGMA foreign_keys=ON')
+    return rebuilt
+
+# Create tables, bring an existing database up to the models and initialize the admin user
+def initialize_database():
+    db.create_all()
+    # create_all() leaves existing tables alone, including their new columns and indexes
+    added_columns = add_missing_columns()
+    # After the columns are added, so the rebuild copies their values over
+    rebuild_foreign_keys()
+    # IF NOT EXISTS rather than checkfirst, which can't see expression indexes
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+    # Counters added to an existing database start at zero
+    if {('bands', 'member_count'), ('bands', 'upcoming_rehearsal_count')} & set(added_columns):
+        refresh_band_counters()
+        db.session.commit()
+    # Create admin user if it doesn't exist
+    if not User.query.filter_by(username='admin').first():
+        admin = User(
+            username='admin',
+            email='admin@example.com',
+            is_admin=True
+        )
+        admin.set_password('change-me-immediately')  # Change in production
+        db.session.add(admin)
+        db.session.commit()
+        logger.info("Admin user created successfully!")
+
+# Flask 3 always defines app._got_first_request, so readiness has its own flag
+database_ready = threading.Event()
+database_init_lock = threading.Lock()
 
-# Create tables and initialize admin user
 @app.before_request
 def create_tables_if_not_exist():
-    # Only run once
-    if not hasattr(app, '_got_first_request'):
+    # Only run once per process; other workers' runs find the work done
+    if database_ready.is_set():
+        return
+    with database_init_lock:
+        if database_ready.is_set():
+            return
         with app.app_context():
             try:
-                db.create_all()
-                # Create admin user if it doesn't exist
-                if not User.query.filter_by(username='admin').first():
-                    admin = User(
-                        username='admin',
-                        email='admin@example.com',
-                        is_admin=True
-                    )
-                    admin.set_password('change-me-immediately')  # Change in production
-                    db.session.add(admin)
-                    db.session.commit()
-                    logger.info("Admin user created successfully!")
-                app._got_first_request = True
+                initialize_database()
+                database_ready.set()
             except Exception as e:
                 logger.error(f"Error initializing database: {str(e)}")
                 db.session.rollback()
@@ -100,17 +341,21 @@ def send_rehearsal_summary():
             # Create the HTML email content
             html_content = event_header()
             
+            # Only declines are listed, and those are always stored rows, so the
+            # implicit "Ja" responses of sparse mode never need synthesising here
+            declines = Response.query.filter(
+                Response.rehearsal_id.in_([r.id for r in upcoming_rehearsals]),
+                Response.attending == False  # Equivalent to "Nej"
+            ).all()
+            declines_by_rehearsal = {}
+            for response in declines:
+                declines_by_rehearsal.setdefault(response.rehearsal_id, []).append([
+                    response.user.first_name or response.user.username,
+                    response.comment or ""
+                ])
+            
             for rehearsal in upcoming_rehearsals:
-                # Get all responses for this rehearsal
-                responses = Response.query.filter_by(rehearsal_id=rehearsal.id).all()
-                declined_responses = []
-                
-                for response in responses:
-                    if not response.attending:  # Equivalent to "Nej"
-                        declined_responses.append([
-                            response.user.first_name or response.user.username,
-                            response.comment or ""
-                        ])
+                declined_responses = declines_by_rehearsal.get(rehearsal.id, [])
                 
                 # Format the date for display
                 formatted_date = rehearsal.date.strftime("%d %b")
@@ -140,6 +385,200 @@ def send_rehearsal_summary():
         finally:
             session.close()
 
+def materialize_recurring_rehearsals():
+    """
+    Rolls every recurrence rule forward so its occurrences exist as
+    rehearsals up to the configured horizon.
+    """
+    with app.app_context():
+        try:
+            horizon_end = datetime.now().date() + timedelta(days=app.config['RECURRENCE_HORIZON_DAYS'])
+            rules = RecurrenceRule.query.filter(
+                db.or_(RecurrenceRule.materialized_until == None,
+                       RecurrenceRule.materialized_until < horizon_end),
+                db.or_(RecurrenceRule.until_date == None,
+                       RecurrenceRule.materialized_until == None,
+                       RecurrenceRule.materialized_until < RecurrenceRule.until_date)
+            ).all()
+            
+            created = 0
+            created_by_band = {}
+            for rule in rules:
+                new_rehearsals = materialize_recurrence_rule(rule, horizon_end)
+                created += len(new_rehearsals)
+                created_by_band.setdefault(rule.band_id, []).extend(r.id for r in new_rehearsals)
+            
+            db.session.commit()
+            for band_id, rehearsal_ids in created_by_band.items():
+                if rehearsal_ids:
+                    publish_band_event(band_id, 'rehearsals', {'action': 'created', 'ids': rehearsal_ids})
+            if created:
+                logger.info(f"Materialized {created} recurring rehearsals from {len(rules)} rules")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error in materialize_recurring_rehearsals: {str(e)}")
+
+def archive_past_rehearsals():
+    """
+    Moves rehearsals dated before today, and their responses, into the
+    archive tables with a per-rehearsal attendance summary, a batch at a
+    time so the write lock is only held briefly.
+    """
+    with app.app_context():
+        try:
+            today = datetime.now().date()
+            batch_size = app.config['ARCHIVE_BATCH_SIZE']
+            archived = 0
+            
+            while True:
+                rehearsal_ids = [row.id for row in db.session.execute(
+                    text("SELECT id FROM rehearsals WHERE date(date) < :today ORDER BY id LIMIT :limit"),
+                    {'today': today.strftime('%Y-%m-%d'), 'limit': batch_size}
+                )]
+                if not rehearsal_ids:
+                    break
+                
+                params = {'rehearsal_ids': rehearsal_ids}
+                first_archive_id = db.session.execute(
+                    text("SELECT COALESCE(MAX(id), 0) + 1 FROM archived_rehearsals")
+                ).scalar()
+                
+                # Summaries count implicit "Ja" responses of members without a stored row
+                db.session.execute(text("""
+                    INSERT INTO archived_rehearsals (rehearsal_id, band_id, date, start_time, end_time,
+                                                     title, recurring_id, attending_count,
+                                                     declined_count, archived_at)
+                    SELECT re.id, re.band_id, re.date, re.start_time, re.end_time,
+                           re.title, re.recurring_id,
+                           (SELECT COUNT(*) FROM responses r
+                            WHERE r.rehearsal_id = re.id AND r.attending)
+                           + (SELECT COUNT(*) FROM band_memberships bm
+                              WHERE bm.band_id = re.band_id
+                                AND NOT EXISTS (SELECT 1 FROM responses r
+                                                WHERE r.rehearsal_id = re.id AND r.user_id = bm.user_id)),
+                           (SELECT COUNT(*) FROM responses r
+                            WHERE r.rehearsal_id = re.id AND NOT r.attending),
+                           CURRENT_TIMESTAMP
+                    FROM rehearsals re
+                    WHERE re.id IN :rehearsal_ids
+                """).bindparams(bindparam('rehearsal_ids', expanding=True)), params)
+                
+                db.session.execute(text("""
+                    INSERT INTO archived_responses (archived_rehearsal_id, user_id, attending,
+                                                    comment, updated_at)
+                    SELECT ar.id, r.user_id, r.attending, r.comment, r.updated_at
+                    FROM responses r
+                    JOIN archived_rehearsals ar ON ar.rehearsal_id = r.rehearsal_id
+                    WHERE ar.id >= :first_archive_id
+                """), {'first_archive_id': first_archive_id})
+                
+                band_ids = [row.band_id for row in db.session.execute(
+                    text("SELECT DISTINCT band_id FROM rehearsals WHERE id IN :rehearsal_ids").bindparams(
+                        bindparam('rehearsal_ids', expanding=True)
+                    ), params
+                )]
+                bump_band_versions(band_ids)
+                
+                # Archived rehearsals leave the live schedule like deleted ones
+                record_tombstones('rehearsal', """
+                    SELECT band_id, id AS entity_id, id AS rehearsal_id, NULL AS user_id
+                    FROM rehearsals WHERE id IN :rehearsal_ids
+                """, params, expanding=['rehearsal_ids'])
+                
+                # Responses follow through ON DELETE CASCADE
+                db.session.execute(text("DELETE FROM rehearsals WHERE id IN :rehearsal_ids").bindparams(
+                    bindparam('rehearsal_ids', expanding=True)
+                ), params)
+                # The counters still include rehearsals whose day passed since
+                # they were written; recounting is what takes those out
+                refresh_band_counters(band_ids)
+                
+                db.session.commit()
+                archived += len(rehearsal_ids)
+                for band_id in band_ids:
+                    publish_band_event(band_id, 'rehearsals', {'action': 'archived'})
+            
+            if archived:
+                logger.info(f"Archived {archived} past rehearsals")
+            return archived
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error in archive_past_rehearsals: {str(e)}")
+            return 0
+
+def prune_tombstones():
+    """Deletes tombstones past the retention window; older watermarks get a full reload"""
+    with app.app_context():
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=app.config['TOMBSTONE_RETENTION_DAYS'])
+            result = db.session.execute(text("DELETE FROM tombstones WHERE deleted_at < :cutoff"),
+                                        {'cutoff': sql_timestamp(cutoff)})
+            db.session.commit()
+            return result.rowcount
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error in prune_tombstones: {str(e)}")
+            return 0
+
+def rollup_audit_log():
+    """
+    Rolls log entries older than the retention window into daily counts per
+    band, user, action and entity type, and deletes them. Works one day per
+    transaction, oldest first, so the write lock is held briefly.
+    """
+    with app.app_context():
+        rolled = 0
+        try:
+            # Whole days only, so a day is never split across two runs
+            cutoff = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(
+                days=app.config['AUDIT_RETENTION_DAYS']
+            )
+            while True:
+                first = db.session.execute(
+                    text("SELECT MIN(timestamp) FROM log_entries WHERE timestamp < :cutoff"),
+                    {'cutoff': sql_timestamp(cutoff)}
+                ).scalar()
+                if first is None:
+                    break
+                
+                day = datetime.strptime(str(first)[:10], '%Y-%m-%d')
+                params = {
+                    'day': day.strftime('%Y-%m-%d'),
+                    'start': sql_timestamp(day),
+                    'end': sql_timestamp(day + timedelta(days=1))
+                }
+                # Entries written before log_entries had band_id get it from
+                # their rehearsal or response, where those still exist
+                db.session.execute(text("""
+                    INSERT INTO audit_rollups (day, band_id, user_id, action, entity_type, entries)
+                    SELECT :day, band_id, user_id, action, entity_type, COUNT(*)
+                    FROM (
+                        SELECT le.user_id, le.action, le.entity_type,
+                               COALESCE(le.band_id, CASE le.entity_type
+                                   WHEN 'rehearsal' THEN (SELECT re.band_id FROM rehearsals re WHERE re.id = le.entity_id)
+                                   WHEN 'response' THEN (SELECT re.band_id FROM responses r
+                                                         JOIN rehearsals re ON r.rehearsal_id = re.id
+                                                         WHERE r.id = le.entity_id)
+                               END) AS band_id
+                        FROM log_entries le
+                        WHERE le.timestamp >= :start AND le.timestamp < :end
+                    )
+                    GROUP BY band_id, user_id, action, entity_type
+                """), params)
+                result = db.session.execute(
+                    text("DELETE FROM log_entries WHERE timestamp >= :start AND timestamp < :end"), params
+                )
+                db.session.commit()
+                rolled += result.rowcount
+            
+            if rolled:
+                logger.info(f"Rolled up {rolled} audit log entries")
+            return rolled
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error in rollup_audit_log: {str(e)}")
+            return rolled
+
 # Set up scheduler with optimized configuration
 scheduler = BackgroundScheduler(
     daemon=True,
@@ -147,12 +586,20 @@ scheduler = BackgroundScheduler(
     executors={'default': {'type': 'threadpool', 'max_workers': 1}}  # Limit threads 
 )
 scheduler.add_job(send_rehearsal_summary, 'cron', day_of_week='mon', hour=8, minute=0)
+scheduler.add_job(materialize_recurring_rehearsals, 'cron', hour=3, minute=0)
+scheduler.add_job(archive_past_rehearsals, 'cron', hour=2, minute=30)
+scheduler.add_job(prune_tombstones, 'cron', hour=2, minute=45)
+scheduler.add_job(rollup_audit_log, 'cron', hour=2, minute=50)
 scheduler.start()
 
 # Helper function to get current user from token
-def get_user_from_token():
+def get_user_from_token(allow_query_token=False):
     auth_header = request.headers.get('Authorization', '')
     
+    # EventSource can't set headers, so event streams may pass ?token= instead
+    if allow_query_token and not auth_header and request.args.get('token'):
+        auth_header = f"Bearer {request.args.get('token')}"
+    
     if not auth_header or not auth_header.startswith('Bearer '):
         app.logger.error("Missing or invalid Authorization header")
         return None
@@ -163,9 +610,13 @@ def get_user_from_token():
         app.logger.error("Empty or invalid token")
         return None
     
+    # Hot path: a token we have already verified authenticates without SQL
+    principal = principal_cache.get(token)
+    if principal:
+        return principal
+    
     try:
         # Simple extraction from token
-        import jwt as pyjwt
         secret_key = app.config['JWT_SECRET_KEY']
         decoded = pyjwt.decode(token, secret_key, algorithms=["HS256"], options={"verify_signature": True})
         user_id = decoded.get('sub')
@@ -177,12 +628,16 @@ def get_user_from_token():
             except (ValueError, TypeError):
                 pass
             
+            # Read the version stamp before loading so a concurrent update wins
+            version = principal_cache.version(user_id)
+            
             # Get the user from database
             user = User.query.get(user_id)
             if user:
-                # Add super_admin flag to the user object
-                user.is_super_admin = bool(decoded.get('is_super_admin', False))
-                return user
+                # Super admin flag comes from the token claims
+                principal = Principal.from_user(user, is_super_admin=decoded.get('is_super_admin', False))
+                principal_cache.put(token, principal, version, token_exp=decoded.get('exp'))
+                return principal
             else:
                 app.logger.error(f"User not found: {user_id}")
         else:
@@ -195,6 +650,616 @@ def get_user_from_token():
     
     return None
 
+# Helper function to fan out default "Ja" responses for new rehearsals
+def create_default_responses(rehearsal_ids, chunk_size=500):
+    """
+    Creates a default "Ja" response for every member of each rehearsal's band
+    with a single INSERT ... SELECT per chunk, instead of loading every user
+    and building one ORM object per (user, rehearsal) pair.
+    The rehearsals must already be flushed so they have ids.
+    
+    In sparse mode (SPARSE_RESPONSES) nothing is written: readers synthesise
+    the implicit "Ja" rows from band membership instead.
+    """
+    if app.config['SPARSE_RESPONSES']:
+        return 0
+    
+    insert_query = text("""
+        INSERT INTO responses (user_id, rehearsal_id, attending, updated_at)
+        SELECT bm.user_id, re.id, :attending, :updated_at
+        FROM rehearsals re
+        JOIN band_memberships bm ON bm.band_id = re.band_id
+        WHERE re.id IN :rehearsal_ids
+    """).bindparams(bindparam('rehearsal_ids', expanding=True))
+    
+    # Same precision as ORM-written timestamps, which delta sync compares
+    # against as strings; CURRENT_TIMESTAMP has no fractional seconds
+    updated_at = sql_timestamp(datetime.utcnow())
+    created = 0
+    for i in range(0, len(rehearsal_ids), chunk_size):
+        result = db.session.execute(insert_query, {
+            'attending': True,
+            'updated_at': updated_at,
+            'rehearsal_ids': list(rehearsal_ids[i:i + chunk_size])
+        })
+        created += result.rowcount
+    return created
+
+# Helper function to prefetch the dates already taken in a window
+def get_existing_rehearsal_dates(band_id, start_date, end_date):
+    """
+    Returns the set of 'YYYY-MM-DD' strings between start_date and end_date
+    (inclusive) on which the band already has a rehearsal, using one range
+    query so callers can check candidate dates in memory.
+    """
+    rehearsal_date = db.func.date(Rehearsal.date)
+    rows = db.session.query(rehearsal_date).filter(
+        Rehearsal.band_id == band_id,
+        rehearsal_date >= start_date,
+        rehearsal_date <= end_date
+    ).all()
+    
+    existing_dates = set()
+    for (value,) in rows:
+        existing_dates.add(value if isinstance(value, str) else value.strftime('%Y-%m-%d'))
+    return existing_dates
+
+# Helper function to turn part of a recurrence rule into rehearsals
+def materialize_recurrence_rule(rule, horizon_end):
+    """
+    Creates rehearsals (and their default responses) for the rule's
+    occurrences after rule.materialized_until up to horizon_end, skipping
+    dates the band already has a rehearsal on. Returns the new rehearsals.
+    """
+    db.session.flush()
+    
+    previous = rule.materialized_until
+    start = previous + timedelta(days=1) if previous else rule.start_date
+    end = min(horizon_end, rule.until_date) if rule.until_date else horizon_end
+    if start > end:
+        return []
+    
+    # Claim the window first so concurrent workers never materialise it twice
+    claimed = RecurrenceRule.query.filter_by(id=rule.id, materialized_until=previous).update(
+        {'materialized_until': end}
+    )
+    if not claimed:
+        return []
+    
+    existing_dates = get_existing_rehearsal_dates(rule.band_id, start, end)
+    new_rehearsals = []
+    for occurrence in rule.occurrences(start, end):
+        if occurrence.strftime('%Y-%m-%d') in existing_dates:
+            continue
+        new_rehearsal = Rehearsal(
+            date=datetime.combine(occurrence, time.min),
+            start_time=rule.start_time,
+            end_time=rule.end_time,
+            title=rule.title,
+            recurring_id=rule.recurring_id,
+            band_id=rule.band_id
+        )
+        db.session.add(new_rehearsal)
+        new_rehearsals.append(new_rehearsal)
+    
+    db.session.flush()
+    create_default_responses([r.id for r in new_rehearsals])
+    if new_rehearsals:
+        bump_band_versions([rule.band_id])
+        adjust_upcoming_rehearsal_count(rule.band_id, sum(is_upcoming(r.date) for r in new_rehearsals))
+    return new_rehearsals
+
+# Helper function to update every occurrence of a series in one statement
+def update_rehearsal_series(recurring_id, band_id, days_diff=0, start_time=None, end_time=None, title=None):
+    """
+    Shifts the dates of a recurring series by days_diff and sets its times
+    and title with a single UPDATE scoped by recurring_id and band.
+    Returns the number of rehearsals updated.
+    """
+    values = {}
+    if days_diff:
+        # Date offset arithmetic happens in SQLite; the format matches how
+        # SQLAlchemy stores DateTime values ('%f' gives seconds with milliseconds)
+        values[Rehearsal.date] = db.func.strftime('%Y-%m-%d %H:%M:%f000', Rehearsal.date, f'{days_diff:+d} days')
+    if start_time:
+        values[Rehearsal.start_time] = start_time
+    if end_time:
+        values[Rehearsal.end_time] = end_time
+    if title is not None:  # Allow empty title
+        values[Rehearsal.title] = title
+    
+    series = Rehearsal.query.filter_by(recurring_id=recurring_id, band_id=band_id)
+    if not values:
+        return series.count()
+    values[Rehearsal.updated_at] = datetime.utcnow()
+    return series.update(values, synchronize_session=False)
+
+# Helper function to format a datetime the way SQLAlchemy stores DateTime
+# columns in SQLite, for comparisons in raw SQL
+def sql_timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+# Helper function to record deletions for delta sync, in the caller's transaction
+def record_tombstones(entity_type, source_query, params, expanding=()):
+    """
+    Inserts a tombstone for every row selected by source_query, which must
+    return band_id, entity_id, rehearsal_id and user_id columns. Call it
+    before deleting the rows.
+    """
+    statement = text(f"""
+        INSERT INTO tombstones (band_id, entity_type, entity_id, rehearsal_id, user_id, deleted_at)
+        SELECT band_id, :entity_type, entity_id, rehearsal_id, user_id, :deleted_at
+        FROM ({source_query})
+    """)
+    if expanding:
+        statement = statement.bindparams(*(bindparam(name, expanding=True) for name in expanding))
+    db.session.execute(statement, {**params, 'entity_type': entity_type, 'deleted_at': sql_timestamp(datetime.utcnow())})
+
+# Helper function to mark a band's data as changed, in the caller's transaction
+def bump_band_versions(band_ids=None, user_id=None):
+    """
+    Increments the version of the given bands, or of every band user_id is a
+    member of. Every write to a band's rehearsals, responses or members calls
+    this before committing, so ETags derived from the version change with it.
+    """
+    if user_id is not None:
+        db.session.execute(text("""
+            UPDATE bands SET version = version + 1
+            WHERE id IN (SELECT band_id FROM band_memberships WHERE user_id = :user_id)
+        """), {'user_id': user_id})
+        return
+    
+    band_ids = sorted({int(band_id) for band_id in band_ids or [] if band_id is not None})
+    if band_ids:
+        db.session.execute(
+            text("UPDATE bands SET version = version + 1 WHERE id IN :band_ids").bindparams(
+                bindparam('band_ids', expanding=True)
+            ),
+            {'band_ids': band_ids}
+        )
+
+# Helper functions for guarded response updates. The WHERE clause checks
+# that the response is in the band and is the caller's own, or that the
+# caller is a band or super admin, and RETURNING renders the result, so an
+# update is a single statement.
+GUARDED_RESPONSE_UPDATE = text("""
+    UPDATE responses SET
+        attending = CASE WHEN :set_attending THEN :attending ELSE attending END,
+        comment = CASE WHEN :set_comment THEN :comment ELSE comment END,
+        updated_at = :updated_at
+    WHERE id = :response_id
+      AND EXISTS (SELECT 1 FROM rehearsals re WHERE re.id = responses.rehearsal_id AND re.band_id = :band_id)
+      AND (user_id = :user_id OR :is_super_admin OR EXISTS (
+          SELECT 1 FROM band_memberships bm
+          WHERE bm.band_id = :band_id AND bm.user_id = :user_id AND bm.role = 'admin'
+      ))
+    RETURNING id, user_id, rehearsal_id, attending, comment, updated_at,
+        (SELECT u.username FROM users u WHERE u.id = responses.user_id) AS username,
+        (SELECT re.date FROM rehearsals re WHERE re.id = responses.rehearsal_id) AS rehearsal_date
+""")
+
+def apply_response_update(current_user, band_id, response_id, data):
+    """Returns the updated row, or None if there's no such response the user may change"""
+    return db.session.execute(GUARDED_RESPONSE_UPDATE, {
+        'response_id': response_id,
+        'band_id': band_id,
+        'user_id': current_user.id,
+        'is_super_admin': bool(current_user.is_super_admin),
+        'set_attending': 'attending' in data,
+        'attending': data.get('attending'),
+        'set_comment': 'comment' in data,
+        'comment': data.get('comment'),
+        # Same precision as ORM-written timestamps, which delta sync compares against
+        'updated_at': sql_timestamp(datetime.utcnow())
+    }).fetchone()
+
+def explain_response_update_failure(response_id, band_id):
+    """Works out why a guarded update matched nothing, as (message, status)"""
+    response_band_id = db.session.execute(text("""
+        SELECT re.band_id FROM responses r JOIN rehearsals re ON r.rehearsal_id = re.id
+        WHERE r.id = :response_id
+    """), {'response_id': response_id}).scalar()
+    
+    if response_band_id is None:
+        return "Response not found", 404
+    if str(response_band_id) != str(band_id):
+        return "Response does not belong to this band", 403
+    return "You can only update your own responses", 403
+
+def explain_response_create_failure(user_id, rehearsal_id):
+    """Works out why a guarded insert (without a conflict) wrote nothing, as (message, status)"""
+    if db.session.get(User, user_id) is None:
+        return "User not found", 404
+    band_id = db.session.execute(
+        text("SELECT band_id FROM rehearsals WHERE id = :rehearsal_id"), {'rehearsal_id': rehearsal_id}
+    ).scalar()
+    if band_id is None:
+        return "Rehearsal not found", 404
+    if not membership_index.is_member(user_id, band_id):
+        return "User is not a member of this band", 403
+    return "You can only create your own responses", 403
+
+# Helper function to push a change to the band's live event streams
+def publish_band_event(band_id, event, data):
+    """Call after committing; a failure to publish never fails the write"""
+    try:
+        event_hub.publish(int(band_id), event, data)
+    except Exception as e:
+        logger.error(f"Error publishing {event} event for band {band_id}: {str(e)}")
+
+# Helper function to recount a band's denormalised counters, in the caller's transaction
+def refresh_band_counters(band_ids=None):
+    """
+    Sets member_count and upcoming_rehearsal_count of the given bands (all
+    bands if None) from the membership and rehearsal tables. Membership
+    writes call it for the bands they touched before committing, so the
+    counters commit or roll back together with the change; both counts are
+    single index lookups. Rehearsal writes adjust upcoming_rehearsal_count
+    instead (see adjust_upcoming_rehearsal_count).
+    """
+    db.session.flush()  # Count rows added or deleted through the ORM too
+    
+    statement = """
+        UPDATE bands SET
+            member_count = (SELECT COUNT(*) FROM band_memberships bm WHERE bm.band_id = bands.id),
+            upcoming_rehearsal_count = (SELECT COUNT(*) FROM rehearsals re
+                                        WHERE re.band_id = bands.id AND date(re.date) >= :today)
+    """
+    params = {'today': datetime.now().strftime('%Y-%m-%d')}
+    if band_ids is None:
+        db.session.execute(text(statement), params)
+        return
+    
+    band_ids = sorted({int(band_id) for band_id in band_ids if band_id is not None})
+    if band_ids:
+        db.session.execute(
+            text(statement + " WHERE id IN :band_ids").bindparams(bindparam('band_ids', expanding=True)),
+            {**params, 'band_ids': band_ids}
+        )
+
+# Helper functions to keep upcoming_rehearsal_count in step with rehearsal writes
+def is_upcoming(rehearsal_date):
+    """Rehearsals dated today or later count as upcoming, as in archive_past_rehearsals"""
+    return rehearsal_date.date() >= datetime.now().date()
+
+def count_upcoming_in_series(recurring_id, band_id):
+    return Rehearsal.query.filter(
+        Rehearsal.recurring_id == recurring_id,
+        Rehearsal.band_id == band_id,
+        db.func.date(Rehearsal.date) >= datetime.now().strftime('%Y-%m-%d')
+    ).count()
+
+def adjust_upcoming_rehearsal_count(band_id, delta):
+    """
+    Adds delta to the band's counter in the caller's transaction, so a write
+    costs one UPDATE rather than a recount. Rehearsals whose day has passed
+    leave the count when archive_past_rehearsals recounts their bands.
+    """
+    if delta:
+        db.session.execute(
+            text("UPDATE bands SET upcoming_rehearsal_count = upcoming_rehearsal_count + :delta WHERE id = :band_id"),
+            {'delta': delta, 'band_id': band_id}
+        )
+
+# Helper function to list bands whose counters disagree with the tables
+def find_band_counter_drift():
+    result = db.session.execute(text("""
+        SELECT b.id, b.name, b.member_count, b.upcoming_rehearsal_count,
+               (SELECT COUNT(*) FROM band_memberships bm WHERE bm.band_id = b.id) AS actual_members,
+               (SELECT COUNT(*) FROM rehearsals re
+                WHERE re.band_id = b.id AND date(re.date) >= :today) AS actual_rehearsals
+        FROM bands b
+    """), {'today': datetime.now().strftime('%Y-%m-%d')})
+    return [row for row in result
+            if row.member_count != row.actual_members or row.upcoming_rehearsal_count != row.actual_rehearsals]
+
+# Helper functions for conditional GETs keyed on band versions
+def get_band_etag(band_id):
+    """Returns the ETag for a band's current version, or None if there's no such band"""
+    version = db.session.execute(
+        text("SELECT version FROM bands WHERE id = :band_id"), {'band_id': band_id}
+    ).scalar()
+    return f"band-{band_id}-v{version}" if version is not None else None
+
+def not_modified(etag):
+    """Returns a 304 response if the client already holds this ETag, otherwise None"""
+    if etag and request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        response.vary.add('Accept-Encoding')
+        return response
+    return None
+
+def precompressed(etag):
+    """
+    Returns the cached compressed body of this URL at this ETag, if the
+    client accepts its encoding, so neither the query nor serialization and
+    compression run again. ETags are band versions, so a change to the band
+    moves every request on to a new cache key.
+    """
+    encoding = response_compressor.choose_encoding(request.accept_encodings)
+    if not etag or not encoding:
+        return None
+    entry = response_compressor.get((request.full_path, etag, encoding), endpoint=request.endpoint)
+    if entry is None:
+        return None
+    response = app.response_class(entry.body, mimetype='application/json', headers=entry.headers)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return with_etag(response, etag)
+
+def with_etag(response, etag):
+    if etag:
+        # Weak: the same version is sent gzipped or as is, and those bodies
+        # aren't byte-for-byte equal
+        response.set_etag(etag, weak=True)
+        # Let browsers keep the body but always revalidate it
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+# Compress JSON responses the client can decode. Streamed bodies are
+# compressed as they are produced (their size isn't known up front, so the
+# threshold doesn't apply); version-tagged ones are kept for precompressed().
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = response_compressor.choose_encoding(request.accept_encodings)
+    etag, _ = response.get_etag()
+    cache_key = (request.full_path, etag, encoding) if etag else None
+    cached_headers = {name: response.headers[name] for name in ('X-Next-Cursor',) if name in response.headers}
+    
+    if response.is_streamed:
+        if encoding:
+            response.response = response_compressor.iter_compressed(
+                response.response, encoding, request.endpoint, cache_key, cached_headers
+            )
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response.response = response_compressor.iter_counted(response.response, request.endpoint)
+        return response
+    
+    body = response.get_data()
+    if not encoding or len(body) < response_compressor.min_size:
+        response_compressor.record(request.endpoint, len(body), len(body))
+        return response
+    
+    compressed = response_compressor.compress(body, encoding)
+    response_compressor.record(request.endpoint, len(body), len(compressed))
+    if cache_key:
+        response_compressor.put(cache_key, CompressedBody(compressed, len(body), cached_headers))
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+# Helper functions for opaque keyset cursors
+def encode_cursor(*values):
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, shape):
+    """
+    Returns the cursor's values, raising ValueError if it isn't one of ours.
+    shape gives the type of each value: int, str, or datetime for a
+    timestamp, which is checked but returned as its ISO string.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(shape):
+        raise ValueError("Invalid cursor")
+    for value, kind in zip(values, shape):
+        if kind is int:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        elif kind is datetime:
+            try:
+                valid = isinstance(value, str) and datetime.fromisoformat(value) is not None
+            except ValueError:
+                valid = False
+        else:
+            valid = isinstance(value, kind)
+        if not valid:
+            raise ValueError("Invalid cursor")
+    return values
+
+# Helper function to read the ?from=&to=&cursor=&limit= window of a listing
+def get_list_window(cursor_shape):
+    """
+    Returns (from_date, to_date, cursor, limit). Both dates are inclusive
+    'YYYY-MM-DD' days; to_date is returned as the exclusive next day so it
+    can be compared directly against stored datetimes. Raises ValueError on
+    malformed input.
+    """
+    from_date = request.args.get('from')
+    to_date = request.args.get('to')
+    if from_date:
+        from_date = datetime.strptime(from_date, '%Y-%m-%d')
+    if to_date:
+        to_date = datetime.strptime(to_date, '%Y-%m-%d') + timedelta(days=1)
+    
+    cursor = request.args.get('cursor')
+    if cursor:
+        cursor = decode_cursor(cursor, cursor_shape)
+    
+    limit = request.args.get('limit', app.config['LIST_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, app.config['LIST_MAX_PAGE_SIZE']))
+    
+    return from_date or None, to_date or None, cursor or None, limit
+
+# Helper function to build the query for rehearsals with their response counts
+def rehearsals_with_counts_query(band_id=None, rehearsal_id=None, from_date=None, to_date=None,
+                                 cursor=None, page_end=None):
+    """
+    Selects rehearsal columns with total, attending and declined response
+    counts, computed with one GROUP BY instead of loading each rehearsal's
+    responses, ordered by (date, id). Rows hold plain columns rather than
+    Rehearsal objects so they can be streamed without filling the session.
+    cursor and page_end bound the (date, id) keyset: after cursor, up to and
+    including page_end.
+    """
+    members = aliased(BandMembership)
+    member_count = db.session.query(db.func.count(members.id)).filter(
+        members.band_id == Rehearsal.band_id
+    ).correlate(Rehearsal).scalar_subquery()
+    
+    query = db.session.query(
+        Rehearsal.id, Rehearsal.date, Rehearsal.start_time, Rehearsal.end_time,
+        Rehearsal.title, Rehearsal.recurring_id,
+        member_count.label('member_count'),
+        db.func.count(Response.id).label('stored'),
+        db.func.count(BandMembership.id).label('stored_by_members'),
+        db.func.sum(db.case((Response.attending == True, 1), else_=0)).label('attending'),
+        db.func.sum(db.case((Response.attending == False, 1), else_=0)).label('declined')
+    ).outerjoin(
+        Response, Response.rehearsal_id == Rehearsal.id
+    ).outerjoin(
+        BandMembership, db.and_(BandMembership.band_id == Rehearsal.band_id,
+                                BandMembership.user_id == Response.user_id)
+    ).group_by(Rehearsal.id).order_by(Rehearsal.date, Rehearsal.id)
+    
+    query = filter_rehearsal_window(query, band_id, rehearsal_id, from_date, to_date, cursor)
+    if page_end is not None:
+        query = query.filter(db.tuple_(Rehearsal.date, Rehearsal.id) <= tuple(page_end))
+    return query
+
+def filter_rehearsal_window(query, band_id=None, rehearsal_id=None, from_date=None, to_date=None, cursor=None):
+    if band_id is not None:
+        query = query.filter(Rehearsal.band_id == band_id)
+    if rehearsal_id is not None:
+        query = query.filter(Rehearsal.id == rehearsal_id)
+    if from_date is not None:
+        query = query.filter(Rehearsal.date >= from_date)
+    if to_date is not None:
+        query = query.filter(Rehearsal.date < to_date)
+    if cursor is not None:
+        cursor_date, cursor_id = cursor
+        query = query.filter(db.tuple_(Rehearsal.date, Rehearsal.id) >
+                             (datetime.fromisoformat(cursor_date), cursor_id))
+    return query
+
+# Band members without a stored response count as an implicit "Ja",
+# matching what get_responses returns
+def implicit_responses(row):
+    return max((row.member_count or 0) - row.stored_by_members, 0)
+
+# Row encoders for the list endpoints (see serialization.py)
+REHEARSAL_ENCODER = RowEncoder(
+    id='id',
+    date=('date', formatted('%Y-%m-%d')),
+    start_time=('start_time', formatted('%H:%M')),
+    end_time=('end_time', formatted('%H:%M')),
+    title='title',
+    recurring_id='recurring_id',
+    responses=lambda row: row.stored + implicit_responses(row),
+    attending=lambda row: (row.attending or 0) + implicit_responses(row),
+    declined=('declined', as_int)
+)
+
+RESPONSE_ENCODER = RowEncoder(
+    id='id',
+    user_id='user_id',
+    username='username',
+    rehearsal_id='rehearsal_id',
+    rehearsal_date=('rehearsal_date', formatted('%Y-%m-%d')),
+    attending=('attending', bool),
+    comment='comment',
+    updated_at=('updated_at', formatted('%Y-%m-%d %H:%M:%S')),
+    implicit=('implicit', bool)
+)
+
+UPDATED_RESPONSE_ENCODER = RowEncoder(
+    id='id',
+    user_id='user_id',
+    username='username',
+    rehearsal_id='rehearsal_id',
+    rehearsal_date=('rehearsal_date', formatted('%Y-%m-%d')),
+    attending=('attending', bool),
+    comment='comment',
+    updated_at=('updated_at', formatted('%Y-%m-%d %H:%M:%S'))
+)
+
+BAND_ENCODER = RowEncoder(
+    id='id',
+    name='name',
+    description='description',
+    created_at=('created_at', formatted('%Y-%m-%d')),
+    created_by='created_by',
+    creator_name='creator_name',
+    member_count='member_count',
+    upcoming_rehearsals='upcoming_rehearsal_count',
+    role='role'
+)
+
+# Helper function to build the responses listing: stored responses for
+# rehearsals in the band, plus an implicit default "Ja" for every band member
+# who has no stored response. The filters are appended to each half.
+def responses_union_query(rehearsal_filter, stored_filter, member_filter):
+    return f"""
+        SELECT r.id, r.user_id, u.username, r.rehearsal_id, 
+               re.date as rehearsal_date, r.attending, r.comment, 
+               r.updated_at, 0 as implicit
+        FROM responses r
+        JOIN users u ON r.user_id = u.id
+        JOIN rehearsals re ON r.rehearsal_id = re.id
+        WHERE re.band_id = :band_id{rehearsal_filter}{stored_filter}
+        UNION ALL
+        SELECT NULL, bm.user_id, u.username, re.id,
+               re.date, 1, NULL,
+               NULL, 1
+        FROM rehearsals re
+        JOIN band_memberships bm ON bm.band_id = re.band_id
+        JOIN users u ON bm.user_id = u.id
+        WHERE re.band_id = :band_id{rehearsal_filter}{member_filter}
+          AND NOT EXISTS (
+              SELECT 1 FROM responses r
+              WHERE r.rehearsal_id = re.id AND r.user_id = bm.user_id
+          )
+    """
+
+USER_ENCODER = RowEncoder(
+    id='id',
+    username='username',
+    email='email',
+    first_name='first_name',
+    last_name='last_name',
+    is_admin='is_admin'
+)
+
+AUDIT_ENCODER = RowEncoder(
+    id='id',
+    user_id='user_id',
+    username='username',
+    action='action',
+    entity_type='entity_type',
+    entity_id='entity_id',
+    band_id='band_id',
+    old_value='old_value',
+    new_value='new_value',
+    timestamp=('timestamp', formatted('%Y-%m-%d %H:%M:%S.%f'))
+)
+
+AUDIT_ROLLUP_ENCODER = RowEncoder(
+    day=('day', formatted('%Y-%m-%d')),
+    band_id='band_id',
+    user_id='user_id',
+    action='action',
+    entity_type='entity_type',
+    entries='entries'
+)
+
+# Helper function to send rows as a JSON array encoded while the cursor is read
+def stream_json_rows(rows, encoder):
+    """
+    The body is produced chunk by chunk after the view returns, so the
+    request context (and with it the database session) is kept open until
+    the last row has been sent.
+    """
+    return app.response_class(stream_with_context(encoder.iter_json(rows)), mimetype='application/json')
+
 # Test endpoint
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
@@ -250,6 +1315,7 @@ def login():
 
 # User routes
 @app.route('/api/users', methods=['GET'])
+@read_only
 def get_users():
     try:
         current_user = get_user_from_token()
@@ -257,19 +1323,53 @@ def get_users():
         if not current_user or not current_user.is_admin:
             return jsonify({"msg": "Admin privileges required"}), 403
         
-        users = User.query.all()
-        result = []
-        for user in users:
-            result.append({
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'is_admin': user.is_admin
-            })
-        
-        return jsonify(result), 200
+        try:
+            _, _, cursor, limit = get_list_window(cursor_shape=(str,))
+        except ValueError as e:
+            return jsonify({"msg": f"Invalid window: {str(e)}"}), 400
+        
+        query = db.session.query(
+            User.id, User.username, User.email, User.first_name, User.last_name, User.is_admin
+        ).order_by(User.username)
+        
+        # Prefix search on username, email and names; each is a range scan on
+        # a lower() index, e.g. 'ann' matches ['ann', 'ano')
+        search = (request.args.get('q') or '').strip().lower()
+        if search:
+            search_end = search[:-1] + chr(ord(search[-1]) + 1)
+            query = query.filter(db.or_(*(
+                db.and_(db.func.lower(column) >= search, db.func.lower(column) < search_end)
+                for column in (User.username, User.email, User.first_name, User.last_name)
+            )))
+        
+        for flag, column in (('is_admin', User.is_admin), ('is_super_admin', User.is_super_admin)):
+            value = request.args.get(flag)
+            if value is not None:
+                query = query.filter(column == (value.lower() == 'true'))
+        
+        # Members of one band, optionally with one role there
+        band_id = request.args.get('band_id', type=int)
+        role = request.args.get('role')
+        if band_id:
+            memberships = BandMembership.query.filter(BandMembership.band_id == band_id)
+            if role:
+                memberships = memberships.filter(BandMembership.role == role)
+            query = query.filter(User.id.in_(memberships.with_entities(BandMembership.user_id)))
+        elif role:
+            return jsonify({"msg": "role filter requires band_id"}), 400
+        
+        if cursor:
+            query = query.filter(User.username > cursor[0])
+        
+        # Usernames are unique, so the last one on the page is the keyset cursor
+        page_end = query.with_entities(User.username).offset(limit - 1).limit(2).all()
+        if len(page_end) > 1:
+            query = query.filter(User.username <= page_end[0].username)
+        
+        response = stream_json_rows(query, USER_ENCODER)
+        if len(page_end) > 1:
+            response.headers['X-Next-Cursor'] = encode_cursor(page_end[0].username)
+        return response, 200
     except Exception as e:
         logger.error(f"Error getting users: {str(e)}")
         db.session.rollback()
@@ -316,6 +1416,7 @@ def create_user():
 # Rehearsal routes
 # Update rehearsals endpoint
 @app.route('/api/rehearsals', methods=['GET'])
+@read_only
 def get_rehearsals():
     current_user = get_user_from_token()
     
@@ -329,32 +1430,41 @@ def get_rehearsals():
         return jsonify({"msg": "band_id parameter is required"}), 400
     
     # Check if user is member of the band
-    is_member = BandMembership.query.filter_by(
-        user_id=current_user.id, 
-        band_id=band_id
-    ).first() is not None
+    is_member = membership_index.is_member(current_user.id, band_id)
     
     if not (current_user.is_super_admin or is_member):
         return jsonify({"msg": "Access denied"}), 403
     
-    # Get rehearsals for this band
-    rehearsals = Rehearsal.query.filter_by(band_id=band_id).order_by(Rehearsal.date).all()
-    
-    result = []
-    for rehearsal in rehearsals:
-        result.append({
-            'id': rehearsal.id,
-            'date': rehearsal.date.strftime('%Y-%m-%d'),
-            'start_time': rehearsal.start_time.strftime('%H:%M') if rehearsal.start_time else None,
-            'end_time': rehearsal.end_time.strftime('%H:%M') if rehearsal.end_time else None,
-            'title': rehearsal.title,
-            'recurring_id': rehearsal.recurring_id,
-            'responses': len(rehearsal.responses)
-        })
-    
-    return jsonify(result), 200
+    try:
+        from_date, to_date, cursor, limit = get_list_window(cursor_shape=(datetime, int))
+    except ValueError as e:
+        return jsonify({"msg": f"Invalid window: {str(e)}"}), 400
+    
+    # Answer unchanged data without running the query
+    etag = get_band_etag(band_id)
+    cached = not_modified(etag) or precompressed(etag)
+    if cached:
+        return cached
+    
+    # Find where this page ends: the key of its last row, if another row follows
+    page_keys = filter_rehearsal_window(
+        db.session.query(Rehearsal.date, Rehearsal.id).order_by(Rehearsal.date, Rehearsal.id),
+        band_id=band_id, from_date=from_date, to_date=to_date, cursor=cursor
+    ).offset(limit - 1).limit(2).all()
+    page_end = page_keys[0] if len(page_keys) > 1 else None
+    
+    # Stream the page of rehearsals with their response counts. Bounding it by
+    # page_end rather than LIMIT keeps the cursor right if rows change meanwhile.
+    rows = rehearsals_with_counts_query(band_id=band_id, from_date=from_date, to_date=to_date,
+                                        cursor=cursor, page_end=page_end)
+    
+    response = with_etag(stream_json_rows(rows, REHEARSAL_ENCODER), etag)
+    if page_end is not None:
+        response.headers['X-Next-Cursor'] = encode_cursor(page_end.date.isoformat(sep=' '), page_end.id)
+    return response, 200
 
 @app.route('/api/rehearsals/<int:rehearsal_id>', methods=['GET'])
+@read_only
 def get_rehearsal(rehearsal_id):
     try:
         current_user = get_user_from_token()
@@ -362,17 +1472,12 @@ def get_rehearsal(rehearsal_id):
         if not current_user:
             return jsonify({"msg": "Authentication required"}), 401
         
-        rehearsal = Rehearsal.query.get_or_404(rehearsal_id)
+        row = rehearsals_with_counts_query(rehearsal_id=rehearsal_id).first()
         
-        return jsonify({
-            'id': rehearsal.id,
-            'date': rehearsal.date.strftime('%Y-%m-%d'),
-            'start_time': rehearsal.start_time.strftime('%H:%M') if rehearsal.start_time else None,
-            'end_time': rehearsal.end_time.strftime('%H:%M') if rehearsal.end_time else None,
-            'title': rehearsal.title,
-            'recurring_id': rehearsal.recurring_id,
-            'responses': len(rehearsal.responses)
-        }), 200
+        if not row:
+            return jsonify({"msg": "Resource not found"}), 404
+        
+        return jsonify(REHEARSAL_ENCODER.encode(row)), 200
     except Exception as e:
         logger.error(f"Error getting rehearsal: {str(e)}")
         db.session.rollback()
@@ -395,6 +1500,10 @@ def create_rehearsal():
         recurrence_type = data.get('recurrence_type', 'weekly')
         duration_months = data.get('duration_months', 3)
         day_of_week = data.get('day_of_week')
+        band_id = data.get('band_id')
+        
+        if not band_id:
+            return jsonify({"msg": "band_id is required"}), 400
         
         try:
             date = datetime.strptime(date_str, '%Y-%m-%d')
@@ -408,6 +1517,7 @@ def create_rehearsal():
         
         # Create the rehearsals
         created_rehearsals = []
+        new_rehearsals = []
         
         if is_recurring:
             # Get the target day of the week if specified
@@ -429,48 +1539,33 @@ def create_rehearsal():
             end_date = date.replace(month=date.month + duration_months) if date.month + duration_months <= 12 else \
                        date.replace(year=date.year + 1, month=(date.month + duration_months) % 12 or 12)
             
-            # Create recurring rehearsals
-            current_date = date
-            while current_date <= end_date:
-                # Check for existing rehearsal on this date
-                existing = Rehearsal.query.filter(
-                    db.func.date(Rehearsal.date) == current_date.date()
-                ).first()
-                
-                if not existing:
-                    new_rehearsal = Rehearsal(
-                        date=current_date,
-                        start_time=start_time,
-                        end_time=end_time,
-                        title=title,
-                        recurring_id=recurring_id
-                    )
-                    db.session.add(new_rehearsal)
-                    
-                    # Create default "Ja" responses for all users
-                    users = User.query.all()
-                    for user in users:
-                        response = Response(user=user, rehearsal=new_rehearsal, attending=True)
-                        db.session.add(response)
-                    
-                    created_rehearsals.append({
-                        'date': current_date.strftime('%Y-%m-%d'),
-                        'start_time': start_time.strftime('%H:%M'),
-                        'end_time': end_time.strftime('%H:%M')
-                    })
-                
-                # Move to the next occurrence
-                if recurrence_type == 'weekly':
-                    current_date += timedelta(days=7)
-                elif recurrence_type == 'biweekly':
-                    current_date += timedelta(days=14)
+            # Store the series as a rule; only the occurrences inside the rolling
+            # horizon are created now, the background job creates the rest later
+            rule = RecurrenceRule(
+                recurring_id=recurring_id,
+                band_id=band_id,
+                interval_days=14 if recurrence_type == 'biweekly' else 7,
+                start_date=date.date(),
+                until_date=end_date.date(),
+                start_time=start_time,
+                end_time=end_time,
+                title=title,
+                created_by=current_user.id
+            )
+            db.session.add(rule)
+            
+            horizon_end = datetime.now().date() + timedelta(days=app.config['RECURRENCE_HORIZON_DAYS'])
+            new_rehearsals = materialize_recurrence_rule(rule, max(horizon_end, rule.start_date))
+            
+            for new_rehearsal in new_rehearsals:
+                created_rehearsals.append({
+                    'date': new_rehearsal.date.strftime('%Y-%m-%d'),
+                    'start_time': start_time.strftime('%H:%M'),
+                    'end_time': end_time.strftime('%H:%M')
+                })
         else:
             # Check for existing rehearsal on this date
-            existing = Rehearsal.query.filter(
-                db.func.date(Rehearsal.date) == date.date()
-            ).first()
-            
-            if existing:
+            if date.strftime('%Y-%m-%d') in get_existing_rehearsal_dates(band_id, date.date(), date.date()):
                 return jsonify({"msg": f"A rehearsal already exists on {date_str}"}), 400
             
             new_rehearsal = Rehearsal(
@@ -478,38 +1573,45 @@ def create_rehearsal():
                 start_time=start_time,
                 end_time=end_time,
                 title=title,
-                recurring_id=None
+                recurring_id=None,
+                band_id=band_id
             )
             db.session.add(new_rehearsal)
-            
-            # Create default "Ja" responses for all users
-            users = User.query.all()
-            for user in users:
-                response = Response(user=user, rehearsal=new_rehearsal, attending=True)
-                db.session.add(response)
+            new_rehearsals.append(new_rehearsal)
             
             created_rehearsals.append({
                 'date': date.strftime('%Y-%m-%d'),
                 'start_time': start_time.strftime('%H:%M'),
                 'end_time': end_time.strftime('%H:%M')
             })
-        
+            
+            # Create default "Ja" responses for all band members
+            db.session.flush()
+            create_default_responses([r.id for r in new_rehearsals])
+            # materialize_recurrence_rule counts the series' rehearsals itself
+            adjust_upcoming_rehearsal_count(band_id, int(is_upcoming(date)))
+        
+        bump_band_versions([band_id])
+        new_rehearsal_ids = [r.id for r in new_rehearsals]  # Before the commit expires them
         db.session.commit()
         
         # Log the creation
-        log = LogEntry(
+        audit_log.record(
             user_id=current_user.id,
             action="create",
             entity_type="rehearsal",
-            entity_id=new_rehearsal.id,
-            new_value=f"Date: {date_str}, Time: {start_time_str}-{end_time_str}, Title: {title}"
+            entity_id=new_rehearsal_ids[-1] if new_rehearsal_ids else None,
+            new_value=f"Date: {date_str}, Time: {start_time_str}-{end_time_str}, Title: {title}",
+            band_id=band_id
         )
-        db.session.add(log)
-        db.session.commit()
+        
+        if new_rehearsal_ids:
+            publish_band_event(band_id, 'rehearsals', {'action': 'created', 'ids': new_rehearsal_ids})
         
         return jsonify({
             'created_rehearsals': created_rehearsals,
-            'recurring_id': recurring_id
+            'recurring_id': recurring_id,
+            'rule': rule.to_rrule() if is_recurring else None
         }), 201
     except Exception as e:
         logger.error(f"Error creating rehearsal: {str(e)}")
@@ -541,37 +1643,59 @@ def update_rehearsal(rehearsal_id):
         start_time = datetime.strptime(start_time_str, '%H:%M').time() if start_time_str else None
         end_time = datetime.strptime(end_time_str, '%H:%M').time() if end_time_str else None
         
-        # For recurring updates, get all related rehearsals
-        rehearsals_to_update = []
+        # Calculate days difference between original and new date
+        days_diff = (date - rehearsal.date).days if date else 0
+        
         if is_recurring_update:
-            rehearsals_to_update = Rehearsal.query.filter_by(recurring_id=rehearsal.recurring_id).all()
+            # Update the series rule so occurrences materialised later match
+            rule = RecurrenceRule.query.filter_by(recurring_id=rehearsal.recurring_id).first()
+            if rule:
+                if days_diff:
+                    rule.shift(days_diff)
+                if start_time:
+                    rule.start_time = start_time
+                if end_time:
+                    rule.end_time = end_time
+                if title is not None:
+                    rule.title = title
+            
+            # Update the whole series with one UPDATE instead of loading every row
+            upcoming_before = count_upcoming_in_series(rehearsal.recurring_id, rehearsal.band_id) if days_diff else 0
+            updated_count = update_rehearsal_series(
+                rehearsal.recurring_id, rehearsal.band_id, days_diff, start_time, end_time, title
+            )
+            if days_diff:
+                adjust_upcoming_rehearsal_count(
+                    rehearsal.band_id,
+                    count_upcoming_in_series(rehearsal.recurring_id, rehearsal.band_id) - upcoming_before
+                )
         else:
-            rehearsals_to_update = [rehearsal]
-        
-        # Update all selected rehearsals
-        for r in rehearsals_to_update:
             if date:
-                # For recurring events, maintain the same day of week but update to new date pattern
-                if is_recurring_update and len(rehearsals_to_update) > 1:
-                    # Calculate days difference between original and new date
-                    days_diff = (date - rehearsal.date).days
-                    r.date = r.date + timedelta(days=days_diff)
-                else:
-                    r.date = date
+                adjust_upcoming_rehearsal_count(rehearsal.band_id, is_upcoming(date) - is_upcoming(rehearsal.date))
+                rehearsal.date = date
                     
             if start_time:
-                r.start_time = start_time
+                rehearsal.start_time = start_time
             
             if end_time:
-                r.end_time = end_time
+                rehearsal.end_time = end_time
                 
             if title is not None:  # Allow empty title
-                r.title = title
+                rehearsal.title = title
+            
+            updated_count = 1
         
+        bump_band_versions([rehearsal.band_id])
         db.session.commit()
         
+        if is_recurring_update:
+            publish_band_event(rehearsal.band_id, 'rehearsals',
+                               {'action': 'updated', 'recurring_id': rehearsal.recurring_id})
+        else:
+            publish_band_event(rehearsal.band_id, 'rehearsals', {'action': 'updated', 'ids': [rehearsal_id]})
+        
         return jsonify({
-            'updated_rehearsals': len(rehearsals_to_update),
+            'updated_rehearsals': updated_count,
             'recurring_id': rehearsal.recurring_id
         }), 200
     except Exception as e:
@@ -592,23 +1716,56 @@ def delete_rehearsal(rehearsal_id):
         # Check if this is a recurring rehearsal
         delete_all_recurring = request.args.get('delete_all_recurring', 'false').lower() == 'true'
         
-        # For recurring deletions, get all related rehearsals
-        rehearsals_to_delete = []
-        if delete_all_recurring and rehearsal.recurring_id:
-            rehearsals_to_delete = Rehearsal.query.filter_by(recurring_id=rehearsal.recurring_id).all()
+        recurring_id = rehearsal.recurring_id
+        band_id = rehearsal.band_id
+        rule = None
+        if recurring_id:
+            rule = RecurrenceRule.query.filter_by(recurring_id=recurring_id).first()
+        
+        # Responses are removed by the database (ON DELETE CASCADE), so neither
+        # path below ever loads them into memory
+        if delete_all_recurring and recurring_id:
+            # Drop the rule too so nothing more gets materialised
+            if rule:
+                db.session.delete(rule)
+            
+            record_tombstones('rehearsal', """
+                SELECT band_id, id AS entity_id, id AS rehearsal_id, NULL AS user_id
+                FROM rehearsals WHERE recurring_id = :recurring_id AND band_id = :band_id
+            """, {'recurring_id': recurring_id, 'band_id': band_id})
+            upcoming_deleted = count_upcoming_in_series(recurring_id, band_id)
+            
+            # Delete the whole series with one DELETE
+            deleted_count = Rehearsal.query.filter_by(
+                recurring_id=recurring_id,
+                band_id=band_id
+            ).delete(synchronize_session=False)
         else:
-            rehearsals_to_delete = [rehearsal]
-        
-        # Delete responses for all rehearsals
-        for r in rehearsals_to_delete:
-            # Responses will be automatically deleted due to cascade
-            db.session.delete(r)
+            # Remember the skipped occurrence as an exception to the series
+            if rule:
+                rule.add_exception(rehearsal.date)
+            
+            record_tombstones('rehearsal', """
+                SELECT band_id, id AS entity_id, id AS rehearsal_id, NULL AS user_id
+                FROM rehearsals WHERE id = :rehearsal_id
+            """, {'rehearsal_id': rehearsal_id})
+            
+            upcoming_deleted = int(is_upcoming(rehearsal.date))
+            db.session.delete(rehearsal)
+            deleted_count = 1
         
+        bump_band_versions([band_id])
+        adjust_upcoming_rehearsal_count(band_id, -upcoming_deleted)
         db.session.commit()
         
+        if delete_all_recurring and recurring_id:
+            publish_band_event(band_id, 'rehearsals', {'action': 'deleted', 'recurring_id': recurring_id})
+        else:
+            publish_band_event(band_id, 'rehearsals', {'action': 'deleted', 'ids': [rehearsal_id]})
+        
         return jsonify({
-            'deleted_rehearsals': len(rehearsals_to_delete),
-            'recurring_id': rehearsal.recurring_id if rehearsal.recurring_id else None
+            'deleted_rehearsals': deleted_count,
+            'recurring_id': recurring_id
         }), 200
     except Exception as e:
         logger.error(f"Error deleting rehearsal: {str(e)}")
@@ -618,7 +1775,8 @@ def delete_rehearsal(rehearsal_id):
 @app.route('/api/rehearsals/manage', methods=['POST'])
 def manage_rehearsals():
     """
-    Handles the functionality to remove past rehearsals and add new ones
+    Adds a new rehearsal one week after the latest one. Past rehearsals are
+    no longer deleted here; archive_past_rehearsals moves them to the archive.
     """
     try:
         current_user = get_user_from_token()
@@ -626,14 +1784,13 @@ def manage_rehearsals():
         if not current_user:
             return jsonify({"msg": "Authentication required"}), 401
         
-        # Remove past rehearsals
-        today = datetime.now().date()
-        past_rehearsals = Rehearsal.query.filter(db.func.date(Rehearsal.date) < today).all()
-        for rehearsal in past_rehearsals:
-            db.session.delete(rehearsal)
+        band_id = request.args.get('band_id', type=int)
         
-        # Find the latest rehearsal date
-        latest_rehearsal = Rehearsal.query.order_by(Rehearsal.date.desc()).first()
+        # Find the latest rehearsal date (in the given band, if any)
+        latest_query = Rehearsal.query
+        if band_id:
+            latest_query = latest_query.filter_by(band_id=band_id)
+        latest_rehearsal = latest_query.order_by(Rehearsal.date.desc()).first()
         
         if latest_rehearsal:
             # Add a new rehearsal one week after the latest
@@ -643,28 +1800,260 @@ def manage_rehearsals():
                 start_time=latest_rehearsal.start_time,  # Use the same time as the latest rehearsal
                 end_time=latest_rehearsal.end_time,
                 title=latest_rehearsal.title,
-                recurring_id=None  # Not part of a recurring series
+                recurring_id=None,  # Not part of a recurring series
+                band_id=latest_rehearsal.band_id
             )
             db.session.add(new_rehearsal)
+            db.session.flush()
             
-            # Create default "Ja" responses for all users
-            users = User.query.all()
-            for user in users:
-                response = Response(user=user, rehearsal=new_rehearsal, attending=True)
-                db.session.add(response)
+            # Create default "Ja" responses for all band members
+            create_default_responses([new_rehearsal.id])
+            bump_band_versions([new_rehearsal.band_id])
+            adjust_upcoming_rehearsal_count(new_rehearsal.band_id, int(is_upcoming(new_rehearsal.date)))
         
         db.session.commit()
         
+        if latest_rehearsal:
+            publish_band_event(new_rehearsal.band_id, 'rehearsals', {'action': 'created', 'ids': [new_rehearsal.id]})
+        
         return jsonify({"msg": "Rehearsals updated successfully"}), 200
     except Exception as e:
         logger.error(f"Error managing rehearsals: {str(e)}")
         db.session.rollback()
         return jsonify({"msg": "Failed to update rehearsals"}), 500
 
+# Schedule matrix
+@app.route('/api/bands/<int:band_id>/schedule', methods=['GET'])
+@read_only
+def get_schedule(band_id):
+    """
+    Returns a band's attendance matrix in columnar form: parallel arrays for
+    the rehearsals and the members, one attendance string per member with a
+    character per rehearsal, and the response ids and comments addressed by
+    (member, rehearsal) position. Built from a single query, so usernames
+    and dates are sent once instead of once per response.
+
+    Attendance characters: 'Y' stored yes, 'N' stored no, 'y' implicit
+    default yes (no stored response, id is null).
+    """
+    current_user = get_user_from_token()
+    
+    if not current_user:
+        return jsonify({"msg": "Authentication required"}), 401
+    
+    if not (current_user.is_super_admin or membership_index.is_member(current_user.id, band_id)):
+        return jsonify({"msg": "Access denied"}), 403
+    
+    # Answer unchanged data without running the query
+    etag = get_band_etag(band_id)
+    cached = not_modified(etag) or precompressed(etag)
+    if cached:
+        return cached
+    
+    try:
+        # One row per (rehearsal, member) cell, with the stored response if any
+        query = """
+            SELECT re.id AS rehearsal_id,
+                   strftime('%Y-%m-%d', re.date) AS date,
+                   strftime('%H:%M', re.start_time) AS start_time,
+                   strftime('%H:%M', re.end_time) AS end_time,
+                   re.title, re.recurring_id,
+                   bm.user_id, u.username,
+                   r.id AS response_id, r.attending, r.comment
+            FROM rehearsals re
+            LEFT JOIN band_memberships bm ON bm.band_id = re.band_id
+            LEFT JOIN users u ON bm.user_id = u.id
+            LEFT JOIN responses r ON r.rehearsal_id = re.id AND r.user_id = bm.user_id
+            WHERE re.band_id = :band_id
+            ORDER BY re.date, re.id, u.username, bm.user_id
+        """
+        result = db.session.execute(text(query), {'band_id': band_id})
+        
+        rehearsals = {'id': [], 'date': [], 'start_time': [], 'end_time': [], 'title': [], 'recurring_id': []}
+        members = {'id': [], 'username': []}
+        member_positions = {}
+        cells = {}
+        comments = []
+        
+        for row in result:
+            if not rehearsals['id'] or rehearsals['id'][-1] != row.rehearsal_id:
+                rehearsals['id'].append(row.rehearsal_id)
+                rehearsals['date'].append(row.date)
+                rehearsals['start_time'].append(row.start_time)
+                rehearsals['end_time'].append(row.end_time)
+                rehearsals['title'].append(row.title)
+                rehearsals['recurring_id'].append(row.recurring_id)
+            
+            if row.user_id is None:
+                continue  # Band without members
+            
+            m = member_positions.get(row.user_id)
+            if m is None:
+                m = member_positions[row.user_id] = len(members['id'])
+                members['id'].append(row.user_id)
+                members['username'].append(row.username)
+            
+            r = len(rehearsals['id']) - 1
+            if row.response_id is None:
+                cells[m, r] = ('y', None)
+            else:
+                cells[m, r] = ('Y' if row.attending else 'N', row.response_id)
+                if row.comment:
+                    comments.append([m, r, row.comment])
+        
+        # Pack the cells into one row per member, indexed by rehearsal position
+        attendance = []
+        response_ids = []
+        for m in range(len(members['id'])):
+            row_cells = [cells.get((m, r), ('y', None)) for r in range(len(rehearsals['id']))]
+            attendance.append(''.join(state for state, _ in row_cells))
+            response_ids.append([response_id for _, response_id in row_cells])
+        
+        return with_etag(jsonify({
+            'band_id': band_id,
+            'rehearsals': rehearsals,
+            'members': members,
+            'attendance': attendance,
+            'response_ids': response_ids,
+            'comments': comments
+        }), etag), 200
+    except Exception as e:
+        logger.error(f"Error getting schedule: {str(e)}")
+        return jsonify({"msg": "Failed to retrieve schedule"}), 500
+
+# Live updates
+@app.route('/api/bands/<int:band_id>/events', methods=['GET'])
+@read_only
+def band_events(band_id):
+    """
+    Server-sent event stream of the band's changes: 'response' events carry
+    the changed response, 'rehearsals' and 'members' events say what changed
+    so the client can refetch it, and 'resync' means events were dropped and
+    the client should reload. Comment lines are sent as heartbeats.
+    
+    The stream holds its worker thread until the client disconnects; see
+    EVENTS_SOCKET_DIR for the worker classes this needs.
+    """
+    current_user = get_user_from_token(allow_query_token=True)
+    
+    if not current_user:
+        return jsonify({"msg": "Authentication required"}), 401
+    
+    if not (current_user.is_super_admin or membership_index.is_member(current_user.id, band_id)):
+        return jsonify({"msg": "Access denied"}), 403
+    
+    subscription = event_hub.subscribe(band_id)
+    heartbeat = app.config['EVENTS_HEARTBEAT_SECONDS']
+    
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                message = subscription.get(timeout=heartbeat)
+                if message is None:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+        finally:
+            # Runs when the client disconnects and the server closes the generator
+            event_hub.unsubscribe(subscription)
+    
+    response = app.response_class(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let a proxy hold events back
+    return response
+
+# Archive routes (read-only)
+@app.route('/api/bands/<int:band_id>/archive', methods=['GET'])
+@read_only
+def get_archived_rehearsals(band_id):
+    current_user = get_user_from_token()
+    
+    if not current_user:
+        return jsonify({"msg": "Authentication required"}), 401
+    
+    if not (current_user.is_super_admin or membership_index.is_member(current_user.id, band_id)):
+        return jsonify({"msg": "Access denied"}), 403
+    
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = request.args.get('per_page', 50, type=int)
+    per_page = max(1, min(per_page, app.config['ARCHIVE_MAX_PAGE_SIZE']))
+    
+    # Newest first; fetch one extra row to know whether another page exists
+    archived = ArchivedRehearsal.query.filter_by(band_id=band_id).order_by(
+        ArchivedRehearsal.date.desc(), ArchivedRehearsal.id.desc()
+    ).offset((page - 1) * per_page).limit(per_page + 1).all()
+    
+    result = []
+    for rehearsal in archived[:per_page]:
+        result.append({
+            'id': rehearsal.id,
+            'rehearsal_id': rehearsal.rehearsal_id,
+            'date': rehearsal.date.strftime('%Y-%m-%d'),
+            'start_time': rehearsal.start_time.strftime('%H:%M') if rehearsal.start_time else None,
+            'end_time': rehearsal.end_time.strftime('%H:%M') if rehearsal.end_time else None,
+            'title': rehearsal.title,
+            'recurring_id': rehearsal.recurring_id,
+            'attending': rehearsal.attending_count,
+            'declined': rehearsal.declined_count
+        })
+    
+    return jsonify({
+        'rehearsals': result,
+        'page': page,
+        'per_page': per_page,
+        'has_more': len(archived) > per_page
+    }), 200
+
+@app.route('/api/bands/<int:band_id>/archive/<int:archived_id>', methods=['GET'])
+@read_only
+def get_archived_rehearsal(band_id, archived_id):
+    current_user = get_user_from_token()
+    
+    if not current_user:
+        return jsonify({"msg": "Authentication required"}), 401
+    
+    if not (current_user.is_super_admin or membership_index.is_member(current_user.id, band_id)):
+        return jsonify({"msg": "Access denied"}), 403
+    
+    rehearsal = ArchivedRehearsal.query.filter_by(id=archived_id, band_id=band_id).first_or_404()
+    
+    responses_query = """
+        SELECT ar.user_id, u.username, ar.attending, ar.comment
+        FROM archived_responses ar
+        LEFT JOIN users u ON ar.user_id = u.id
+        WHERE ar.archived_rehearsal_id = :archived_id
+    """
+    result = db.session.execute(text(responses_query), {'archived_id': archived_id})
+    
+    responses = []
+    for row in result:
+        responses.append({
+            'user_id': row.user_id,
+            'username': row.username,
+            'attending': bool(row.attending),
+            'comment': row.comment
+        })
+    
+    return jsonify({
+        'id': rehearsal.id,
+        'rehearsal_id': rehearsal.rehearsal_id,
+        'date': rehearsal.date.strftime('%Y-%m-%d'),
+        'start_time': rehearsal.start_time.strftime('%H:%M') if rehearsal.start_time else None,
+        'end_time': rehearsal.end_time.strftime('%H:%M') if rehearsal.end_time else None,
+        'title': rehearsal.title,
+        'recurring_id': rehearsal.recurring_id,
+        'attending': rehearsal.attending_count,
+        'declined': rehearsal.declined_count,
+        'archived_at': rehearsal.archived_at.strftime('%Y-%m-%d %H:%M:%S') if rehearsal.archived_at else None,
+        'responses': responses
+    }), 200
+
 # Response routes
 # Update these functions in app.py
 
 @app.route('/api/responses', methods=['GET'])
+@read_only
 def get_responses():
     current_user = get_user_from_token()
     
@@ -678,65 +2067,204 @@ def get_responses():
         return jsonify({"msg": "band_id parameter is required"}), 400
     
     # Check if user is member of the band
-    is_member = BandMembership.query.filter_by(
-        user_id=current_user.id, 
-        band_id=band_id
-    ).first() is not None
+    is_member = membership_index.is_member(current_user.id, band_id)
     
     if not (current_user.is_super_admin or is_member):
         return jsonify({"msg": "Access denied"}), 403
-        
+    
     try:
-        # Get responses for rehearsals in this band
-        query = """
-            SELECT r.id, r.user_id, u.username, r.rehearsal_id, 
-                   re.date as rehearsal_date, r.attending, r.comment, 
-                   r.updated_at
-            FROM responses r
-            JOIN users u ON r.user_id = u.id
-            JOIN rehearsals re ON r.rehearsal_id = re.id
-            WHERE re.band_id = :band_id
-        """
+        from_date, to_date, cursor, limit = get_list_window(cursor_shape=(datetime, int, int))
+    except ValueError as e:
+        return jsonify({"msg": f"Invalid window: {str(e)}"}), 400
+    
+    # Answer unchanged data without running the query
+    etag = get_band_etag(band_id)
+    cached = not_modified(etag) or precompressed(etag)
+    if cached:
+        return cached
         
+    try:
         params = {'band_id': band_id}
+        rehearsal_filter = ""
         
         if rehearsal_id:
-            query += " AND r.rehearsal_id = :rehearsal_id"
+            rehearsal_filter += " AND re.id = :rehearsal_id"
             params['rehearsal_id'] = rehearsal_id
+        if from_date:
+            rehearsal_filter += " AND re.date >= :from_date"
+            params['from_date'] = from_date.strftime('%Y-%m-%d')
+        if to_date:
+            rehearsal_filter += " AND re.date < :to_date"
+            params['to_date'] = to_date.strftime('%Y-%m-%d')
+        
+        # Keyset on (rehearsal date, rehearsal id, user id), applied inside
+        # both halves of the union so neither scans past the page
+        stored_keyset = member_keyset = ""
+        if cursor:
+            stored_keyset += " AND (re.date, re.id, r.user_id) > (:cursor_date, :cursor_rehearsal_id, :cursor_user_id)"
+            member_keyset += " AND (re.date, re.id, bm.user_id) > (:cursor_date, :cursor_rehearsal_id, :cursor_user_id)"
+            params['cursor_date'], params['cursor_rehearsal_id'], params['cursor_user_id'] = cursor
+        
+        order_by = " ORDER BY rehearsal_date, rehearsal_id, user_id"
+        
+        # Find where this page ends: the key of its last row, if another row follows
+        page_keys = db.session.execute(text(
+            f"SELECT rehearsal_date, rehearsal_id, user_id "
+            f"FROM ({responses_union_query(rehearsal_filter, stored_keyset, member_keyset)})"
+            f"{order_by} LIMIT 2 OFFSET :offset"
+        ), {**params, 'offset': limit - 1}).fetchall()
+        
+        next_cursor = None
+        if len(page_keys) > 1:
+            # Bounding the page by its last key rather than LIMIT keeps the
+            # cursor right if rows change before the page is read
+            page_end = page_keys[0]
+            stored_keyset += " AND (re.date, re.id, r.user_id) <= (:end_date, :end_rehearsal_id, :end_user_id)"
+            member_keyset += " AND (re.date, re.id, bm.user_id) <= (:end_date, :end_rehearsal_id, :end_user_id)"
+            params['end_date'], params['end_rehearsal_id'], params['end_user_id'] = page_end
+            end_date = page_end.rehearsal_date
+            if not isinstance(end_date, str):
+                end_date = end_date.isoformat(sep=' ')
+            next_cursor = encode_cursor(end_date, page_end.rehearsal_id, page_end.user_id)
+        
+        query = responses_union_query(rehearsal_filter, stored_keyset, member_keyset) + order_by
+        rows = db.session.execute(text(query), params)
+        
+        response = with_etag(stream_json_rows(rows, RESPONSE_ENCODER), etag)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+    except Exception as e:
+        app.logger.error(f"Error in get_responses: {str(e)}")
+        return jsonify({"msg": f"Error retrieving responses: {str(e)}"}), 500
+
+@app.route('/api/responses/changes', methods=['GET'])
+@read_only
+def get_response_changes():
+    """
+    Delta sync: returns the rehearsals, stored responses and new members of a
+    band changed after ?since= (a watermark from a previous call), the
+    tombstones of what was deleted, and the watermark to send next time.
+    Members without a stored response for a rehearsal are implicit "Ja".
+    full_resync is set when there's no usable watermark (none given, or
+    older than the tombstone retention); the client should then reload the
+    band in full and continue from next_since.
+    """
+    current_user = get_user_from_token()
+    
+    if not current_user:
+        return jsonify({"msg": "Authentication required"}), 401
+    
+    band_id = request.args.get('band_id', type=int)
+    
+    if not band_id:
+        return jsonify({"msg": "band_id parameter is required"}), 400
+    
+    if not (current_user.is_super_admin or membership_index.is_member(current_user.id, band_id)):
+        return jsonify({"msg": "Access denied"}), 403
+    
+    since = request.args.get('since')
+    try:
+        since = datetime.fromisoformat(since) if since else None
+    except ValueError:
+        return jsonify({"msg": "since must be a watermark returned by this endpoint"}), 400
+    
+    # Rows committed by transactions still in flight may carry timestamps
+    # slightly in the past, so the next watermark trails the clock
+    now = datetime.utcnow()
+    next_since = now - timedelta(seconds=app.config['SYNC_LAG_SECONDS'])
+    retention_start = now - timedelta(days=app.config['TOMBSTONE_RETENTION_DAYS'])
+    
+    changes = {
+        'since': since.isoformat(sep=' ') if since else None,
+        'next_since': next_since.isoformat(sep=' '),
+        'full_resync': since is None or since < retention_start,
+        'rehearsals': [],
+        'responses': [],
+        'members': [],
+        'deleted': {'rehearsals': [], 'responses': [], 'members': []}
+    }
+    
+    if changes['full_resync']:
+        return jsonify(changes), 200
+    
+    # Never hand out a watermark earlier than the one we were given
+    next_since = max(next_since, since)
+    changes['next_since'] = next_since.isoformat(sep=' ')
+    
+    try:
+        params = {'band_id': band_id, 'since': sql_timestamp(since), 'until': sql_timestamp(next_since)}
+        
+        rehearsals_query = """
+            SELECT id, strftime('%Y-%m-%d', date) AS date,
+                   strftime('%H:%M', start_time) AS start_time,
+                   strftime('%H:%M', end_time) AS end_time,
+                   title, recurring_id
+            FROM rehearsals
+            WHERE band_id = :band_id AND updated_at > :since AND updated_at <= :until
+            ORDER BY date, id
+        """
+        for row in db.session.execute(text(rehearsals_query), params):
+            changes['rehearsals'].append({
+                'id': row.id,
+                'date': row.date,
+                'start_time': row.start_time,
+                'end_time': row.end_time,
+                'title': row.title,
+                'recurring_id': row.recurring_id
+            })
         
-        result = db.session.execute(text(query), params)
-        
-        responses = []
-        for row in result:
-            # Handle the date field safely
-            rehearsal_date = row.rehearsal_date
-            if isinstance(rehearsal_date, str):
-                rehearsal_date_str = rehearsal_date
-            else:
-                rehearsal_date_str = rehearsal_date.strftime('%Y-%m-%d')
-                
-            # Handle updated_at field safely
-            updated_at = row.updated_at
-            if isinstance(updated_at, str):
-                updated_at_str = updated_at
-            else:
-                updated_at_str = updated_at.strftime('%Y-%m-%d %H:%M:%S') if updated_at else None
-                
-            responses.append({
+        responses_query = """
+            SELECT r.id, r.user_id, u.username, r.rehearsal_id, r.attending, r.comment,
+                   strftime('%Y-%m-%d %H:%M:%S', r.updated_at) AS updated_at
+            FROM responses r
+            JOIN rehearsals re ON r.rehearsal_id = re.id
+            JOIN users u ON r.user_id = u.id
+            WHERE re.band_id = :band_id AND r.updated_at > :since AND r.updated_at <= :until
+            ORDER BY r.updated_at, r.id
+        """
+        for row in db.session.execute(text(responses_query), params):
+            changes['responses'].append({
                 'id': row.id,
                 'user_id': row.user_id,
                 'username': row.username,
                 'rehearsal_id': row.rehearsal_id,
-                'rehearsal_date': rehearsal_date_str,
                 'attending': bool(row.attending),
                 'comment': row.comment,
-                'updated_at': updated_at_str
+                'updated_at': row.updated_at
             })
         
-        return jsonify(responses), 200
+        members_query = """
+            SELECT bm.user_id, u.username, bm.role
+            FROM band_memberships bm
+            JOIN users u ON bm.user_id = u.id
+            WHERE bm.band_id = :band_id AND bm.joined_at > :since AND bm.joined_at <= :until
+        """
+        for row in db.session.execute(text(members_query), params):
+            changes['members'].append({'user_id': row.user_id, 'username': row.username, 'role': row.role})
+        
+        tombstones_query = """
+            SELECT entity_type, entity_id, rehearsal_id, user_id
+            FROM tombstones
+            WHERE band_id = :band_id AND deleted_at > :since AND deleted_at <= :until
+            ORDER BY id
+        """
+        for row in db.session.execute(text(tombstones_query), params):
+            if row.entity_type == 'rehearsal':
+                changes['deleted']['rehearsals'].append(row.entity_id)
+            elif row.entity_type == 'response':
+                changes['deleted']['responses'].append({
+                    'id': row.entity_id,
+                    'user_id': row.user_id,
+                    'rehearsal_id': row.rehearsal_id
+                })
+            elif row.entity_type == 'member':
+                changes['deleted']['members'].append(row.user_id)
+        
+        return jsonify(changes), 200
     except Exception as e:
-        app.logger.error(f"Error in get_responses: {str(e)}")
-        return jsonify({"msg": f"Error retrieving responses: {str(e)}"}), 500
+        logger.error(f"Error getting response changes: {str(e)}")
+        return jsonify({"msg": "Failed to retrieve changes"}), 500
 
 @app.route('/api/responses/<int:response_id>', methods=['PUT'])
 def update_response(response_id):
@@ -745,106 +2273,207 @@ def update_response(response_id):
     if not current_user:
         return jsonify({"msg": "Authentication required"}), 401
     
-    band_id = request.args.get('band_id')
+    band_id = request.args.get('band_id', type=int)
     
     if not band_id:
         return jsonify({"msg": "band_id parameter is required"}), 400
     
     # Check if user is member of the band
-    is_member = BandMembership.query.filter_by(
-        user_id=current_user.id, 
-        band_id=band_id
-    ).first() is not None
+    is_member = membership_index.is_member(current_user.id, band_id)
     
     if not (current_user.is_super_admin or is_member):
         return jsonify({"msg": "Access denied"}), 403
     
     try:
-        # Get the response and check if it belongs to a rehearsal in this band
-        response_query = """
-            SELECT r.*, re.band_id
-            FROM responses r
-            JOIN rehearsals re ON r.rehearsal_id = re.id
-            WHERE r.id = :response_id
-        """
-        response_result = db.session.execute(text(response_query), {'response_id': response_id})
-        response_row = response_result.fetchone()
-        
-        if not response_row:
-            return jsonify({"msg": "Response not found"}), 404
-            
-        # Check if the response belongs to a rehearsal in this band
-        if str(response_row.band_id) != str(band_id):
-            return jsonify({"msg": "Response does not belong to this band"}), 403
-        
-        # Only allow users to update their own responses, unless they're an admin
-        is_band_admin = BandMembership.query.filter_by(
-            user_id=current_user.id, 
-            band_id=band_id,
-            role='admin'
-        ).first() is not None
+        updated_row = apply_response_update(current_user, band_id, response_id, request.get_json() or {})
+        if updated_row is None:
+            db.session.rollback()
+            msg, status = explain_response_update_failure(response_id, band_id)
+            return jsonify({"msg": msg}), status
         
-        if response_row.user_id != current_user.id and not (is_band_admin or current_user.is_super_admin):
-            return jsonify({"msg": "You can only update your own responses"}), 403
-        
-        data = request.get_json()
+        bump_band_versions([band_id])
+        db.session.commit()
         
-        # Update the response
-        update_query = "UPDATE responses SET "
-        update_params = {'response_id': response_id}
+        updated_response = UPDATED_RESPONSE_ENCODER.encode(updated_row)
+        publish_band_event(band_id, 'response', updated_response)
         
-        if 'attending' in data:
-            update_query += "attending = :attending, "
-            update_params['attending'] = data['attending']
+        return jsonify(updated_response), 200
         
-        if 'comment' in data:
-            update_query += "comment = :comment, "
-            update_params['comment'] = data['comment']
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error in update_response: {str(e)}")
+        return jsonify({"msg": f"Error updating response: {str(e)}"}), 500
+
+@app.route('/api/responses/batch', methods=['PATCH'])
+def update_responses_batch():
+    """
+    Updates many responses of one band in a single transaction, e.g. a
+    member answering a month of rehearsals at once. Body:
+    {"band_id": .., "responses": [{"id": .., "attending": .., "comment": ..}]}
+    Either every response is updated or, if any is missing or not the
+    caller's to change, none is and the failures are listed.
+    """
+    current_user = get_user_from_token()
+    
+    if not current_user:
+        return jsonify({"msg": "Authentication required"}), 401
+    
+    data = request.get_json() or {}
+    band_id = data.get('band_id') or request.args.get('band_id', type=int)
+    items = data.get('responses')
+    
+    if not band_id:
+        return jsonify({"msg": "band_id is required"}), 400
+    
+    if not items or not isinstance(items, list):
+        return jsonify({"msg": "No responses provided"}), 400
+    
+    if len(items) > app.config['RESPONSE_BATCH_MAX_SIZE']:
+        return jsonify({"msg": f"At most {app.config['RESPONSE_BATCH_MAX_SIZE']} responses per batch"}), 400
+    
+    if not all(isinstance(item, dict) and isinstance(item.get('id'), int) for item in items):
+        return jsonify({"msg": "Every response needs an integer id"}), 400
+    
+    if not (current_user.is_super_admin or membership_index.is_member(current_user.id, band_id)):
+        return jsonify({"msg": "Access denied"}), 403
+    
+    try:
+        updated_rows = []
+        failed = []
+        for item in items:
+            updated_row = apply_response_update(current_user, band_id, item['id'], item)
+            if updated_row is None:
+                failed.append(item['id'])
+            else:
+                updated_rows.append(updated_row)
         
-        update_query += "updated_at = CURRENT_TIMESTAMP WHERE id = :response_id"
+        if failed:
+            db.session.rollback()
+            failures = []
+            for response_id in failed:
+                msg, status = explain_response_update_failure(response_id, band_id)
+                failures.append({'id': response_id, 'msg': msg, 'status': status})
+            return jsonify({"msg": "No responses were updated", "failed": failures}), 400
         
-        db.session.execute(text(update_query), update_params)
+        bump_band_versions([band_id])
         db.session.commit()
         
-        # Get the updated response
-        updated_query = """
-            SELECT r.*, u.username, re.date as rehearsal_date
-            FROM responses r
-            JOIN users u ON r.user_id = u.id
-            JOIN rehearsals re ON r.rehearsal_id = re.id
-            WHERE r.id = :response_id
-        """
-        updated_result = db.session.execute(text(updated_query), {'response_id': response_id})
-        updated_row = updated_result.fetchone()
-        
-        # Format dates for the response
-        rehearsal_date = updated_row.rehearsal_date
-        if isinstance(rehearsal_date, str):
-            rehearsal_date_str = rehearsal_date
-        else:
-            rehearsal_date_str = rehearsal_date.strftime('%Y-%m-%d')
-            
-        updated_at = updated_row.updated_at
-        if isinstance(updated_at, str):
-            updated_at_str = updated_at
-        else:
-            updated_at_str = updated_at.strftime('%Y-%m-%d %H:%M:%S') if updated_at else None
-        
-        return jsonify({
-            'id': updated_row.id,
-            'user_id': updated_row.user_id,
-            'username': updated_row.username,
-            'rehearsal_id': updated_row.rehearsal_id,
-            'rehearsal_date': rehearsal_date_str,
-            'attending': bool(updated_row.attending),
-            'comment': updated_row.comment,
-            'updated_at': updated_at_str
-        }), 200
+        updated_responses = [UPDATED_RESPONSE_ENCODER.encode(row) for row in updated_rows]
+        for updated_response in updated_responses:
+            publish_band_event(band_id, 'response', updated_response)
         
+        return jsonify({'updated': updated_responses}), 200
     except Exception as e:
         db.session.rollback()
-        app.logger.error(f"Error in update_response: {str(e)}")
-        return jsonify({"msg": f"Error updating response: {str(e)}"}), 500
+        app.logger.error(f"Error in update_responses_batch: {str(e)}")
+        return jsonify({"msg": f"Error updating responses: {str(e)}"}), 500
+
+@app.route('/api/audit', methods=['GET'])
+@read_only
+def get_audit_log():
+    """
+    Lists log entries newest first, filtered by any of user_id, band_id,
+    action, entity_type and entity_id, and from/to days. Every filter
+    combination the admin screens use has an index ending in (timestamp,
+    id), so a page, e.g. one rehearsal's history, is a short index range
+    scan however large the table gets. Entries past retention are only in
+    /api/audit/rollups.
+    """
+    current_user = get_user_from_token()
+    
+    if not current_user or not current_user.is_admin:
+        return jsonify({"msg": "Admin privileges required"}), 403
+    
+    try:
+        from_date, to_date, cursor, limit = get_list_window(cursor_shape=(datetime, int))
+    except ValueError as e:
+        return jsonify({"msg": f"Invalid window: {str(e)}"}), 400
+    
+    try:
+        conditions = []
+        params = {'limit': limit + 1}
+        for name, convert in (('user_id', int), ('band_id', int), ('entity_id', int),
+                              ('action', str), ('entity_type', str)):
+            value = request.args.get(name, type=convert)
+            if value is not None:
+                conditions.append(f"le.{name} = :{name}")
+                params[name] = value
+        if from_date:
+            conditions.append("le.timestamp >= :from_date")
+            params['from_date'] = sql_timestamp(from_date)
+        if to_date:
+            conditions.append("le.timestamp < :to_date")
+            params['to_date'] = sql_timestamp(to_date)
+        if cursor:
+            conditions.append("(le.timestamp, le.id) < (:cursor_timestamp, :cursor_id)")
+            params['cursor_timestamp'], params['cursor_id'] = cursor
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = db.session.execute(text(f"""
+            SELECT le.id, le.user_id, u.username, le.action, le.entity_type, le.entity_id,
+                   le.band_id, le.old_value, le.new_value, le.timestamp
+            FROM log_entries le
+            LEFT JOIN users u ON le.user_id = u.id
+            {where}
+            ORDER BY le.timestamp DESC, le.id DESC
+            LIMIT :limit
+        """), params).fetchall()
+        
+        # One row past the page tells whether there is a next one
+        response = stream_json_rows(rows[:limit], AUDIT_ENCODER)
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            last_timestamp = last.timestamp if isinstance(last.timestamp, str) else sql_timestamp(last.timestamp)
+            response.headers['X-Next-Cursor'] = encode_cursor(last_timestamp, last.id)
+        return response, 200
+    except Exception as e:
+        logger.error(f"Error getting audit log: {str(e)}")
+        return jsonify({"msg": "Failed to get audit log"}), 500
+
+@app.route('/api/audit/rollups', methods=['GET'])
+@read_only
+def get_audit_rollups():
+    """Daily entry counts for log entries past retention, optionally for one band, between from/to days"""
+    current_user = get_user_from_token()
+    
+    if not current_user or not current_user.is_admin:
+        return jsonify({"msg": "Admin privileges required"}), 403
+    
+    try:
+        from_date, to_date, _, _ = get_list_window(cursor_shape=())
+    except ValueError as e:
+        return jsonify({"msg": f"Invalid window: {str(e)}"}), 400
+    
+    query = db.session.query(
+        AuditRollup.day, AuditRollup.band_id, AuditRollup.user_id,
+        AuditRollup.action, AuditRollup.entity_type, AuditRollup.entries
+    ).order_by(AuditRollup.day, AuditRollup.id)
+    
+    band_id = request.args.get('band_id', type=int)
+    if band_id:
+        query = query.filter(AuditRollup.band_id == band_id)
+    if from_date:
+        query = query.filter(AuditRollup.day >= from_date.date())
+    if to_date:
+        query = query.filter(AuditRollup.day < to_date.date())
+    
+    return stream_json_rows(query, AUDIT_ROLLUP_ENCODER), 200
+
+@app.route('/api/admin/stats', methods=['GET'])
+def get_stats():
+    """Runtime statistics for the in-process caches"""
+    current_user = get_user_from_token()
+    
+    if not current_user or not current_user.is_admin:
+        return jsonify({"msg": "Admin privileges required"}), 403
+    
+    return jsonify({
+        'principal_cache': principal_cache.stats(),
+        'membership_index': membership_index.stats(),
+        'event_hub': event_hub.stats(),
+        'compression': response_compressor.stats(),
+        'audit_log': audit_log.stats()
+    }), 200
 
 @app.route('/api/email/send', methods=['POST'])
 def trigger_email():
@@ -863,6 +2492,7 @@ def trigger_email():
         return jsonify({"msg": "Failed to send email"}), 500
 
 @app.route('/api/users/<int:user_id>', methods=['GET'])
+@read_only
 def get_user(user_id):
     try:
         current_user = get_user_from_token()
@@ -924,7 +2554,10 @@ def update_user(user_id):
         if data.get('password'):
             user.set_password(data.get('password'))
         
+        # Usernames appear in every band listing the user is part of
+        bump_band_versions(user_id=user.id)
         db.session.commit()
+        principal_cache.invalidate(user.id)
         
         return jsonify({
             'id': user.id,
@@ -953,12 +2586,29 @@ def delete_user(user_id):
         
         user = User.query.get_or_404(user_id)
         
+        record_tombstones('response', """
+            SELECT re.band_id, r.id AS entity_id, r.rehearsal_id, r.user_id
+            FROM responses r JOIN rehearsals re ON r.rehearsal_id = re.id
+            WHERE r.user_id = :user_id
+        """, {'user_id': user_id})
+        record_tombstones('member', """
+            SELECT band_id, id AS entity_id, NULL AS rehearsal_id, user_id
+            FROM band_memberships WHERE user_id = :user_id
+        """, {'user_id': user_id})
+        
         # Delete all responses for this user
         Response.query.filter_by(user_id=user_id).delete()
         
+        # Before the memberships go, so their bands are still found
+        bump_band_versions(user_id=user_id)
+        member_band_ids = [m.band_id for m in BandMembership.query.filter_by(user_id=user_id)]
+        
         # Delete the user
         db.session.delete(user)
+        refresh_band_counters(member_band_ids)
         db.session.commit()
+        principal_cache.invalidate(user_id)
+        membership_index.discard(user_id)
         
         return jsonify({"msg": "User deleted successfully"}), 200
     except Exception as e:
@@ -966,80 +2616,169 @@ def delete_user(user_id):
         db.session.rollback()
         return jsonify({"msg": "Failed to delete user"}), 500
 
-# Optional: Add a route for bulk creating rehearsals
+# Bulk rehearsal import
+def iter_bulk_items(data):
+    """
+    Yields the raw items of a bulk import, either from the 'dates' list of a
+    JSON body or lazily, line by line, from an NDJSON (application/x-ndjson)
+    body so large imports are never fully loaded into memory.
+    """
+    if data is not None:
+        for item in data.get('dates', []):
+            yield item
+        return
+
+    for raw_line in request.stream:
+        line = raw_line.decode('utf-8').strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line  # Reported back as skipped
+
+def parse_bulk_item(item):
+    """Turns a bulk item (a date string or an object) into rehearsal fields"""
+    if isinstance(item, str):
+        item = {'date': item}
+    if not isinstance(item, dict):
+        raise ValueError("Unsupported item")
+
+    return {
+        'date': datetime.strptime(item.get('date'), '%Y-%m-%d'),
+        'start_time': datetime.strptime(item.get('start_time') or '19:00', '%H:%M').time(),
+        'end_time': datetime.strptime(item.get('end_time') or '20:00', '%H:%M').time(),
+        'title': item.get('title') or "Rehearsal"
+    }
+
+def import_rehearsal_chunk(band_id, items, seen_dates, user_id):
+    """
+    Validates, dedupes and inserts one chunk of a bulk import and commits it,
+    so the SQLite write lock is only held for the duration of one chunk.
+    """
+    created = []
+    skipped = []
+
+    parsed_items = []
+    for item in items:
+        try:
+            parsed_items.append(parse_bulk_item(item))
+        except (ValueError, TypeError):
+            skipped.append(item.get('date') if isinstance(item, dict) else item)
+
+    if parsed_items:
+        dates = [fields['date'].date() for fields in parsed_items]
+        existing_dates = get_existing_rehearsal_dates(band_id, min(dates), max(dates))
+
+        new_rehearsals = []
+        for fields in parsed_items:
+            date_str = fields['date'].strftime('%Y-%m-%d')
+
+            # Skip dates that already have a rehearsal or repeat earlier in the import
+            if date_str in existing_dates or date_str in seen_dates:
+                skipped.append(date_str)
+                continue
+            seen_dates.add(date_str)
+
+            new_rehearsal = Rehearsal(band_id=band_id, **fields)
+            db.session.add(new_rehearsal)
+            new_rehearsals.append(new_rehearsal)
+
+        if new_rehearsals:
+            db.session.flush()  # Get IDs without committing
+
+            # Create default "Ja" responses for all band members
+            create_default_responses([r.id for r in new_rehearsals])
+
+            for new_rehearsal in new_rehearsals:
+                created.append({
+                    'id': new_rehearsal.id,
+                    'date': new_rehearsal.date.strftime('%Y-%m-%d')
+                })
+
+            bump_band_versions([band_id])
+            adjust_upcoming_rehearsal_count(band_id, sum(is_upcoming(r.date) for r in new_rehearsals))
+
+    db.session.commit()
+    if created:
+        # Log the chunk as a whole rather than one entry per date
+        audit_log.record(
+            user_id=user_id,
+            action="bulk_create",
+            entity_type="rehearsal",
+            entity_id=created[0]['id'],
+            new_value=f"Created {len(created)} rehearsals: {created[0]['date']} to {created[-1]['date']}",
+            band_id=band_id
+        )
+        publish_band_event(band_id, 'rehearsals', {'action': 'created', 'ids': [r['id'] for r in created]})
+    return created, skipped
+
 @app.route('/api/rehearsals/bulk', methods=['POST'])
 def create_rehearsals_bulk():
+    """
+    Bulk-creates rehearsals from a JSON body ({"band_id": .., "dates": [..]})
+    or from an NDJSON body with one date string or rehearsal object per line,
+    in which case band_id goes in the query string. Items are validated,
+    deduplicated and committed in chunks of ?chunk_size= so other writers
+    get the database between chunks.
+    """
     try:
         current_user = get_user_from_token()
-        
+
         if not current_user or not current_user.is_admin:
             return jsonify({"msg": "Admin privileges required"}), 403
-        
-        data = request.get_json()
-        dates = data.get('dates', [])
-        
-        if not dates:
+
+        # NDJSON bodies are read lazily, everything else is treated as JSON
+        data = None if request.mimetype == 'application/x-ndjson' else (request.get_json() or {})
+        band_id = (data or {}).get('band_id') or request.args.get('band_id', type=int)
+
+        if data is not None and not data.get('dates'):
             return jsonify({"msg": "No dates provided"}), 400
-        
+
+        if not band_id:
+            return jsonify({"msg": "band_id is required"}), 400
+
+        chunk_size = request.args.get('chunk_size', app.config['BULK_CHUNK_SIZE'], type=int)
+        chunk_size = max(1, min(chunk_size, app.config['BULK_MAX_CHUNK_SIZE']))
+
         created_rehearsals = []
         skipped_dates = []
-        
-        for date_str in dates:
+        failed_dates = []
+        chunks = []
+        seen_dates = set()
+
+        items = iter_bulk_items(data)
+        while True:
+            chunk = list(islice(items, chunk_size))
+            if not chunk:
+                break
+
+            summary = {'chunk': len(chunks) + 1, 'received': len(chunk)}
             try:
-                date = datetime.strptime(date_str, '%Y-%m-%d')
-                
-                # Check if rehearsal already exists on this date
-                existing = Rehearsal.query.filter(
-                    db.func.date(Rehearsal.date) == date.date()
-                ).first()
-                
-                if existing:
-                    skipped_dates.append(date_str)
-                    continue
-                
-                # Create default times if not specified
-                start_time = datetime.strptime('19:00', '%H:%M').time()
-                end_time = datetime.strptime('20:00', '%H:%M').time()
-                
-                new_rehearsal = Rehearsal(
-                    date=date,
-                    start_time=start_time,
-                    end_time=end_time,
-                    title="Rehearsal"
-                )
-                db.session.add(new_rehearsal)
-                
-                # Create default "Ja" responses for all users
-                users = User.query.all()
-                for user in users:
-                    response = Response(user=user, rehearsal=new_rehearsal, attending=True)
-                    db.session.add(response)
-                
-                db.session.flush()  # Get ID without committing
-                
-                created_rehearsals.append({
-                    'id': new_rehearsal.id,
-                    'date': new_rehearsal.date.strftime('%Y-%m-%d')
-                })
-                
-                # Log the creation
-                log = LogEntry(
-                    user_id=current_user.id,
-                    action="create",
-                    entity_type="rehearsal",
-                    entity_id=new_rehearsal.id,
-                    new_value=date_str
-                )
-                db.session.add(log)
-                
-            except ValueError:
-                skipped_dates.append(date_str)
-        
-        db.session.commit()
-        
+                created, skipped = import_rehearsal_chunk(band_id, chunk, seen_dates, current_user.id)
+                created_rehearsals.extend(created)
+                skipped_dates.extend(skipped)
+                summary.update(status='committed', created=len(created), skipped=len(skipped))
+            except Exception as e:
+                # Earlier chunks stay committed; report this one and carry on
+                db.session.rollback()
+                logger.error(f"Error importing bulk chunk {summary['chunk']}: {str(e)}")
+                failed_dates.extend(item.get('date') if isinstance(item, dict) else item for item in chunk)
+                summary.update(status='failed', created=0, skipped=0)
+            chunks.append(summary)
+
+            # Give writers queued behind the SQLite lock a chance to get in
+            if app.config['BULK_CHUNK_PAUSE']:
+                pytime.sleep(app.config['BULK_CHUNK_PAUSE'])
+
+        if not chunks:
+            return jsonify({"msg": "No dates provided"}), 400
+
         return jsonify({
             'created': created_rehearsals,
-            'skipped': skipped_dates
+            'skipped': skipped_dates,
+            'failed': failed_dates,
+            'chunks': chunks
         }), 201
     except Exception as e:
         logger.error(f"Error creating bulk rehearsals: {str(e)}")
@@ -1089,6 +2828,7 @@ def create_rehearsals_bulk():
 #     }), 201
 
 @app.route('/api/invitations', methods=['GET'])
+@read_only
 def get_invitations():
     current_user = get_user_from_token()
     
@@ -1210,29 +2950,31 @@ def create_invitation():
     # Create new invitation
     invitation = Invitation(email=email, created_by=current_user.id)
     db.session.add(invitation)
+    db.session.flush()
+    # Read before the commit expires them; reloading afterwards would open a
+    # new transaction (and take the write lock) for the whole email send
+    invitation_id, token, expires_at = invitation.id, invitation.token, invitation.expires_at
     db.session.commit()
     
     # # Send invitation email
     # email_sent = send_invitation_email(email, invitation.token, app_url=request.host_url.rstrip('/'))
     # Send invitation email
-    email_sent = send_invitation_email(email, invitation.token, app_url=os.environ.get('APP_URL', 'http://localhost:3000'))
+    email_sent = send_invitation_email(email, token, app_url=os.environ.get('APP_URL', 'http://localhost:3000'))
     
     # Log the invitation
-    log = LogEntry(
+    audit_log.record(
         user_id=current_user.id,
         action="create",
         entity_type="invitation",
-        entity_id=invitation.id,
-        new_value=f"Email: {email}, Token: {invitation.token}, Email Sent: {email_sent}"
+        entity_id=invitation_id,
+        new_value=f"Email: {email}, Token: {token}, Email Sent: {email_sent}"
     )
-    db.session.add(log)
-    db.session.commit()
     
     return jsonify({
-        'id': invitation.id,
-        'email': invitation.email,
-        'token': invitation.token,
-        'expires_at': invitation.expires_at.isoformat(),
+        'id': invitation_id,
+        'email': email,
+        'token': token,
+        'expires_at': expires_at.isoformat(),
         'email_sent': email_sent
     }), 201
 
@@ -1271,73 +3013,87 @@ def create_response():
     if not current_user:
         return jsonify({"msg": "Authentication required"}), 401
     
-    data = request.get_json()
+    data = request.get_json() or {}
     user_id = data.get('user_id')
     rehearsal_id = data.get('rehearsal_id')
     attending = data.get('attending', True)
     
-    # Check if the user exists
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"msg": "User not found"}), 404
-    
-    # Check if the rehearsal exists
-    rehearsal = Rehearsal.query.get(rehearsal_id)
-    if not rehearsal:
-        return jsonify({"msg": "Rehearsal not found"}), 404
-    
-    # Check if a response already exists
-    existing_response = Response.query.filter_by(
-        user_id=user_id, 
-        rehearsal_id=rehearsal_id
-    ).first()
-    
-    if existing_response:
-        return jsonify({
-            "msg": "Response already exists",
-            "id": existing_response.id,
-            "user_id": existing_response.user_id,
-            "username": existing_response.user.username,
-            "rehearsal_id": existing_response.rehearsal_id,
-            "rehearsal_date": existing_response.rehearsal.date.strftime('%Y-%m-%d'),
-            "attending": existing_response.attending,
-            "comment": existing_response.comment,
-            "updated_at": existing_response.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-        }), 200
-
-    # Create a new response
-    new_response = Response(
-        user_id=user_id,
-        rehearsal_id=rehearsal_id,
-        attending=attending
-    )
-    
-    db.session.add(new_response)
-    db.session.commit()
-    
-    # Log the creation
-    log = LogEntry(
-        user_id=current_user.id,
-        action="create",
-        entity_type="response",
-        entity_id=new_response.id,
-        new_value=f"Attending: {'Ja' if attending else 'Nej'}"
-    )
-    db.session.add(log)
-    db.session.commit()
-    
-    return jsonify({
-        "id": new_response.id,
-        "user_id": new_response.user_id,
-        "username": new_response.user.username,
-        "rehearsal_id": new_response.rehearsal_id,
-        "rehearsal_date": new_response.rehearsal.date.strftime('%Y-%m-%d'),
-        "attending": new_response.attending,
-        "comment": new_response.comment,
-        "updated_at": new_response.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-    }), 201
+    try:
+        # Insert, or on a conflict (a double click, or an implicit default
+        # answered from two tabs) apply the answer to the response that's
+        # already there; either way the unique constraint can't trip. The
+        # insert is guarded like GUARDED_RESPONSE_UPDATE: the user must be in
+        # the rehearsal's band, and the caller must be that user, a band
+        # admin or a super admin.
+        row = db.session.execute(text("""
+            INSERT INTO responses (user_id, rehearsal_id, attending, updated_at)
+            SELECT u.id, re.id, :attending, :stamp
+            FROM users u
+            JOIN rehearsals re ON re.id = :rehearsal_id
+            JOIN band_memberships target ON target.user_id = u.id AND target.band_id = re.band_id
+            WHERE u.id = :user_id
+              AND (u.id = :current_user_id OR :is_super_admin OR EXISTS (
+                  SELECT 1 FROM band_memberships bm
+                  WHERE bm.band_id = re.band_id AND bm.user_id = :current_user_id AND bm.role = 'admin'
+              ))
+            ON CONFLICT (user_id, rehearsal_id) DO NOTHING
+            RETURNING id, user_id, rehearsal_id, attending, comment,
+                strftime('%Y-%m-%d %H:%M:%S', updated_at) AS updated_at,
+                (SELECT u.username FROM users u WHERE u.id = responses.user_id) AS username,
+                (SELECT strftime('%Y-%m-%d', re.date) FROM rehearsals re WHERE re.id = responses.rehearsal_id) AS rehearsal_date,
+                (SELECT re.band_id FROM rehearsals re WHERE re.id = responses.rehearsal_id) AS band_id
+        """), {'user_id': user_id, 'rehearsal_id': rehearsal_id, 'attending': bool(attending),
+               'current_user_id': current_user.id, 'is_super_admin': bool(current_user.is_super_admin),
+               'stamp': sql_timestamp(datetime.utcnow())}).fetchone()
+        
+        if row is None:
+            existing = db.session.execute(text("""
+                SELECT r.id, re.band_id FROM responses r JOIN rehearsals re ON r.rehearsal_id = re.id
+                WHERE r.user_id = :user_id AND r.rehearsal_id = :rehearsal_id
+            """), {'user_id': user_id, 'rehearsal_id': rehearsal_id}).fetchone()
+            if existing is None:
+                db.session.rollback()
+                msg, status = explain_response_create_failure(user_id, rehearsal_id)
+                return jsonify({"msg": msg}), status
+            
+            # Same permission check as PUT /api/responses/<id>
+            updated_row = apply_response_update(current_user, existing.band_id, existing.id,
+                                                {'attending': bool(attending)})
+            if updated_row is None:
+                db.session.rollback()
+                msg, status = explain_response_update_failure(existing.id, existing.band_id)
+                return jsonify({"msg": msg}), status
+            
+            bump_band_versions([existing.band_id])
+            db.session.commit()
+            
+            response_data = UPDATED_RESPONSE_ENCODER.encode(updated_row)
+            publish_band_event(existing.band_id, 'response', response_data)
+            return jsonify({"msg": "Response already exists", **response_data}), 200
+        
+        response_data = UPDATED_RESPONSE_ENCODER.encode(row)
+        
+        bump_band_versions([row.band_id])
+        db.session.commit()
+        
+        audit_log.record(
+            user_id=current_user.id,
+            action="create",
+            entity_type="response",
+            entity_id=row.id,
+            new_value=f"Attending: {'Ja' if attending else 'Nej'}",
+            band_id=row.band_id
+        )
+        publish_band_event(row.band_id, 'response', response_data)
+        
+        return jsonify(response_data), 201
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating response: {str(e)}")
+        return jsonify({"msg": "Failed to create response"}), 500
 
 @app.route('/api/users/profile', methods=['GET'])
+@read_only
 def get_user_profile():
     current_user = get_user_from_token()
     
@@ -1373,6 +3129,7 @@ def get_user_profile():
     }), 200
 
 @app.route('/api/bands', methods=['GET'])
+@read_only
 def get_bands():
     current_user = get_user_from_token()
     
@@ -1380,71 +3137,49 @@ def get_bands():
         return jsonify({"msg": "Authentication required"}), 401
     
     try:
+        # The list changes whenever one of its bands, or the user's memberships, do
+        if current_user.is_super_admin:
+            versions_query = "SELECT id, version, NULL AS role FROM bands ORDER BY id"
+        else:
+            versions_query = """
+                SELECT b.id, b.version, bm.role
+                FROM bands b
+                JOIN band_memberships bm ON b.id = bm.band_id
+                WHERE bm.user_id = :user_id
+                ORDER BY b.id
+            """
+        versions = db.session.execute(text(versions_query), {'user_id': current_user.id}).fetchall()
+        etag = 'bands-' + hashlib.sha256(repr([tuple(row) for row in versions]).encode('utf-8')).hexdigest()[:32]
+        cached = not_modified(etag) or precompressed(etag)
+        if cached:
+            return cached
+        
         # Super admin sees all bands
         if current_user.is_super_admin:
             bands_query = """
                 SELECT b.id, b.name, b.description, b.created_at, b.created_by, 
                        u.username as creator_name,
-                       (SELECT COUNT(*) FROM band_memberships WHERE band_id = b.id) as member_count
+                       b.member_count, b.upcoming_rehearsal_count,
+                       'super_admin' as role
                 FROM bands b
                 LEFT JOIN users u ON b.created_by = u.id
             """
             result = db.session.execute(text(bands_query))
-            bands = []
-            for row in result:
-                # Handle created_at properly regardless of its type
-                if row.created_at is None:
-                    created_at_str = None
-                elif isinstance(row.created_at, str):
-                    created_at_str = row.created_at  # Already a string
-                else:
-                    created_at_str = row.created_at.strftime('%Y-%m-%d')
-                    
-                bands.append({
-                    'id': row.id,
-                    'name': row.name,
-                    'description': row.description,
-                    'created_at': created_at_str,
-                    'created_by': row.created_by,
-                    'creator_name': row.creator_name,
-                    'member_count': row.member_count,
-                    'role': 'super_admin'  # Super admin role for all bands
-                })
         else:
             # Regular users see only their bands with their role
             memberships_query = """
                 SELECT b.id, b.name, b.description, b.created_at, b.created_by,
                        u.username as creator_name, 
                        bm.role,
-                       (SELECT COUNT(*) FROM band_memberships WHERE band_id = b.id) as member_count
+                       b.member_count, b.upcoming_rehearsal_count
                 FROM bands b
                 JOIN band_memberships bm ON b.id = bm.band_id
                 LEFT JOIN users u ON b.created_by = u.id
                 WHERE bm.user_id = :user_id
             """
             result = db.session.execute(text(memberships_query), {'user_id': current_user.id})
-            bands = []
-            for row in result:
-                # Handle created_at properly regardless of its type
-                if row.created_at is None:
-                    created_at_str = None
-                elif isinstance(row.created_at, str):
-                    created_at_str = row.created_at  # Already a string
-                else:
-                    created_at_str = row.created_at.strftime('%Y-%m-%d')
-                    
-                bands.append({
-                    'id': row.id,
-                    'name': row.name,
-                    'description': row.description,
-                    'created_at': created_at_str,
-                    'created_by': row.created_by,
-                    'creator_name': row.creator_name,
-                    'role': row.role,
-                    'member_count': row.member_count
-                })
         
-        return jsonify(bands), 200
+        return with_etag(stream_json_rows(result, BAND_ENCODER), etag), 200
     except Exception as e:
         app.logger.error(f"Error in get_bands: {str(e)}")
         return jsonify({"msg": f"Error retrieving bands: {str(e)}"}), 500
@@ -1491,8 +3226,10 @@ def create_band():
             text(insert_membership_query),
             {'user_id': current_user.id, 'band_id': band_id}
         )
+        refresh_band_counters([band_id])
         
         db.session.commit()
+        membership_index.invalidate()
         
         return jsonify({
             'id': band_id,
@@ -1516,11 +3253,7 @@ def add_band_member(band_id):
         return jsonify({"msg": "Authentication required"}), 401
     
     # Check if current user is band admin or super admin
-    is_band_admin = BandMembership.query.filter_by(
-        user_id=current_user.id, 
-        band_id=band_id,
-        role='admin'
-    ).first() is not None
+    is_band_admin = membership_index.is_admin(current_user.id, band_id)
     
     if not (current_user.is_super_admin or is_band_admin):
         return jsonify({"msg": "Admin privileges required"}), 403
@@ -1544,7 +3277,9 @@ def add_band_member(band_id):
         # Update role if different
         if existing.role != role:
             existing.role = role
+            bump_band_versions([band_id])
             db.session.commit()
+            membership_index.invalidate()
             
         return jsonify({
             'id': existing.id,
@@ -1560,7 +3295,11 @@ def add_band_member(band_id):
         role=role
     )
     db.session.add(membership)
+    bump_band_versions([band_id])
+    refresh_band_counters([band_id])
     db.session.commit()
+    membership_index.invalidate()
+    publish_band_event(band_id, 'members', {'action': 'added', 'user_id': user_id})
     
     return jsonify({
         'id': membership.id,
@@ -0,0 +1,190 @@
+# audit_log.py
+import atexit
+import logging
+from collections import deque
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """
+    Queues audit log entries in memory and writes them in batches from a
+    background thread, so request handlers don't pay for a commit of their own.
+
+    write(entries) is called with a list of dicts and must insert them in one
+    transaction. The queue is bounded: when the writer falls behind, record()
+    blocks for up to put_timeout seconds and then writes the entry itself, so
+    callers slow down rather than memory growing without limit.
+
+    A batch that still fails after its retries (the database is down, say) is
+    kept in a retry buffer of up to retry_limit entries and written again on
+    the writer's next rounds. Whatever is still queued or buffered at
+    interpreter exit gets one last attempt from an atexit hook. Entries are
+    only dropped when the buffer overflows or that last attempt fails, and
+    each such loss is logged at ERROR with its count.
+    """
+
+    def __init__(self, write, queue_size=10000, batch_size=200, flush_interval=1.0,
+                 put_timeout=5.0, retries=3, retry_limit=10000):
+        self._write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.retries = retries
+        self.retry_limit = retry_limit
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._held = deque()  # Entries of failed batches, oldest first
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._pid = None
+        self._stopping = False
+        self.recorded = 0
+        self.written = 0
+        self.batches = 0
+        self.inline_writes = 0
+        self.dropped = 0
+        atexit.register(self.close)
+
+    def record(self, user_id, action, entity_type, entity_id=None, old_value=None, new_value=None,
+               band_id=None):
+        entry = {
+            'user_id': user_id,
+            'action': action,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'band_id': band_id,
+            'old_value': old_value,
+            'new_value': new_value,
+            'timestamp': datetime.utcnow()
+        }
+        with self._lock:
+            self.recorded += 1
+        if self._stopping or not self._ensure_running():
+            self._write_batch([entry])
+            return
+        try:
+            self._queue.put(entry, timeout=self.put_timeout)
+        except queue.Full:
+            # Backpressure: the writer is this far behind, write it here
+            with self._lock:
+                self.inline_writes += 1
+            self._write_batch([entry])
+
+    def _ensure_running(self):
+        # Threads don't survive a fork, so each worker process starts its own
+        with self._lock:
+            if self._pid == os.getpid():
+                return True
+            try:
+                threading.Thread(target=self._run, name='audit-log-writer', daemon=True).start()
+            except RuntimeError:
+                return False  # Interpreter shutting down
+            self._pid = os.getpid()
+            return True
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(timeout=self.flush_interval)
+            if batch:
+                self._write_queued(batch)
+            self._retry_held()
+
+    def _take_batch(self, timeout=None):
+        """Waits up to timeout for a first entry, then takes whatever else is queued up to batch_size"""
+        try:
+            batch = [self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_queued(self, batch):
+        try:
+            self._write_batch(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_batch(self, batch, retried=False):
+        """Writes the batch, keeping it for a later retry if every attempt fails"""
+        # Serialised so a flush() and the writer thread don't race for the SQLite write lock
+        with self._write_lock:
+            for attempt in range(self.retries):
+                try:
+                    self._write(batch)
+                    with self._lock:
+                        self.written += len(batch)
+                        self.batches += 1
+                    return True
+                except Exception as e:
+                    logger.error(f"Error writing {len(batch)} audit log entries (attempt {attempt + 1}): {str(e)}")
+                    time.sleep(0.1 * 2 ** attempt)
+        self._hold(batch, retried)
+        return False
+
+    def _hold(self, batch, retried=False):
+        with self._lock:
+            if retried:
+                self._held.extendleft(reversed(batch))  # Back in front of newer failures
+            else:
+                self._held.extend(batch)
+            overflow = max(len(self._held) - self.retry_limit, 0)
+            for _ in range(overflow):
+                self._held.popleft()
+            self.dropped += overflow
+            held = len(self._held)
+        if overflow:
+            logger.error(f"Audit log retry buffer full: dropped the {overflow} oldest entries")
+        logger.error(f"Keeping {len(batch)} audit log entries to retry ({held} waiting)")
+
+    def _retry_held(self):
+        """Writes the retry buffer a batch at a time, stopping at the first batch that fails again"""
+        while True:
+            # Taken and written under the write lock, so a flush() waits for a
+            # retry the writer thread has in hand, and batches can't overtake
+            with self._write_lock:
+                with self._lock:
+                    batch = [self._held.popleft() for _ in range(min(self.batch_size, len(self._held)))]
+                if not batch or not self._write_batch(batch, retried=True):
+                    return
+
+    def flush(self):
+        """Writes everything queued so far, including a batch the writer thread holds, before returning"""
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                break
+            self._write_queued(batch)
+        self._queue.join()
+        self._retry_held()
+
+    def close(self):
+        self._stopping = True
+        self.flush()
+        with self._lock:
+            lost = len(self._held)
+            self._held.clear()
+            self.dropped += lost
+        if lost:
+            logger.error(f"Dropped {lost} audit log entries that could not be written before exit")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'recorded': self.recorded,
+                'written': self.written,
+                'batches': self.batches,
+                'inline_writes': self.inline_writes,
+                'held': len(self._held),
+                'dropped': self.dropped
+            }
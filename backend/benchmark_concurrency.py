@@ -0,0 +1,183 @@
+# benchmark_concurrency.py
+# Runs concurrent readers (schedule and response listings) and writers
+# (response toggles and batch updates) against the app for a few seconds,
+# once with the old SQLite settings (rollback journal, driver-managed
+# transactions, one engine) and once with the current profile (WAL, pragmas,
+# BEGIN IMMEDIATE for writers, separate read engine), and reports lock
+# errors and latency percentiles for both.
+#
+# Each profile runs in its own process on a throwaway SQLite database, never
+# the real one:
+#   python benchmark_concurrency.py [seconds] [readers] [writers]
+
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+PROFILES = {
+    'before': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_MMAP_SIZE': '0',
+        'SQLITE_CACHE_SIZE': '-2000',
+        'SQLITE_BEGIN': '',
+        'SQLITE_READ_ENGINE': 'false'
+    },
+    'after': {}  # The defaults in app.py
+}
+
+MEMBERS = 30
+REHEARSALS = 20
+
+
+class LockErrorCounter(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        if 'locked' in record.getMessage():
+            self.count += 1
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_profile(seconds, readers, writers):
+    """Runs in the child process, with the profile in the environment"""
+    import app as app_module
+    from app import app
+    from flask_jwt_extended import create_access_token
+    from models import Band, BandMembership, Rehearsal, Response, User, db
+
+    lock_errors = LockErrorCounter()
+    logging.getLogger().addHandler(lock_errors)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    with app.app_context():
+        db.create_all()
+        users = [User(username=f'bench-{i}', email=f'bench-{i}@example.com', password_hash='x')
+                 for i in range(MEMBERS)]
+        db.session.add_all(users)
+        db.session.flush()
+        band = Band(name='Bench band', created_by=users[0].id)
+        db.session.add(band)
+        db.session.flush()
+        db.session.add_all([BandMembership(user_id=u.id, band_id=band.id, role='member') for u in users])
+        rehearsals = [Rehearsal(date=datetime(2030, 1, 7) + timedelta(weeks=week), title='Bench', band_id=band.id)
+                      for week in range(REHEARSALS)]
+        db.session.add_all(rehearsals)
+        db.session.flush()
+        db.session.add_all([Response(user_id=u.id, rehearsal_id=r.id, attending=True)
+                            for u in users for r in rehearsals])
+        db.session.commit()
+        app_module.database_ready.set()
+
+        band_id = band.id
+        headers = [{'Authorization': 'Bearer ' + create_access_token(identity=str(u.id))} for u in users]
+        own_responses = {
+            index: [row.id for row in Response.query.filter_by(user_id=u.id)]
+            for index, u in enumerate(users)
+        }
+
+    deadline = time.perf_counter() + seconds
+    results = {'read': [], 'write': []}
+    failures = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+
+    def reader(number):
+        client = app.test_client()
+        paths = [f'/api/bands/{band_id}/schedule', f'/api/responses?band_id={band_id}']
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = client.get(paths[number % 2], headers=headers[number % MEMBERS])
+            response.get_data()
+            elapsed = time.perf_counter() - started
+            with lock:
+                results['read'].append(elapsed)
+                failures['read'] += response.status_code != 200
+
+    def writer(number):
+        client = app.test_client()
+        index = number % MEMBERS
+        rng = random.Random(number)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if rng.random() < 0.8:
+                response = client.put(
+                    f'/api/responses/{rng.choice(own_responses[index])}?band_id={band_id}',
+                    json={'attending': rng.random() < 0.5}, headers=headers[index]
+                )
+            else:
+                response = client.patch('/api/responses/batch', json={
+                    'band_id': band_id,
+                    'responses': [{'id': response_id, 'attending': rng.random() < 0.5}
+                                  for response_id in own_responses[index][:8]]
+                }, headers=headers[index])
+            response.get_data()
+            elapsed = time.perf_counter() - started
+            with lock:
+                results['write'].append(elapsed)
+                failures['write'] += response.status_code != 200
+
+    threads = ([threading.Thread(target=reader, args=(n,)) for n in range(readers)] +
+               [threading.Thread(target=writer, args=(n,)) for n in range(writers)])
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = {'lock_errors': lock_errors.count}
+    for kind, timings in results.items():
+        summary[kind] = {
+            'requests': len(timings),
+            'failed': failures[kind],
+            'p50_ms': percentile(timings, 0.50) * 1000,
+            'p99_ms': percentile(timings, 0.99) * 1000
+        }
+    print(json.dumps(summary))
+
+
+def run(seconds, readers, writers):
+    print(f"{seconds}s, {readers} readers, {writers} writers, {MEMBERS} members x {REHEARSALS} rehearsals")
+    print(f"{'profile':>8} {'kind':>6} {'requests':>9} {'failed':>7} {'p50 (ms)':>9} {'p99 (ms)':>9} {'lock errors':>12}")
+    for name, settings in PROFILES.items():
+        db_fd, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(db_fd)
+        env = {**os.environ, **settings, 'DATABASE_URL': f'sqlite:///{db_path}', 'EVENTS_SOCKET_DIR': ''}
+        try:
+            output = subprocess.run(
+                [sys.executable, __file__, '--profile', str(seconds), str(readers), str(writers)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+        finally:
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+        summary = json.loads(output.strip().splitlines()[-1])
+        for kind in ('read', 'write'):
+            stats = summary[kind]
+            print(f"{name:>8} {kind:>6} {stats['requests']:>9} {stats['failed']:>7} "
+                  f"{stats['p50_ms']:>9.1f} {stats['p99_ms']:>9.1f} "
+                  f"{summary['lock_errors'] if kind == 'write' else '':>12}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--profile']:
+        run_profile(*(float(sys.argv[2]),) + tuple(int(arg) for arg in sys.argv[3:5]))
+    else:
+        args = sys.argv[1:]
+        run(float(args[0]) if args else 5.0,
+            int(args[1]) if len(args) > 1 else 8,
+            int(args[2]) if len(args) > 2 else 4)
@@ -0,0 +1,96 @@
+# benchmark_rehearsal_creation.py
+# Measures how long it takes to create a six-month weekly rehearsal series
+# (26 rehearsals) for growing roster sizes, comparing the old per-user ORM
+# fan-out of default responses with the set-based create_default_responses().
+#
+# Runs against a throwaway SQLite database, never the real one:
+#   python benchmark_rehearsal_creation.py
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_db_fd, _db_path = tempfile.mkstemp(suffix='.db')
+os.close(_db_fd)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_path}'
+
+from app import app, create_default_responses
+from models import Band, BandMembership, Rehearsal, Response, User, db
+
+ROSTER_SIZES = [10, 40, 100, 250, 500]
+SERIES_LENGTH = 26  # Weekly for six months
+
+
+def seed_band(roster_size):
+    creator = User(username='bench-admin', email='bench-admin@example.com', password_hash='x')
+    db.session.add(creator)
+    db.session.flush()
+
+    band = Band(name=f'Bench band {roster_size}', created_by=creator.id)
+    db.session.add(band)
+    db.session.flush()
+
+    members = [
+        User(username=f'member{i}', email=f'member{i}@example.com', password_hash='x')
+        for i in range(roster_size)
+    ]
+    db.session.add_all(members)
+    db.session.flush()
+    db.session.add_all([BandMembership(user_id=m.id, band_id=band.id) for m in members])
+    db.session.commit()
+    return band
+
+
+def create_series(band, fan_out):
+    start = datetime(2030, 1, 7)
+    rehearsals = []
+    for week in range(SERIES_LENGTH):
+        rehearsal = Rehearsal(date=start + timedelta(weeks=week), title='Bench', band_id=band.id)
+        db.session.add(rehearsal)
+        rehearsals.append(rehearsal)
+    fan_out(rehearsals)
+    db.session.commit()
+
+
+def orm_fan_out(rehearsals):
+    # What the handlers used to do: reload every user for every rehearsal
+    for rehearsal in rehearsals:
+        users = User.query.all()
+        for user in users:
+            db.session.add(Response(user=user, rehearsal=rehearsal, attending=True))
+
+
+def set_based_fan_out(rehearsals):
+    db.session.flush()
+    create_default_responses([r.id for r in rehearsals])
+
+
+def reset():
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+def run():
+    print(f"{'roster':>8} {'responses':>10} {'orm (ms)':>10} {'set (ms)':>10} {'speedup':>8}")
+    with app.app_context():
+        for roster_size in ROSTER_SIZES:
+            timings = {}
+            for name, fan_out in (('orm', orm_fan_out), ('set', set_based_fan_out)):
+                reset()
+                band = seed_band(roster_size)
+                started = time.perf_counter()
+                create_series(band, fan_out)
+                timings[name] = (time.perf_counter() - started) * 1000
+                responses = Response.query.count()
+            print(f"{roster_size:>8} {responses:>10} {timings['orm']:>10.1f} {timings['set']:>10.1f} "
+                  f"{timings['orm'] / timings['set']:>7.1f}x")
+        db.session.remove()
+
+
+if __name__ == '__main__':
+    try:
+        run()
+    finally:
+        os.remove(_db_path)
@@ -0,0 +1,90 @@
+# benchmark_series_update.py
+# Measures how long "update all recurring" takes for series of 10, 100 and
+# 1000 occurrences, comparing the old approach (load every rehearsal into the
+# ORM and shift dates in Python) with the set-based update_rehearsal_series().
+#
+# Runs against a throwaway SQLite database, never the real one:
+#   python benchmark_series_update.py
+
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+_db_fd, _db_path = tempfile.mkstemp(suffix='.db')
+os.close(_db_fd)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_path}'
+
+from app import app, update_rehearsal_series
+from models import Band, Rehearsal, User, db
+
+SERIES_SIZES = [10, 100, 1000]
+DAYS_DIFF = 1
+NEW_TITLE = 'Moved rehearsal'
+
+
+def seed_series(size):
+    creator = User(username='bench-admin', email='bench-admin@example.com', password_hash='x')
+    db.session.add(creator)
+    db.session.flush()
+
+    band = Band(name='Bench band', created_by=creator.id)
+    db.session.add(band)
+    db.session.flush()
+
+    recurring_id = str(uuid.uuid4())
+    start = datetime(2030, 1, 7)
+    db.session.add_all([
+        Rehearsal(date=start + timedelta(weeks=week), title='Bench',
+                  recurring_id=recurring_id, band_id=band.id)
+        for week in range(size)
+    ])
+    db.session.commit()
+    return recurring_id, band.id
+
+
+def orm_update(recurring_id, band_id):
+    # What update_rehearsal used to do
+    rehearsals = Rehearsal.query.filter_by(recurring_id=recurring_id).all()
+    for r in rehearsals:
+        r.date = r.date + timedelta(days=DAYS_DIFF)
+        r.title = NEW_TITLE
+    db.session.commit()
+    return len(rehearsals)
+
+
+def set_based_update(recurring_id, band_id):
+    updated = update_rehearsal_series(recurring_id, band_id, days_diff=DAYS_DIFF, title=NEW_TITLE)
+    db.session.commit()
+    return updated
+
+
+def reset():
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+def run():
+    print(f"{'series':>8} {'orm (ms)':>10} {'set (ms)':>10} {'speedup':>8}")
+    with app.app_context():
+        for size in SERIES_SIZES:
+            timings = {}
+            for name, update in (('orm', orm_update), ('set', set_based_update)):
+                reset()
+                recurring_id, band_id = seed_series(size)
+                started = time.perf_counter()
+                updated = update(recurring_id, band_id)
+                timings[name] = (time.perf_counter() - started) * 1000
+                assert updated == size, f"{name} updated {updated} of {size} rehearsals"
+            print(f"{size:>8} {timings['orm']:>10.1f} {timings['set']:>10.1f} "
+                  f"{timings['orm'] / timings['set']:>7.1f}x")
+        db.session.remove()
+
+
+if __name__ == '__main__':
+    try:
+        run()
+    finally:
+        os.remove(_db_path)
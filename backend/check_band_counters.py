@@ -0,0 +1,26 @@
+# check_band_counters.py
+# Compares the denormalised member_count and upcoming_rehearsal_count on
+# bands with the membership and rehearsal tables and reports any drift.
+# Pass --fix to recount every band:
+#   python check_band_counters.py [--fix]
+
+import sys
+
+from app import app, find_band_counter_drift, refresh_band_counters
+from models import db
+
+with app.app_context():
+    drift = find_band_counter_drift()
+    for row in drift:
+        print(f"Band {row.id} ({row.name}): members {row.member_count} stored, {row.actual_members} actual; "
+              f"upcoming rehearsals {row.upcoming_rehearsal_count} stored, {row.actual_rehearsals} actual")
+    print(f"{len(drift)} bands with drifted counters")
+
+    if drift and '--fix' in sys.argv:
+        try:
+            refresh_band_counters()
+            db.session.commit()
+            print("Counters rebuilt")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding counters: {str(e)}")
@@ -1,4 +1,4 @@
-from app import app
+from app import app, refresh_band_counters
 from models import db, Rehearsal, Response
 
 with app.app_context():
@@ -7,6 +7,7 @@ with app.app_context():
     
     # Then delete rehearsals
     Rehearsal.query.delete()
+    refresh_band_counters()
     
     # Commit the changes
     db.session.commit()
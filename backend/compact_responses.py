@@ -0,0 +1,40 @@
+# compact_responses.py
+# Converts an existing database to sparse attendance storage by deleting the
+# stored responses that are identical to the implicit default ("Ja" without a
+# comment). Readers synthesise those rows from band membership, so nothing
+# visible changes. Run it after setting SPARSE_RESPONSES=true.
+
+from datetime import datetime
+
+from app import app, sql_timestamp
+from models import db
+from sqlalchemy import text
+
+with app.app_context():
+    try:
+        total = db.session.execute(text("SELECT COUNT(*) FROM responses")).scalar()
+        
+        # Tombstones tell delta-sync clients the stored rows became implicit
+        db.session.execute(text('''
+            INSERT INTO tombstones (band_id, entity_type, entity_id, rehearsal_id, user_id, deleted_at)
+            SELECT re.band_id, 'response', r.id, r.rehearsal_id, r.user_id, :deleted_at
+            FROM responses r
+            JOIN rehearsals re ON r.rehearsal_id = re.id
+            WHERE r.attending = 1
+              AND (r.comment IS NULL OR r.comment = '')
+        '''), {'deleted_at': sql_timestamp(datetime.utcnow())})
+        
+        result = db.session.execute(text('''
+            DELETE FROM responses
+            WHERE attending = 1
+              AND (comment IS NULL OR comment = '')
+        '''))
+        # Deleted rows come back as implicit ones, so cached listings are stale
+        db.session.execute(text("UPDATE bands SET version = version + 1"))
+        db.session.commit()
+        
+        print(f"Deleted {result.rowcount} of {total} responses")
+        print(f"{total - result.rowcount} explicit responses remain")
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error compacting responses: {str(e)}")
@@ -0,0 +1,163 @@
+# compression.py
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip is offered without it
+    brotli = None
+
+
+class CompressedBody:
+    """A compressed response body kept for reuse, with the headers it was sent with"""
+    __slots__ = ('body', 'raw_size', 'headers')
+
+    def __init__(self, body, raw_size, headers):
+        self.body = body
+        self.raw_size = raw_size
+        self.headers = headers
+
+
+class ResponseCompressor:
+    """
+    Negotiated gzip/brotli compression of response bodies, with an LRU cache
+    of compressed bodies and per-endpoint byte counts.
+
+    Cache keys are chosen by the caller; they should change whenever the
+    body would, e.g. the URL plus a version-based ETag. The cache is bounded
+    by the total size of the bodies it holds.
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=5, cache_bytes=16 * 1024 * 1024):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_bytes = cache_bytes
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def choose_encoding(self, accept_encodings):
+        """Returns the best encoding the client accepts, or None to send the body as is"""
+        best, best_quality = None, 0
+        for encoding in self.encodings:
+            quality = accept_encodings.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def _compressor(self, encoding):
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return compressor.process, compressor.finish
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+
+    def compress(self, data, encoding):
+        process, finish = self._compressor(encoding)
+        return process(data) + finish()
+
+    def iter_compressed(self, chunks, encoding, endpoint, cache_key=None, headers=None):
+        """
+        Compresses a streamed body chunk by chunk. Once the last chunk has
+        been sent the byte counts are recorded and, given a cache key, the
+        whole compressed body is cached; a stream cut short is neither.
+        """
+        process, finish = self._compressor(encoding)
+        raw_size = sent_size = 0
+        parts = [] if cache_key is not None else None
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                raw_size += len(chunk)
+                out = process(chunk)
+                if out:
+                    sent_size += len(out)
+                    if parts is not None:
+                        parts.append(out)
+                    yield out
+            out = finish()
+            sent_size += len(out)
+            if parts is not None:
+                parts.append(out)
+            yield out
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        self.record(endpoint, raw_size, sent_size)
+        if parts is not None:
+            self.put(cache_key, CompressedBody(b''.join(parts), raw_size, headers or {}))
+
+    def iter_counted(self, chunks, endpoint):
+        """Passes a streamed body through as is, recording its size once the last chunk has been sent"""
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                yield chunk
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        self.record(endpoint, size, size)
+
+    # Cache of compressed bodies
+
+    def get(self, key, endpoint=None):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            self._cache.move_to_end(key)
+        if endpoint:
+            self.record(endpoint, entry.raw_size, len(entry.body), cache_hit=True)
+        return entry
+
+    def put(self, key, entry):
+        size = len(entry.body)
+        if size > self.cache_bytes:
+            return
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cached_bytes -= len(previous.body)
+            self._cache[key] = entry
+            self._cached_bytes += size
+            while self._cached_bytes > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted.body)
+
+    # Statistics
+
+    def record(self, endpoint, raw_size, sent_size, cache_hit=False):
+        with self._lock:
+            counts = self._endpoints.setdefault(endpoint, {
+                'responses': 0, 'compressed': 0, 'cache_hits': 0,
+                'raw_bytes': 0, 'sent_bytes': 0
+            })
+            counts['responses'] += 1
+            counts['raw_bytes'] += raw_size
+            counts['sent_bytes'] += sent_size
+            if sent_size != raw_size:
+                counts['compressed'] += 1
+            if cache_hit:
+                counts['cache_hits'] += 1
+
+    def stats(self):
+        with self._lock:
+            endpoints = {
+                endpoint: {**counts, 'bytes_saved': counts['raw_bytes'] - counts['sent_bytes']}
+                for endpoint, counts in self._endpoints.items()
+            }
+            return {
+                'encodings': list(self.encodings),
+                'min_size': self.min_size,
+                'cache_entries': len(self._cache),
+                'cache_bytes': self._cached_bytes,
+                'bytes_saved': sum(counts['bytes_saved'] for counts in endpoints.values()),
+                'endpoints': endpoints
+            }
@@ -0,0 +1,62 @@
+# db_engines.py
+from functools import wraps
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# Bind key of the engine read-only requests are routed to
+READ_BIND = 'read'
+
+
+def configure_sqlite_engine(engine, pragmas, begin='DEFERRED'):
+    """
+    Applies the pragmas to every new connection of the engine and has
+    transactions start with BEGIN <begin> (left to pysqlite if begin is None).
+
+    pysqlite opens transactions itself, lazily, just before the first write.
+    Taking over BEGIN gives a request one transaction from its first query:
+    DEFERRED for readers, so all they read comes from one snapshot, and
+    IMMEDIATE for writers, which then wait (up to busy_timeout) for the write
+    lock at the start. A transaction that has read first and only then asks
+    for the lock fails with "database is locked" straight away if another
+    writer got in between, and busy_timeout can't help there.
+    """
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        if begin:
+            dbapi_connection.isolation_level = None  # SQLAlchemy's begin event issues BEGIN
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    if begin:
+        @event.listens_for(engine, 'begin')
+        def on_begin(conn):
+            conn.exec_driver_sql(f'BEGIN {begin}')
+
+
+def read_only(view):
+    """Runs the view's queries on the read engine, where one is configured"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.use_read_engine = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+class RoutingSession(Session):
+    """
+    Session that sends everything to the read engine while the current app
+    context is marked read-only (see read_only), and otherwise binds as
+    Flask-SQLAlchemy does. Flushes always go to the writer.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and has_app_context()
+                and g.get('use_read_engine')):
+            read_engine = self._db.engines.get(READ_BIND)
+            if read_engine is not None:
+                return read_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
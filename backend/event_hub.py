@@ -0,0 +1,213 @@
+# event_hub.py
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import stat
+import tempfile
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+def default_socket_dir():
+    """A directory of this user's under the system temp dir, so other users' processes can't share it"""
+    user = os.getuid() if hasattr(os, 'getuid') else 'user'
+    return os.path.join(tempfile.gettempdir(), f'band-rehearsal-events-{user}')
+
+
+class Subscription:
+    """
+    One listener's bounded queue of events for a band.
+
+    A subscriber that stops reading must not make the hub buffer without
+    limit, so when the queue is full its backlog is dropped and replaced by
+    a single 'resync' event telling the client to reload instead.
+    """
+
+    def __init__(self, band_id, max_size):
+        self.band_id = band_id
+        self._queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()  # Publishers only; the reader needn't wait
+        self.dropped = 0
+
+    def put(self, message):
+        with self._lock:
+            try:
+                self._queue.put_nowait(message)
+                return True
+            except queue.Full:
+                pass
+            # Overflowed: discard the backlog and ask the client to reload
+            while True:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    break
+            try:
+                self._queue.put_nowait({'band_id': self.band_id, 'event': 'resync', 'data': {}})
+            except queue.Full:
+                pass  # Only publishers add, and they hold the lock, but never fail a publish over it
+            return False
+
+    def get(self, timeout=None):
+        """Returns the next event, or None if nothing arrived within timeout"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+    """
+    In-process publish/subscribe hub for per-band events.
+
+    publish() delivers to the subscribers of this process and, when a
+    socket directory is configured, forwards the event as a Unix datagram
+    to every other process on the machine that has subscribers (each binds
+    a socket in that directory on its first subscribe). That way an event
+    raised in one gunicorn worker reaches browsers connected to any other.
+    Delivery is best effort: events are hints to refetch, never the only
+    copy of the data.
+
+    Anyone who can write to the socket directory can inject events, so it
+    must be private: it is created with mode 0700, and an existing one that
+    belongs to another user or is open to others disables the fan-out.
+    """
+
+    def __init__(self, queue_size=100, socket_dir=None):
+        self.queue_size = queue_size
+        self.socket_dir = socket_dir if hasattr(socket, 'AF_UNIX') else None
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._socket_path = None
+        self._sender = None
+        self.published = 0
+        self.delivered = 0
+        self.forwarded = 0
+
+    def subscribe(self, band_id):
+        self._ensure_listening()
+        subscription = Subscription(band_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(band_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.band_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.band_id]
+
+    def publish(self, band_id, event, data):
+        message = {'band_id': band_id, 'event': event, 'data': data}
+        with self._lock:
+            self.published += 1
+        self._deliver(message)
+        self._forward(message)
+
+    def _deliver(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(message['band_id'], ()))
+            self.delivered += len(subscribers)
+        for subscription in subscribers:
+            subscription.put(message)
+
+    # Cross-process fan-out
+
+    def _ensure_listening(self):
+        if not self.socket_dir:
+            return
+        with self._lock:
+            if self._socket_path:
+                return
+            try:
+                os.makedirs(self.socket_dir, mode=0o700, exist_ok=True)
+                self._check_private(self.socket_dir)
+                path = os.path.join(self.socket_dir, f'{os.getpid()}-{uuid.uuid4().hex[:8]}.sock')
+                listener = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                listener.bind(path)
+            except OSError as e:
+                logger.error(f"Event hub could not bind a socket, events stay in-process: {str(e)}")
+                self.socket_dir = None
+                return
+            self._socket_path = path
+        atexit.register(self._close)
+        threading.Thread(target=self._listen, args=(listener,), daemon=True).start()
+
+    @staticmethod
+    def _check_private(path):
+        info = os.lstat(path)
+        if (not stat.S_ISDIR(info.st_mode) or info.st_mode & 0o077
+                or (hasattr(os, 'getuid') and info.st_uid != os.getuid())):
+            raise OSError(f"{path} must be a directory of this user's with mode 0700")
+
+    def _listen(self, listener):
+        while True:
+            try:
+                payload = listener.recv(65536)
+            except OSError:
+                return  # Socket closed at shutdown
+            try:
+                self._deliver(json.loads(payload))
+            except ValueError:
+                continue
+            except Exception as e:
+                # One bad datagram must not stop cross-process delivery for good
+                logger.error(f"Event hub could not deliver a forwarded event: {str(e)}")
+
+    def _forward(self, message):
+        if not self.socket_dir:
+            return
+        try:
+            peers = [name for name in os.listdir(self.socket_dir) if name.endswith('.sock')]
+        except OSError:
+            return
+
+        payload = json.dumps(message).encode('utf-8')
+        with self._lock:
+            if self._sender is None:
+                self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._sender.setblocking(False)
+            sender = self._sender
+
+        for name in peers:
+            path = os.path.join(self.socket_dir, name)
+            if path == self._socket_path:
+                continue
+            try:
+                sender.sendto(payload, path)
+                with self._lock:
+                    self.forwarded += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a process that exited without cleaning up
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError:
+                pass  # Peer's receive buffer is full; it misses this hint
+
+    def _close(self):
+        if self._socket_path:
+            try:
+                os.unlink(self._socket_path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'bands': len(self._subscribers),
+                'subscribers': sum(len(s) for s in self._subscribers.values()),
+                'published': self.published,
+                'delivered': self.delivered,
+                'forwarded': self.forwarded,
+                'cross_process': bool(self._socket_path)
+            }
@@ -0,0 +1,114 @@
+# membership_index.py
+import threading
+import time
+
+from models import db
+from sqlalchemy import text
+
+
+class MembershipIndex:
+    """
+    Per-process authorization index mapping user_id -> {band_id: role}.
+
+    The whole band_memberships table is loaded with a single query the first
+    time it is needed and then answers membership and role checks with
+    dictionary lookups. Write paths call invalidate() after committing so
+    the next check reloads it.
+
+    Only a granted role is trusted from the index: a user missing from it (or
+    not an admin, for is_admin) is looked up in band_memberships before being
+    refused, since the grant may have been committed by another worker
+    process since this one loaded. The TTL bounds how long another process
+    can keep serving a membership that has been removed; discard() drops a
+    user's entries in this process straight away.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._roles = None
+        self._loaded_at = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.lookups = 0
+
+    def _load(self):
+        result = db.session.execute(text("SELECT user_id, band_id, role FROM band_memberships"))
+        roles = {}
+        for row in result:
+            roles.setdefault(row.user_id, {})[row.band_id] = row.role or 'member'
+        return roles
+
+    def _index(self):
+        with self._lock:
+            if self._roles is not None and time.time() - self._loaded_at < self.ttl:
+                return self._roles
+            generation = self._generation
+        roles = self._load()
+        with self._lock:
+            # Don't publish a view that an invalidate() raced past
+            if generation == self._generation:
+                self._roles = roles
+                self._loaded_at = time.time()
+            self.loads += 1
+        return roles
+
+    def bands_for(self, user_id):
+        """Return {band_id: role} for the given user"""
+        return self._index().get(user_id, {})
+
+    def _lookup(self, user_id, band_id):
+        """Reads one membership from the database and adds it to the index"""
+        row = db.session.execute(
+            text("SELECT role FROM band_memberships WHERE user_id = :user_id AND band_id = :band_id"),
+            {'user_id': user_id, 'band_id': band_id}
+        ).first()
+        role = (row.role or 'member') if row else None
+        with self._lock:
+            self.lookups += 1
+            if role is not None and self._roles is not None:
+                # Copied, as callers may be iterating the dict bands_for() gave them
+                self._roles[user_id] = {**self._roles.get(user_id, {}), band_id: role}
+        return role
+
+    def role(self, user_id, band_id):
+        try:
+            band_id = int(band_id)
+        except (TypeError, ValueError):
+            return None
+        role = self.bands_for(user_id).get(band_id)
+        return role if role is not None else self._lookup(user_id, band_id)
+
+    def is_member(self, user_id, band_id):
+        return self.role(user_id, band_id) is not None
+
+    def is_admin(self, user_id, band_id):
+        try:
+            band_id = int(band_id)
+        except (TypeError, ValueError):
+            return False
+        # A cached member role may predate a promotion made in another process
+        if self.bands_for(user_id).get(band_id) == 'admin':
+            return True
+        return self._lookup(user_id, band_id) == 'admin'
+
+    def discard(self, user_id):
+        """Drops a deleted user's memberships without reloading the index"""
+        with self._lock:
+            if self._roles is not None:
+                self._roles.pop(user_id, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._roles = None
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._roles) if self._roles is not None else 0,
+                'loaded': self._roles is not None,
+                'loads': self.loads,
+                'lookups': self.lookups,
+                'ttl': self.ttl
+            }
@@ -0,0 +1,14 @@
+# migrate_foreign_keys.py
+# Rebuilds the tables of an existing SQLite database so their foreign keys
+# carry the ON DELETE rules declared in models.py (e.g. responses are removed
+# by ON DELETE CASCADE when their rehearsal is deleted). SQLite cannot alter
+# a constraint in place, so each table is recreated and its rows copied over.
+# The app does this itself when it initializes the database (see
+# rebuild_foreign_keys); this runs the same initialization ahead of time,
+# e.g. before a deploy, so the first request doesn't wait for it.
+
+from app import app, initialize_database
+
+with app.app_context():
+    initialize_database()
+    print("Foreign key migration completed!")
@@ -2,10 +2,11 @@
 import uuid
 from datetime import datetime, timedelta
 
+from db_engines import RoutingSession
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import check_password_hash, generate_password_hash
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # Read-only views may use the read engine
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -20,12 +21,21 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_super_admin = db.Column(db.Boolean, default=False)
     
+    # Case-insensitive prefix search in the user directory is a range scan on these
+    __table_args__ = (
+        db.Index('ix_users_username_lower', db.func.lower(username)),
+        db.Index('ix_users_email_lower', db.func.lower(email)),
+        db.Index('ix_users_first_name_lower', db.func.lower(first_name)),
+        db.Index('ix_users_last_name_lower', db.func.lower(last_name)),
+    )
+    
     # Relationship with Responses
-    responses = db.relationship('Response', back_populates='user', cascade='all, delete-orphan')
+    # passive_deletes leaves removing dependent rows to the database's ON DELETE rules
+    responses = db.relationship('Response', back_populates='user', cascade='all, delete-orphan', passive_deletes=True)
 
     # Update relationships
-    band_memberships = db.relationship('BandMembership', back_populates='user', cascade='all, delete-orphan')
-    created_bands = db.relationship('Band', foreign_keys='Band.created_by', backref='creator')
+    band_memberships = db.relationship('BandMembership', back_populates='user', cascade='all, delete-orphan', passive_deletes=True)
+    created_bands = db.relationship('Band', foreign_keys='Band.created_by', backref='creator', passive_deletes=True)
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -47,12 +57,20 @@ class Rehearsal(db.Model):
     title = db.Column(db.String(100), nullable=True)  # Optional title
     recurring_id = db.Column(db.String(36), nullable=True)  # UUID to group recurring events
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    band_id = db.Column(db.Integer, db.ForeignKey('bands.id'), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    band_id = db.Column(db.Integer, db.ForeignKey('bands.id', ondelete='CASCADE'), nullable=False)
 
     # Relationship with Responses
-    responses = db.relationship('Response', back_populates='rehearsal', cascade='all, delete-orphan')
+    # Responses are removed by ON DELETE CASCADE, so deleting a rehearsal never loads them
+    responses = db.relationship('Response', back_populates='rehearsal', cascade='all, delete-orphan', passive_deletes=True)
     band = db.relationship('Band', back_populates='rehearsals')
     
+    # Serves band listings ordered and paged by (date, id)
+    __table_args__ = (
+        db.Index('ix_rehearsals_band_date', 'band_id', 'date', 'id'),
+        db.Index('ix_rehearsals_band_updated_at', 'band_id', 'updated_at'),  # Delta sync
+    )
+    
     def __repr__(self):
         time_str = f" {self.start_time.strftime('%H:%M')}" if self.start_time else ""
         return f'<Rehearsal {self.date.strftime("%Y-%m-%d")}{time_str}>'
@@ -62,8 +80,8 @@ class Response(db.Model):
     __tablename__ = 'responses'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    rehearsal_id = db.Column(db.Integer, db.ForeignKey('rehearsals.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    rehearsal_id = db.Column(db.Integer, db.ForeignKey('rehearsals.id', ondelete='CASCADE'), nullable=False)
     attending = db.Column(db.Boolean, default=True)  # True for "Ja", False for "Nej"
     comment = db.Column(db.Text)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -75,6 +93,7 @@ class Response(db.Model):
     # Unique constraint to ensure one response per user per rehearsal
     __table_args__ = (
         db.UniqueConstraint('user_id', 'rehearsal_id', name='unique_user_rehearsal'),
+        db.Index('ix_responses_updated_at', 'updated_at'),  # Delta sync
     )
     
     def __repr__(self):
@@ -86,16 +105,25 @@ class LogEntry(db.Model):
     __tablename__ = 'log_entries'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)  # Kept when the user is deleted
     action = db.Column(db.String(100), nullable=False)
     entity_type = db.Column(db.String(50), nullable=False)  # 'response', 'rehearsal', etc.
     entity_id = db.Column(db.Integer)
+    band_id = db.Column(db.Integer, nullable=True)  # No foreign key: the history outlives the band
     old_value = db.Column(db.Text)
     new_value = db.Column(db.Text)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship
     user = db.relationship('User')
+    
+    # /api/audit pages newest first by (timestamp, id) within each filter
+    __table_args__ = (
+        db.Index('ix_log_entries_entity', 'entity_type', 'entity_id', 'timestamp', 'id'),
+        db.Index('ix_log_entries_user', 'user_id', 'timestamp', 'id'),
+        db.Index('ix_log_entries_band', 'band_id', 'timestamp', 'id'),
+        db.Index('ix_log_entries_timestamp', 'timestamp', 'id'),
+    )
 
 class Invitation(db.Model):
     __tablename__ = 'invitations'
@@ -103,7 +131,7 @@ class Invitation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), nullable=False)
     token = db.Column(db.String(100), nullable=False, unique=True)
-    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime, nullable=False)
     is_accepted = db.Column(db.Boolean, default=False)
@@ -134,11 +162,15 @@ class Band(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)  # Band outlives its creator
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped by every write to the band's data
+    # Denormalised counters, kept up to date by the write paths (see refresh_band_counters)
+    member_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    upcoming_rehearsal_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Dated today or later
     
     # Relationships
-    rehearsals = db.relationship('Rehearsal', back_populates='band', cascade='all, delete-orphan')
-    band_memberships = db.relationship('BandMembership', back_populates='band', cascade='all, delete-orphan')
+    rehearsals = db.relationship('Rehearsal', back_populates='band', cascade='all, delete-orphan', passive_deletes=True)
+    band_memberships = db.relationship('BandMembership', back_populates='band', cascade='all, delete-orphan', passive_deletes=True)
     
     def __repr__(self):
         return f'<Band {self.name}>'
@@ -147,8 +179,8 @@ class BandMembership(db.Model):
     __tablename__ = 'band_memberships'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    band_id = db.Column(db.Integer, db.ForeignKey('bands.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    band_id = db.Column(db.Integer, db.ForeignKey('bands.id', ondelete='CASCADE'), nullable=False)
     role = db.Column(db.String(20), default='member')  # 'admin', 'member'
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -159,7 +191,155 @@ class BandMembership(db.Model):
     # Unique constraint
     __table_args__ = (
         db.UniqueConstraint('user_id', 'band_id', name='unique_user_band'),
+        db.Index('ix_band_memberships_band', 'band_id'),  # Lookups and counts by band
     )
     
     def __repr__(self):
         return f'<BandMembership {self.user.username} - {self.band.name}: {self.role}>'
+
+
+class RecurrenceRule(db.Model):
+    __tablename__ = 'recurrence_rules'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    recurring_id = db.Column(db.String(36), unique=True, nullable=False)  # Matches Rehearsal.recurring_id
+    band_id = db.Column(db.Integer, db.ForeignKey('bands.id', ondelete='CASCADE'), nullable=False)
+    interval_days = db.Column(db.Integer, nullable=False, default=7)  # 7 = weekly, 14 = biweekly
+    start_date = db.Column(db.Date, nullable=False)  # First occurrence
+    until_date = db.Column(db.Date, nullable=True)   # Last possible occurrence, None = open-ended
+    start_time = db.Column(db.Time, nullable=True)
+    end_time = db.Column(db.Time, nullable=True)
+    title = db.Column(db.String(100), nullable=True)
+    exceptions = db.Column(db.Text, default='')  # Comma-separated YYYY-MM-DD dates to skip
+    materialized_until = db.Column(db.Date, nullable=True)  # Occurrences exist as rehearsals up to here
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def exception_dates(self):
+        return set(d for d in (self.exceptions or '').split(',') if d)
+    
+    def add_exception(self, date):
+        dates = self.exception_dates()
+        dates.add(date.strftime('%Y-%m-%d'))
+        self.exceptions = ','.join(sorted(dates))
+    
+    def shift(self, days):
+        """Moves the whole pattern, including its exceptions, by a number of days"""
+        delta = timedelta(days=days)
+        self.start_date += delta
+        if self.until_date:
+            self.until_date += delta
+        if self.materialized_until:
+            self.materialized_until += delta
+        self.exceptions = ','.join(sorted(
+            (datetime.strptime(d, '%Y-%m-%d') + delta).strftime('%Y-%m-%d')
+            for d in self.exception_dates()
+        ))
+    
+    def occurrences(self, start, end):
+        """Returns the occurrence dates between start and end (inclusive), minus exceptions"""
+        if self.until_date and self.until_date < end:
+            end = self.until_date
+        
+        # Jump straight to the first occurrence on or after start
+        offset = max(0, (start - self.start_date).days)
+        steps = -(-offset // self.interval_days)
+        current = self.start_date + timedelta(days=steps * self.interval_days)
+        
+        skipped = self.exception_dates()
+        dates = []
+        while current <= end:
+            if current.strftime('%Y-%m-%d') not in skipped:
+                dates.append(current)
+            current += timedelta(days=self.interval_days)
+        return dates
+    
+    def to_rrule(self):
+        rule = f"FREQ=WEEKLY;INTERVAL={self.interval_days // 7}"
+        if self.until_date:
+            rule += f";UNTIL={self.until_date.strftime('%Y%m%d')}"
+        return rule
+    
+    def __repr__(self):
+        return f'<RecurrenceRule {self.recurring_id}: {self.to_rrule()}>'
+
+
+class ArchivedRehearsal(db.Model):
+    __tablename__ = 'archived_rehearsals'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    rehearsal_id = db.Column(db.Integer, nullable=False)  # Id the rehearsal had before archiving
+    band_id = db.Column(db.Integer, db.ForeignKey('bands.id', ondelete='CASCADE'), nullable=False)
+    date = db.Column(db.DateTime, nullable=False)
+    start_time = db.Column(db.Time, nullable=True)
+    end_time = db.Column(db.Time, nullable=True)
+    title = db.Column(db.String(100), nullable=True)
+    recurring_id = db.Column(db.String(36), nullable=True)
+    # Attendance summary at archive time, including implicit default responses
+    attending_count = db.Column(db.Integer, default=0)
+    declined_count = db.Column(db.Integer, default=0)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_archived_rehearsals_band_date', 'band_id', 'date'),
+    )
+    
+    def __repr__(self):
+        return f'<ArchivedRehearsal {self.date.strftime("%Y-%m-%d")}>'
+
+
+class ArchivedResponse(db.Model):
+    __tablename__ = 'archived_responses'
+    
+    archived_rehearsal_id = db.Column(db.Integer, db.ForeignKey('archived_rehearsals.id', ondelete='CASCADE'),
+                                      primary_key=True)
+    user_id = db.Column(db.Integer, primary_key=True)  # No foreign key: history outlives deleted users
+    attending = db.Column(db.Boolean, default=True)
+    comment = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        status = "Ja" if self.attending else "Nej"
+        return f'<ArchivedResponse {self.user_id} - {self.archived_rehearsal_id}: {status}>'
+
+
+# Records a deletion so delta-sync clients can drop what they cached
+class Tombstone(db.Model):
+    __tablename__ = 'tombstones'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    band_id = db.Column(db.Integer, db.ForeignKey('bands.id', ondelete='CASCADE'), nullable=False)
+    entity_type = db.Column(db.String(20), nullable=False)  # 'rehearsal', 'response' or 'member'
+    entity_id = db.Column(db.Integer, nullable=False)
+    # No foreign keys: the rows they point at are gone
+    rehearsal_id = db.Column(db.Integer, nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_tombstones_band_deleted_at', 'band_id', 'deleted_at'),
+    )
+    
+    def __repr__(self):
+        return f'<Tombstone {self.entity_type} {self.entity_id}>'
+
+
+# Daily per-band counts that log entries are rolled into once past retention
+class AuditRollup(db.Model):
+    __tablename__ = 'audit_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    band_id = db.Column(db.Integer, nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    action = db.Column(db.String(100), nullable=False)
+    entity_type = db.Column(db.String(50), nullable=False)
+    entries = db.Column(db.Integer, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_audit_rollups_band_day', 'band_id', 'day'),
+        db.Index('ix_audit_rollups_day', 'day'),
+    )
+    
+    def __repr__(self):
+        return f'<AuditRollup {self.day} {self.action} {self.entity_type}: {self.entries}>'
@@ -0,0 +1,121 @@
+# principal_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class Principal:
+    """
+    Lightweight, session-independent snapshot of an authenticated user.
+    Handlers only read plain attributes from the current user, so a snapshot
+    can safely be shared between requests without touching the database.
+    """
+    __slots__ = ('id', 'username', 'email', 'first_name', 'last_name',
+                 'is_admin', 'is_super_admin')
+
+    def __init__(self, id, username, email, first_name, last_name, is_admin, is_super_admin):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+        self.is_admin = bool(is_admin)
+        self.is_super_admin = bool(is_super_admin)
+
+    @classmethod
+    def from_user(cls, user, is_super_admin=False):
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            is_admin=user.is_admin,
+            is_super_admin=is_super_admin
+        )
+
+    def __repr__(self):
+        return f'<Principal {self.username}>'
+
+
+class PrincipalCache:
+    """
+    In-process LRU cache of authenticated principals keyed by token digest.
+
+    Each entry remembers the user id it belongs to and the version stamp of
+    that user when it was cached. Calling invalidate(user_id) bumps the
+    version, so every cached token for that user misses on its next lookup.
+    Entries also expire after the TTL or when the token itself expires,
+    whichever comes first.
+    """
+
+    def __init__(self, max_size=1024, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token):
+        key = self.digest(token)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                principal, version, expires_at = entry
+                if expires_at > now and self._versions.get(principal.id, 0) == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return principal
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def version(self, user_id):
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def put(self, token, principal, version, token_exp=None):
+        """Cache a principal loaded at the given user version stamp"""
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+
+        with self._lock:
+            # A concurrent invalidate() may have happened while we were loading
+            if self._versions.get(principal.id, 0) != version:
+                return
+            key = self.digest(token)
+            self._entries[key] = (principal, version, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Drop every cached principal for the given user"""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,108 @@
+# serialization.py
+import json
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard library
+    orjson = None
+
+
+def dumps(value):
+    """Encodes a value as compact JSON bytes, with orjson when it's installed"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+# Converters for values coming out of raw SQL. SQLite hands back DateTime
+# and Time columns as the strings SQLAlchemy stored, other databases as
+# datetime objects; strings are passed through as the handlers always did.
+
+def as_bool(value):
+    return bool(value) if value is not None else None
+
+
+def as_int(value):
+    return value or 0
+
+
+def formatted(fmt):
+    def convert(value):
+        if value is None or isinstance(value, str):
+            return value
+        return value.strftime(fmt)
+    return convert
+
+
+class RowEncoder:
+    """
+    Turns result rows into JSON-ready dicts.
+
+    Fields map an output key to a column name, a (column name, converter)
+    pair, or a callable taking the whole row. Column names are resolved to
+    positions once per column layout, from a result's first row's keys, so
+    encoding a row is a fixed sequence of tuple lookups rather than per-row
+    attribute access and type checks.
+
+    Plans are kept per column tuple, as one encoder may serve queries that
+    return different columns, possibly from several threads at once.
+    """
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self._plans = {}
+
+    def _compile(self, columns):
+        positions = {name: index for index, name in enumerate(columns)}
+        plan = []
+        for key, spec in self.fields.items():
+            if callable(spec):
+                plan.append((key, spec, None))
+            elif isinstance(spec, tuple):
+                column, convert = spec
+                plan.append((key, itemgetter(positions[column]), convert))
+            else:
+                plan.append((key, itemgetter(positions[spec]), None))
+        return plan
+
+    def _plan_for(self, columns):
+        plan = self._plans.get(columns)
+        if plan is None:
+            # Built completely before it's stored; a thread racing here builds the same plan
+            plan = self._plans[columns] = self._compile(columns)
+        return plan
+
+    @staticmethod
+    def _apply(plan, row):
+        result = {}
+        for key, get, convert in plan:
+            value = get(row)
+            result[key] = convert(value) if convert else value
+        return result
+
+    def encode(self, row):
+        return self._apply(self._plan_for(row._fields), row)
+
+    def iter_json(self, rows, batch_size=200):
+        """
+        Yields the rows as one JSON array in chunks, encoding batch_size rows
+        at a time straight off the cursor, so memory use doesn't grow with
+        the number of rows.
+        """
+        yield b'['
+        plan = None
+        first = True
+        batch = []
+        for row in rows:
+            if plan is None:
+                # Every row of one result has the same columns
+                plan = self._plan_for(row._fields)
+            batch.append(dumps(self._apply(plan, row)))
+            if len(batch) >= batch_size:
+                yield (b'' if first else b',') + b','.join(batch)
+                first = False
+                batch = []
+        if batch:
+            yield (b'' if first else b',') + b','.join(batch)
+        yield b']'
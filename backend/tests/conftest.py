@@ -0,0 +1,80 @@
+# tests/conftest.py
+# The app reads its configuration when it is imported, so the environment is
+# pointed at a throwaway SQLite file before the import. Every test starts from
+# empty tables and empty in-process caches.
+#   cd backend && python -m pytest -q
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+_db_fd, _db_path = tempfile.mkstemp(suffix='.db')
+os.close(_db_fd)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_path}'
+os.environ['EVENTS_SOCKET_DIR'] = ''  # Events stay in-process
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from models import Band, BandMembership, Rehearsal, User, db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app = app_module.app
+    with flask_app.app_context():
+        app_module.audit_log.flush()
+        db.drop_all()
+        db.create_all()
+    app_module.principal_cache.clear()
+    app_module.membership_index.invalidate()
+    app_module.database_ready.set()
+    yield flask_app
+    app_module.audit_log.flush()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make(username, is_admin=False):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@example.com', is_admin=is_admin)
+            user.set_password('password')
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+    return make
+
+
+@pytest.fixture
+def auth(app):
+    def headers(user_id, is_super_admin=False):
+        with app.app_context():
+            token = create_access_token(identity=str(user_id),
+                                        additional_claims={'is_super_admin': is_super_admin})
+        return {'Authorization': f'Bearer {token}'}
+    return headers
+
+
+@pytest.fixture
+def make_band(app):
+    def make(admin_id, member_ids=(), rehearsal_dates=()):
+        """Returns (band_id, [rehearsal ids]); rehearsals are stored without responses"""
+        with app.app_context():
+            band = Band(name='Test band', created_by=admin_id)
+            db.session.add(band)
+            db.session.flush()
+            db.session.add(BandMembership(user_id=admin_id, band_id=band.id, role='admin'))
+            db.session.add_all([BandMembership(user_id=user_id, band_id=band.id, role='member')
+                                for user_id in member_ids])
+            rehearsals = [Rehearsal(date=date, title='Rehearsal', band_id=band.id) for date in rehearsal_dates]
+            db.session.add_all(rehearsals)
+            db.session.commit()
+            return band.id, [rehearsal.id for rehearsal in rehearsals]
+    return make
@@ -0,0 +1,100 @@
+# tests/test_audit_log.py
+import logging
+
+import pytest
+from audit_log import AuditLog
+
+
+class FlakyWriter:
+    """Stands in for the database: raises while down, else keeps the entries"""
+
+    def __init__(self):
+        self.down = False
+        self.rows = []
+
+    def __call__(self, entries):
+        if self.down:
+            raise RuntimeError('database is down')
+        self.rows.extend(entry['entity_id'] for entry in entries)
+
+
+@pytest.fixture
+def writer():
+    return FlakyWriter()
+
+
+@pytest.fixture
+def make_log(writer):
+    logs = []
+
+    def make(**options):
+        log = AuditLog(writer, flush_interval=0.05, retries=1, **options)
+        logs.append(log)
+        return log
+    yield make
+    # Nothing left for the atexit hook
+    writer.down = False
+    for log in logs:
+        log.close()
+
+
+def record(log, *entity_ids):
+    for entity_id in entity_ids:
+        log.record(1, 'update', 'response', entity_id=entity_id)
+
+
+def test_failed_batch_is_kept_and_written_later(writer, make_log):
+    log = make_log()
+    writer.down = True
+    record(log, 1, 2, 3)
+    log.flush()
+    assert writer.rows == []
+    assert log.stats()['held'] == 3
+    assert log.stats()['dropped'] == 0
+
+    writer.down = False
+    log.flush()
+    assert writer.rows == [1, 2, 3]
+    assert log.stats()['held'] == 0
+    assert log.stats()['written'] == 3
+
+
+def test_held_entries_are_written_once_in_order(writer, make_log):
+    log = make_log(batch_size=2)
+    writer.down = True
+    record(log, 1, 2, 3)
+    log.flush()
+    record(log, 4)
+    log.flush()
+    writer.down = False
+    record(log, 5)
+    log.flush()
+    assert sorted(writer.rows) == [1, 2, 3, 4, 5]
+    assert log.stats()['written'] == 5
+    # The writer thread may get 5 out before the retries; those stay in order
+    assert [entity_id for entity_id in writer.rows if entity_id != 5] == [1, 2, 3, 4]
+
+
+def test_full_retry_buffer_drops_oldest_and_logs(writer, make_log, caplog):
+    log = make_log(retry_limit=2)
+    writer.down = True
+    with caplog.at_level(logging.ERROR, logger='audit_log'):
+        record(log, 1, 2, 3)
+        log.flush()
+    assert log.stats()['held'] == 2
+    assert log.stats()['dropped'] == 1
+    assert any('dropped the 1 oldest' in message for message in caplog.messages)
+    writer.down = False
+    log.flush()
+    assert writer.rows == [2, 3]
+
+
+def test_close_reports_entries_it_could_not_write(writer, make_log, caplog):
+    log = make_log()
+    writer.down = True
+    record(log, 1, 2)
+    with caplog.at_level(logging.ERROR, logger='audit_log'):
+        log.close()
+    assert log.stats()['held'] == 0
+    assert log.stats()['dropped'] == 2
+    assert any('Dropped 2 audit log entries' in message for message in caplog.messages)
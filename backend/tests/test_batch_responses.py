@@ -0,0 +1,95 @@
+# tests/test_batch_responses.py
+from datetime import datetime
+
+import pytest
+from models import Response, db
+
+
+@pytest.fixture
+def band(app, make_user, make_band):
+    admin = make_user('leader')
+    alice = make_user('alice')
+    bob = make_user('bob')
+    band_id, rehearsal_ids = make_band(admin, [alice, bob], [datetime(2030, 1, day) for day in (7, 14)])
+    with app.app_context():
+        responses = {(user_id, rehearsal_id): Response(user_id=user_id, rehearsal_id=rehearsal_id, attending=True)
+                     for user_id in (admin, alice, bob) for rehearsal_id in rehearsal_ids}
+        db.session.add_all(responses.values())
+        db.session.commit()
+        ids = {key: response.id for key, response in responses.items()}
+    return {'admin': admin, 'alice': alice, 'bob': bob, 'band_id': band_id,
+            'rehearsal_ids': rehearsal_ids, 'responses': ids}
+
+
+def own_ids(band, user_id):
+    return [band['responses'][(user_id, rehearsal_id)] for rehearsal_id in band['rehearsal_ids']]
+
+
+def patch_batch(client, headers, band_id, ids, attending=False, comment='Away'):
+    return client.patch('/api/responses/batch', headers=headers, json={
+        'band_id': band_id,
+        'responses': [{'id': response_id, 'attending': attending, 'comment': comment} for response_id in ids]
+    })
+
+
+def stored(app, ids):
+    with app.app_context():
+        return {r.id: (r.attending, r.comment) for r in Response.query.filter(Response.id.in_(ids))}
+
+
+def test_member_updates_own_responses(app, client, auth, band):
+    ids = own_ids(band, band['alice'])
+    response = patch_batch(client, auth(band['alice']), band['band_id'], ids)
+    assert response.status_code == 200
+    assert sorted(row['id'] for row in response.json['updated']) == sorted(ids)
+    assert stored(app, ids) == {response_id: (False, 'Away') for response_id in ids}
+
+
+@pytest.mark.parametrize('intruder, status', [
+    ('bob', 403),  # Another member's response
+    (None, 404),
+])
+def test_one_refused_response_rolls_back_the_batch(app, client, auth, band, intruder, status):
+    ids = own_ids(band, band['alice'])
+    bad_id = own_ids(band, band[intruder])[0] if intruder else 9999
+    response = patch_batch(client, auth(band['alice']), band['band_id'], ids[:1] + [bad_id] + ids[1:])
+    assert response.status_code == 400
+    assert response.json['msg'] == 'No responses were updated'
+    assert [(failure['id'], failure['status']) for failure in response.json['failed']] == [(bad_id, status)]
+    assert stored(app, ids + own_ids(band, band['bob'])) == {
+        response_id: (True, None) for response_id in ids + own_ids(band, band['bob'])
+    }
+
+
+def test_response_of_another_band_rolls_back_the_batch(app, client, auth, make_band, band):
+    _, (other_rehearsal,) = make_band(band['admin'], [band['alice']], [datetime(2030, 2, 4)])
+    with app.app_context():
+        other = Response(user_id=band['alice'], rehearsal_id=other_rehearsal, attending=True)
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+    ids = own_ids(band, band['alice']) + [other_id]
+    response = patch_batch(client, auth(band['alice']), band['band_id'], ids)
+    assert response.status_code == 400
+    assert response.json['failed'] == [
+        {'id': other_id, 'msg': 'Response does not belong to this band', 'status': 403}
+    ]
+    assert stored(app, ids) == {response_id: (True, None) for response_id in ids}
+
+
+def test_band_admin_updates_members_responses(app, client, auth, band):
+    ids = own_ids(band, band['alice']) + own_ids(band, band['bob'])
+    assert patch_batch(client, auth(band['admin']), band['band_id'], ids).status_code == 200
+    assert stored(app, ids) == {response_id: (False, 'Away') for response_id in ids}
+
+
+def test_batch_is_validated_before_anything_runs(monkeypatch, app, client, auth, band):
+    headers = auth(band['alice'])
+    assert client.patch('/api/responses/batch', headers=headers, json={'band_id': band['band_id'],
+                                                                        'responses': []}).status_code == 400
+    assert client.patch('/api/responses/batch', headers=headers, json={'band_id': band['band_id'],
+                                                                        'responses': [{'id': '1'}]}).status_code == 400
+    monkeypatch.setitem(app.config, 'RESPONSE_BATCH_MAX_SIZE', 1)
+    assert patch_batch(client, headers, band['band_id'], own_ids(band, band['alice'])).status_code == 400
+    ids = own_ids(band, band['alice'])
+    assert stored(app, ids) == {response_id: (True, None) for response_id in ids}
@@ -0,0 +1,81 @@
+# tests/test_create_response.py
+from datetime import datetime
+
+import pytest
+from models import Response
+
+
+@pytest.fixture
+def band(make_user, make_band):
+    admin = make_user('leader')
+    alice = make_user('alice')
+    bob = make_user('bob')
+    outsider = make_user('outsider')
+    band_id, (rehearsal_id,) = make_band(admin, [alice, bob], [datetime(2030, 1, 7)])
+    return {'admin': admin, 'alice': alice, 'bob': bob, 'outsider': outsider,
+            'band_id': band_id, 'rehearsal_id': rehearsal_id}
+
+
+def post_response(client, headers, user_id, rehearsal_id, attending=False):
+    return client.post('/api/responses', headers=headers, json={
+        'user_id': user_id, 'rehearsal_id': rehearsal_id, 'attending': attending
+    })
+
+
+def stored_responses(app):
+    with app.app_context():
+        return [(r.user_id, r.rehearsal_id, r.attending) for r in Response.query.all()]
+
+
+def test_member_creates_own_response(app, client, auth, band):
+    response = post_response(client, auth(band['alice']), band['alice'], band['rehearsal_id'])
+    assert response.status_code == 201
+    assert response.json['attending'] is False
+    assert stored_responses(app) == [(band['alice'], band['rehearsal_id'], False)]
+
+
+def test_member_cannot_create_another_members_response(app, client, auth, band):
+    response = post_response(client, auth(band['alice']), band['bob'], band['rehearsal_id'])
+    assert response.status_code == 403
+    assert stored_responses(app) == []
+
+
+def test_non_member_cannot_create_responses(app, client, auth, band):
+    for user_id in (band['outsider'], band['alice']):
+        response = post_response(client, auth(band['outsider']), user_id, band['rehearsal_id'])
+        assert response.status_code == 403
+    assert stored_responses(app) == []
+
+
+def test_band_admin_cannot_answer_for_a_non_member(app, client, auth, band):
+    response = post_response(client, auth(band['admin']), band['outsider'], band['rehearsal_id'])
+    assert response.status_code == 403
+    assert stored_responses(app) == []
+
+
+def test_band_admin_and_super_admin_answer_for_members(app, client, auth, band):
+    assert post_response(client, auth(band['admin']), band['alice'], band['rehearsal_id']).status_code == 201
+    assert post_response(client, auth(band['outsider'], is_super_admin=True),
+                         band['bob'], band['rehearsal_id']).status_code == 201
+    assert sorted(stored_responses(app)) == sorted([(band['alice'], band['rehearsal_id'], False),
+                                                    (band['bob'], band['rehearsal_id'], False)])
+
+
+def test_repost_applies_the_new_answer(app, client, auth, band):
+    post_response(client, auth(band['alice']), band['alice'], band['rehearsal_id'], attending=False)
+    response = post_response(client, auth(band['alice']), band['alice'], band['rehearsal_id'], attending=True)
+    assert response.status_code == 200
+    assert response.json['attending'] is True
+    assert stored_responses(app) == [(band['alice'], band['rehearsal_id'], True)]
+
+
+def test_repost_of_another_members_response_is_refused(app, client, auth, band):
+    post_response(client, auth(band['bob']), band['bob'], band['rehearsal_id'], attending=True)
+    response = post_response(client, auth(band['alice']), band['bob'], band['rehearsal_id'], attending=False)
+    assert response.status_code == 403
+    assert stored_responses(app) == [(band['bob'], band['rehearsal_id'], True)]
+
+
+def test_missing_user_or_rehearsal(client, auth, band):
+    assert post_response(client, auth(band['admin']), 9999, band['rehearsal_id']).status_code == 404
+    assert post_response(client, auth(band['admin']), band['alice'], 9999).status_code == 404
@@ -0,0 +1,78 @@
+# tests/test_cursors.py
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from app import decode_cursor, encode_cursor
+
+SHAPE = (datetime, int, int)
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def test_round_trip():
+    cursor = encode_cursor('2030-01-07 00:00:00', 12, 3)
+    assert '=' not in cursor
+    assert decode_cursor(cursor, SHAPE) == ['2030-01-07 00:00:00', 12, 3]
+
+
+@pytest.mark.parametrize('cursor', [
+    '',
+    'not base64!',
+    'é',
+    raw_cursor(b'\xff\xfe'),  # Not UTF-8
+    raw_cursor(b'[1, 2'),  # Truncated JSON
+    encode_cursor('2030-01-07 00:00:00', 12),  # Too short
+    encode_cursor('2030-01-07 00:00:00', 12, 3, 4),  # Too long
+    raw_cursor(b'{"date": "2030-01-07", "id": 12, "user": 3}'),
+    raw_cursor(b'"2030-01-07"'),
+    encode_cursor('yesterday', 12, 3),
+    encode_cursor(20300107, 12, 3),
+    encode_cursor('2030-01-07 00:00:00', '12', 3),
+    encode_cursor('2030-01-07 00:00:00', 12.5, 3),
+    encode_cursor('2030-01-07 00:00:00', True, 3),
+    encode_cursor('2030-01-07 00:00:00', 12, None),
+    encode_cursor('2030-01-07 00:00:00', 12, [3]),
+    raw_cursor(b'["2030-01-07 00:00:00", NaN, 3]'),
+])
+def test_malformed_or_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor, SHAPE)
+
+
+def test_string_cursor_rejects_other_types():
+    assert decode_cursor(encode_cursor('alice'), (str,)) == ['alice']
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(7), (str,))
+
+
+@pytest.mark.parametrize('path, shape_values', [
+    ('/api/rehearsals', ('2030-01-07 00:00:00', '12')),
+    ('/api/responses', ('2030-01-07 00:00:00', 12)),
+])
+def test_listings_answer_bad_cursors_with_400(client, auth, make_user, make_band, path, shape_values):
+    admin = make_user('leader')
+    band_id, _ = make_band(admin, rehearsal_dates=[datetime(2030, 1, 7)])
+    for cursor in ('%%%', encode_cursor(*shape_values), raw_cursor(json.dumps({'id': 1}).encode())):
+        response = client.get(path, headers=auth(admin), query_string={'band_id': band_id, 'cursor': cursor})
+        assert response.status_code == 400
+        assert response.json['msg'] == 'Invalid window: Invalid cursor'
+
+
+def test_next_cursor_pages_through_rehearsals(client, auth, make_user, make_band):
+    admin = make_user('leader')
+    band_id, ids = make_band(admin, rehearsal_dates=[datetime(2030, 1, day) for day in (7, 14, 21)])
+    seen = []
+    query = {'band_id': band_id, 'limit': 2}
+    while True:
+        response = client.get('/api/rehearsals', headers=auth(admin), query_string=query)
+        assert response.status_code == 200
+        seen += [row['id'] for row in response.json]
+        if 'X-Next-Cursor' not in response.headers:
+            break
+        query['cursor'] = response.headers['X-Next-Cursor']
+    assert seen == ids
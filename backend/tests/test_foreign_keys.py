@@ -0,0 +1,55 @@
+# tests/test_foreign_keys.py
+from datetime import datetime
+
+from models import Response, db
+from sqlalchemy import text
+
+import app as app_module
+
+# responses as databases created before the ON DELETE rules have it
+LEGACY_RESPONSES = """
+    CREATE TABLE responses (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        rehearsal_id INTEGER NOT NULL,
+        attending BOOLEAN,
+        comment TEXT,
+        updated_at DATETIME,
+        PRIMARY KEY (id),
+        CONSTRAINT unique_user_rehearsal UNIQUE (user_id, rehearsal_id),
+        FOREIGN KEY(user_id) REFERENCES users (id),
+        FOREIGN KEY(rehearsal_id) REFERENCES rehearsals (id)
+    )
+"""
+
+
+def on_delete_rules(table_name):
+    rows = db.session.execute(text(f"PRAGMA foreign_key_list({table_name})")).fetchall()
+    db.session.rollback()
+    return {row[3]: row[6] for row in rows}
+
+
+def test_legacy_tables_are_rebuilt_so_deletes_cascade(app, client, auth, make_user, make_band):
+    admin = make_user('leader', is_admin=True)
+    alice = make_user('alice')
+    band_id, (rehearsal_id, kept_id) = make_band(admin, [alice], [datetime(2030, 1, 7), datetime(2030, 1, 14)])
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE responses")
+            conn.exec_driver_sql(LEGACY_RESPONSES)
+        db.session.add_all([Response(user_id=user_id, rehearsal_id=rid, attending=True)
+                            for user_id in (admin, alice) for rid in (rehearsal_id, kept_id)])
+        db.session.commit()
+        assert on_delete_rules('responses') == {'user_id': 'NO ACTION', 'rehearsal_id': 'NO ACTION'}
+
+        assert app_module.rebuild_foreign_keys() == ['responses']
+        assert on_delete_rules('responses') == {'user_id': 'CASCADE', 'rehearsal_id': 'CASCADE'}
+        assert Response.query.count() == 4
+        db.session.rollback()  # Writers begin IMMEDIATE, so don't hold the lock
+        # Nothing left to do the second time
+        assert app_module.rebuild_foreign_keys() == []
+
+    assert client.delete(f'/api/rehearsals/{rehearsal_id}', headers=auth(admin)).status_code == 200
+    assert client.delete(f'/api/users/{alice}', headers=auth(admin, is_super_admin=True)).status_code == 200
+    with app.app_context():
+        assert [(r.user_id, r.rehearsal_id) for r in Response.query.all()] == [(admin, kept_id)]
@@ -0,0 +1,67 @@
+# tests/test_membership_index.py
+# Grants are written straight to band_memberships without invalidate(), as
+# another worker process's would be: this process's index doesn't see them.
+from models import db
+from sqlalchemy import text
+
+import app as app_module
+
+
+def grant(user_id, band_id, role):
+    db.session.execute(text("""
+        INSERT INTO band_memberships (user_id, band_id, role) VALUES (:user_id, :band_id, :role)
+        ON CONFLICT (user_id, band_id) DO UPDATE SET role = excluded.role
+    """), {'user_id': user_id, 'band_id': band_id, 'role': role})
+    db.session.commit()
+
+
+def test_missing_member_is_looked_up(app, make_user, make_band):
+    index = app_module.membership_index
+    admin = make_user('leader')
+    alice = make_user('alice')
+    band_id, _ = make_band(admin)
+    with app.app_context():
+        assert not index.is_member(alice, band_id)
+        assert index.stats()['loaded']
+        grant(alice, band_id, 'member')
+        lookups = index.stats()['lookups']
+        assert index.is_member(alice, band_id)
+        assert index.role(alice, band_id) == 'member'
+        # The looked-up membership is now answered from the index
+        assert index.stats()['lookups'] == lookups + 1
+        assert index.bands_for(alice) == {band_id: 'member'}
+
+
+def test_promotion_elsewhere_is_seen_by_is_admin(app, make_user, make_band):
+    index = app_module.membership_index
+    admin = make_user('leader')
+    alice = make_user('alice')
+    band_id, _ = make_band(admin, [alice])
+    with app.app_context():
+        assert index.role(alice, band_id) == 'member'
+        assert not index.is_admin(alice, band_id)
+        grant(alice, band_id, 'admin')
+        assert index.is_admin(alice, band_id)
+
+
+def test_non_member_is_refused_after_lookup(app, make_user, make_band):
+    index = app_module.membership_index
+    admin = make_user('leader')
+    outsider = make_user('outsider')
+    band_id, _ = make_band(admin)
+    with app.app_context():
+        assert index.role(outsider, band_id) is None
+        assert not index.is_admin(outsider, band_id)
+        assert index.role(outsider, 'not a band') is None
+        assert index.bands_for(outsider) == {}
+
+
+def test_endpoint_admits_member_added_by_another_worker(app, client, auth, make_user, make_band):
+    admin = make_user('leader')
+    alice = make_user('alice')
+    band_id, _ = make_band(admin)
+    listing = {'band_id': band_id}
+    assert client.get('/api/responses', headers=auth(alice), query_string=listing).status_code == 403
+    with app.app_context():
+        grant(alice, band_id, 'member')
+    assert client.get('/api/responses', headers=auth(alice), query_string=listing).status_code == 200
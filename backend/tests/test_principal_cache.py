@@ -0,0 +1,70 @@
+# tests/test_principal_cache.py
+from principal_cache import Principal, PrincipalCache
+
+import app as app_module
+
+
+def principal(user_id, is_admin=False):
+    return Principal(user_id, f'user{user_id}', None, None, None, is_admin, False)
+
+
+def test_invalidate_drops_every_token_of_the_user():
+    cache = PrincipalCache()
+    cache.put('a', principal(1), cache.version(1))
+    cache.put('b', principal(1), cache.version(1))
+    cache.put('c', principal(2), cache.version(2))
+    cache.invalidate(1)
+    assert cache.get('a') is None
+    assert cache.get('b') is None
+    assert cache.get('c').id == 2
+
+
+def test_put_loaded_before_an_invalidate_is_not_cached():
+    cache = PrincipalCache()
+    version = cache.version(1)
+    cache.invalidate(1)  # e.g. a role change committed while the user was loading
+    cache.put('a', principal(1, is_admin=True), version)
+    assert cache.get('a') is None
+
+
+def test_expired_token_is_not_served():
+    cache = PrincipalCache(ttl=300)
+    cache.put('a', principal(1), cache.version(1), token_exp=0)
+    assert cache.get('a') is None
+
+
+def update_user(client, headers, user_id, **changes):
+    return client.put(f'/api/users/{user_id}', headers=headers, json=changes)
+
+
+def test_role_change_applies_to_cached_tokens(client, auth, make_user):
+    root = make_user('root', is_admin=True)
+    alice = make_user('alice', is_admin=True)
+    bob = make_user('bob')
+    alice_headers, bob_headers = auth(alice), auth(bob)
+
+    # Both tokens are cached by their first request
+    assert update_user(client, alice_headers, bob).status_code == 200
+    assert update_user(client, bob_headers, alice).status_code == 403
+
+    assert update_user(client, auth(root), alice, is_admin=False).status_code == 200
+    assert update_user(client, auth(root), bob, is_admin=True).status_code == 200
+
+    assert update_user(client, alice_headers, bob).status_code == 403
+    assert update_user(client, bob_headers, alice).status_code == 200
+
+
+def test_password_change_drops_cached_principal(client, auth, make_user):
+    root = make_user('root', is_admin=True)
+    alice = make_user('alice')
+    alice_headers = auth(alice)
+    token = alice_headers['Authorization'][7:]
+
+    client.get('/api/bands', headers=alice_headers)
+    assert app_module.principal_cache.get(token).id == alice
+
+    assert update_user(client, auth(root), alice, password='new-password').status_code == 200
+    assert app_module.principal_cache.get(token) is None
+
+    login = client.post('/api/auth/login', json={'username': 'alice', 'password': 'new-password'})
+    assert login.status_code == 200
@@ -0,0 +1,71 @@
+# tests/test_sparse_responses.py
+# In sparse mode members start with implicit "Ja" responses and the client
+# creates the stored row on the first change, so the create path is what
+# members hit for every answer.
+import pytest
+from models import Response
+
+import app as app_module
+
+
+@pytest.fixture
+def sparse_band(monkeypatch, client, auth, make_user, make_band):
+    monkeypatch.setitem(app_module.app.config, 'SPARSE_RESPONSES', True)
+    admin = make_user('leader', is_admin=True)
+    alice = make_user('alice')
+    bob = make_user('bob')
+    outsider = make_user('outsider')
+    band_id, _ = make_band(admin, [alice, bob])
+    created = client.post('/api/rehearsals', headers=auth(admin), json={
+        'band_id': band_id, 'date': '2030-01-07', 'title': 'Rehearsal'
+    })
+    assert created.status_code == 201
+    listed = client.get('/api/rehearsals', headers=auth(admin), query_string={'band_id': band_id})
+    rehearsal_id = listed.json[0]['id']
+    return {'admin': admin, 'alice': alice, 'bob': bob, 'outsider': outsider,
+            'band_id': band_id, 'rehearsal_id': rehearsal_id}
+
+
+def listed_responses(client, auth, band):
+    response = client.get('/api/responses', headers=auth(band['admin']),
+                          query_string={'band_id': band['band_id']})
+    assert response.status_code == 200
+    return {row['user_id']: row for row in response.json}
+
+
+def save_response(client, headers, user_id, band, attending=False):
+    return client.post('/api/responses', headers=headers, json={
+        'user_id': user_id, 'rehearsal_id': band['rehearsal_id'], 'attending': attending
+    })
+
+
+def test_new_rehearsal_has_only_implicit_responses(app, client, auth, sparse_band):
+    listed = listed_responses(client, auth, sparse_band)
+    assert set(listed) == {sparse_band['admin'], sparse_band['alice'], sparse_band['bob']}
+    assert all(row['implicit'] and row['id'] is None and row['attending'] for row in listed.values())
+    with app.app_context():
+        assert Response.query.count() == 0
+
+
+def test_member_stores_own_answer(client, auth, sparse_band):
+    response = save_response(client, auth(sparse_band['alice']), sparse_band['alice'], sparse_band)
+    assert response.status_code == 201
+    listed = listed_responses(client, auth, sparse_band)
+    assert listed[sparse_band['alice']]['implicit'] is False
+    assert listed[sparse_band['alice']]['attending'] is False
+
+
+def test_member_cannot_store_another_members_answer(client, auth, sparse_band):
+    response = save_response(client, auth(sparse_band['alice']), sparse_band['bob'], sparse_band)
+    assert response.status_code == 403
+    listed = listed_responses(client, auth, sparse_band)
+    assert listed[sparse_band['bob']]['implicit'] is True
+    assert listed[sparse_band['bob']]['attending'] is True
+
+
+def test_non_member_cannot_store_any_answer(app, client, auth, sparse_band):
+    for user_id in (sparse_band['outsider'], sparse_band['alice'], sparse_band['bob']):
+        response = save_response(client, auth(sparse_band['outsider']), user_id, sparse_band)
+        assert response.status_code == 403
+    with app.app_context():
+        assert Response.query.count() == 0
@@ -71,8 +71,8 @@ const ScheduleTable = ({ rehearsals, responses, onResponseChange, onEditRehearsa
     console.log('Cell clicked:', {userId, rehearsalId, response: currentResponse});
     
     if (currentResponse) {
-      // If response exists, toggle it
-      onResponseChange(currentResponse.id, !currentResponse.attending);
+      // If response exists, toggle it (implicit default responses have no id yet)
+      onResponseChange(currentResponse.id, !currentResponse.attending, currentResponse);
     } else {
       // If no response exists, this shouldn't happen, but log for debugging
       console.error('No response found for user', userId, 'and rehearsal', rehearsalId);
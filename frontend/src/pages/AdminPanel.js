@@ -1,7 +1,7 @@
 // src/pages/AdminPanel.js - Updated to include InvitationManagement
 import React, { useState, useEffect, useContext } from 'react';
 import { UserContext } from '../contexts/UserContext';
-import { getUsers, createUser, getRehearsals, deleteUser } from '../utils/api';
+import { getAllUsers, createUser, getAllRehearsals, deleteUser } from '../utils/api';
 import AddRehearsalForm from '../components/AddRehearsalForm';
 import UserEditForm from '../components/UserEditForm';
 import RehearsalForm from '../components/RehearsalForm';
@@ -9,7 +9,7 @@ import InvitationManagement from '../components/InvitationManagement';
 import './AdminPanel.css';
 
 const AdminPanel = () => {
-  const { user } = useContext(UserContext);
+  const { user, currentBand } = useContext(UserContext);
   const [users, setUsers] = useState([]);
   const [rehearsals, setRehearsals] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -42,14 +42,14 @@ const AdminPanel = () => {
     }
   
     fetchData();
-  }, [user]);
+  }, [user, currentBand]);
   
   const fetchData = async () => {
     try {
       setLoading(true);
       const [usersData, rehearsalsData] = await Promise.all([
-        getUsers(),
-        getRehearsals()
+        getAllUsers(),
+        currentBand ? getAllRehearsals(currentBand.id) : []
       ]);
       
       setUsers(usersData);
@@ -139,7 +139,7 @@ const AdminPanel = () => {
   
   const refreshData = async () => {
     try {
-      const rehearsalsData = await getRehearsals();
+      const rehearsalsData = currentBand ? await getAllRehearsals(currentBand.id) : [];
       setRehearsals(rehearsalsData.sort((a, b) => new Date(a.date) - new Date(b.date)));
     } catch (err) {
       console.error('Failed to refresh data:', err);
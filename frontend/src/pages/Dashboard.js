@@ -2,7 +2,7 @@
 import React, { useState, useEffect, useContext } from 'react';
 import { Link } from 'react-router-dom';
 import { UserContext } from '../contexts/UserContext';
-import { getRehearsals, getResponses, updateResponse } from '../utils/api';
+import { getSchedule, isSameCell, saveResponse, subscribeToBandEvents, unpackSchedule } from '../utils/api';
 import ScheduleTable from '../components/ScheduleTable';
 import './Dashboard.css';
 
@@ -12,9 +12,10 @@ const Dashboard = () => {
   const [responses, setResponses] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
-  const [selectedResponseId, setSelectedResponseId] = useState(null);
+  const [selectedResponse, setSelectedResponse] = useState(null);
   const [comment, setComment] = useState('');
   const [showCommentModal, setShowCommentModal] = useState(false);
+  const [reloadKey, setReloadKey] = useState(0);
   
   useEffect(() => {
     console.log("Dashboard user data:", user);
@@ -33,11 +34,9 @@ const Dashboard = () => {
         
         const bandId = currentBand.id;
         
-        // Use Promise.all to fetch both datasets in parallel
-        const [rehearsalsData, responsesData] = await Promise.all([
-          getRehearsals(bandId),
-          getResponses(null, bandId)
-        ]);
+        // Fetch rehearsals and responses together as one columnar matrix
+        const schedule = await getSchedule(bandId);
+        const { rehearsals: rehearsalsData, responses: responsesData } = unpackSchedule(schedule);
         
         setRehearsals(rehearsalsData);
         setResponses(responsesData);
@@ -50,19 +49,40 @@ const Dashboard = () => {
     };
     
     fetchData();
+  }, [user, currentBand, reloadKey]);
+  
+  // Apply bandmates' changes as they happen instead of polling
+  useEffect(() => {
+    if (!user || !currentBand) return;
+    
+    return subscribeToBandEvents(currentBand.id, (type, data) => {
+      if (type === 'response') {
+        setResponses(prevResponses =>
+          prevResponses.map(response =>
+            isSameCell(response, data)
+              ? { ...response, ...data, implicit: false }
+              : response
+          )
+        );
+      } else {
+        // Rehearsal or member changes, or missed events: reload the schedule
+        setReloadKey(key => key + 1);
+      }
+    });
   }, [user, currentBand]);
   
-  const handleResponseChange = async (responseId, attending) => {
-    if (!currentBand) return;
+  const handleResponseChange = async (responseId, attending, currentResponse) => {
+    if (!currentBand || !currentResponse) return;
     
     try {
-      await updateResponse(responseId, { attending }, currentBand.id);
+      // Creates the row first if the response is an implicit default
+      const saved = await saveResponse(currentResponse, { attending }, currentBand.id);
       
       // Update responses in state
       setResponses(prevResponses => 
         prevResponses.map(response => 
-          response.id === responseId 
-            ? { ...response, attending } 
+          isSameCell(response, currentResponse)
+            ? { ...response, id: saved.id, attending: saved.attending, comment: saved.comment, implicit: false } 
             : response
         )
       );
@@ -71,33 +91,33 @@ const Dashboard = () => {
     }
   };
   
-  const handleCommentClick = (responseId) => {
+  const handleCommentClick = (cell) => {
     // Find the response to get the current comment
-    const response = responses.find(r => r.id === responseId);
+    const response = responses.find(r => isSameCell(r, cell));
     if (!response) return;
     
-    setSelectedResponseId(responseId);
+    setSelectedResponse(response);
     setComment(response.comment || '');
     setShowCommentModal(true);
   };
   
   const handleSaveComment = async () => {
-    if (!selectedResponseId || !currentBand) return;
+    if (!selectedResponse || !currentBand) return;
     
     try {
-      await updateResponse(selectedResponseId, { comment }, currentBand.id);
+      const saved = await saveResponse(selectedResponse, { comment }, currentBand.id);
       
       // Update responses in state
       setResponses(prevResponses => 
         prevResponses.map(response => 
-          response.id === selectedResponseId 
-            ? { ...response, comment } 
+          isSameCell(response, selectedResponse)
+            ? { ...response, id: saved.id, attending: saved.attending, comment: saved.comment, implicit: false } 
             : response
         )
       );
       
       setShowCommentModal(false);
-      setSelectedResponseId(null);
+      setSelectedResponse(null);
       setComment('');
     } catch (err) {
       setError('Failed to save comment. Please try again.');
@@ -153,7 +173,7 @@ const Dashboard = () => {
                 const userResponses = getUserResponses();
                 if (userResponses.length > 0) {
                   // Pick the first response for now, could make this more sophisticated
-                  handleCommentClick(userResponses[0].id);
+                  handleCommentClick(userResponses[0]);
                 }
               }}
             >
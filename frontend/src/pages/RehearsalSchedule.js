@@ -1,26 +1,31 @@
 // src/pages/RehearsalSchedule.js
 import React, { useState, useEffect, useContext } from 'react';
 import { UserContext } from '../contexts/UserContext';
-import { getRehearsals, getResponses, updateResponse } from '../utils/api';
+import { getSchedule, isSameCell, saveResponse, unpackSchedule } from '../utils/api';
 import ScheduleTable from '../components/ScheduleTable';
 import './RehearsalSchedule.css';
 
 const RehearsalSchedule = () => {
-  const { user } = useContext(UserContext);
+  const { user, currentBand } = useContext(UserContext);
   const [rehearsals, setRehearsals] = useState([]);
   const [responses, setResponses] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
-  const [selectedResponseId, setSelectedResponseId] = useState(null);
+  const [selectedResponse, setSelectedResponse] = useState(null);
   const [comment, setComment] = useState('');
   const [showCommentModal, setShowCommentModal] = useState(false);
   
   useEffect(() => {
     const fetchData = async () => {
+      if (!currentBand) {
+        setLoading(false);
+        return;
+      }
+      
       try {
         setLoading(true);
-        const rehearsalsData = await getRehearsals();
-        const responsesData = await getResponses();
+        const schedule = await getSchedule(currentBand.id);
+        const { rehearsals: rehearsalsData, responses: responsesData } = unpackSchedule(schedule);
         
         setRehearsals(rehearsalsData);
         setResponses(responsesData);
@@ -33,17 +38,20 @@ const RehearsalSchedule = () => {
     };
     
     fetchData();
-  }, []);
+  }, [currentBand]);
   
-  const handleResponseChange = async (responseId, attending) => {
+  const handleResponseChange = async (responseId, attending, currentResponse) => {
+    if (!currentBand || !currentResponse) return;
+    
     try {
-      await updateResponse(responseId, { attending });
+      // Creates the row first if the response is an implicit default
+      const saved = await saveResponse(currentResponse, { attending }, currentBand.id);
       
       // Update responses in state
       setResponses(prevResponses => 
         prevResponses.map(response => 
-          response.id === responseId 
-            ? { ...response, attending } 
+          isSameCell(response, currentResponse)
+            ? { ...response, id: saved.id, attending: saved.attending, comment: saved.comment, implicit: false } 
             : response
         )
       );
@@ -52,33 +60,33 @@ const RehearsalSchedule = () => {
     }
   };
   
-  const handleCommentClick = (responseId) => {
+  const handleCommentClick = (cell) => {
     // Find the response to get the current comment
-    const response = responses.find(r => r.id === responseId);
+    const response = responses.find(r => isSameCell(r, cell));
     if (!response) return;
     
-    setSelectedResponseId(responseId);
+    setSelectedResponse(response);
     setComment(response.comment || '');
     setShowCommentModal(true);
   };
   
   const handleSaveComment = async () => {
-    if (!selectedResponseId) return;
+    if (!selectedResponse || !currentBand) return;
     
     try {
-      await updateResponse(selectedResponseId, { comment });
+      const saved = await saveResponse(selectedResponse, { comment }, currentBand.id);
       
       // Update responses in state
       setResponses(prevResponses => 
         prevResponses.map(response => 
-          response.id === selectedResponseId 
-            ? { ...response, comment } 
+          isSameCell(response, selectedResponse)
+            ? { ...response, id: saved.id, attending: saved.attending, comment: saved.comment, implicit: false } 
             : response
         )
       );
       
       setShowCommentModal(false);
-      setSelectedResponseId(null);
+      setSelectedResponse(null);
       setComment('');
     } catch (err) {
       setError('Failed to save comment. Please try again.');
@@ -123,7 +131,7 @@ const RehearsalSchedule = () => {
             const userResponses = getUserResponses();
             if (userResponses.length > 0) {
               // Pick the first response for now, could make this more sophisticated
-              handleCommentClick(userResponses[0].id);
+              handleCommentClick(userResponses[0]);
             }
           }}
         >
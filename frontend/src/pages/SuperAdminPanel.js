@@ -1,7 +1,7 @@
 // src/pages/SuperAdminPanel.js
 import React, { useState, useEffect, useContext } from 'react';
 import { UserContext } from '../contexts/UserContext';
-import { getBands, getUsers, createUser, deleteUser } from '../utils/api';
+import { getBands, getAllUsers, createUser, deleteUser } from '../utils/api';
 import UserEditForm from '../components/UserEditForm';
 import './SuperAdminPanel.css';
 
@@ -46,7 +46,7 @@ const SuperAdminPanel = () => {
       setLoading(true);
       const [bandsData, usersData] = await Promise.all([
         getBands(),
-        getUsers() // This should now fetch all users regardless of band
+        getAllUsers() // All users regardless of band, following the listing's pages
       ]);
       
       setBands(bandsData);
@@ -3,8 +3,9 @@ import { getToken} from './auth';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:5000/api';
 
-// Helper function to make API requests
-const request = async (endpoint, options = {}) => {
+// Helper function to make API requests. With withCursor, paginated
+// listings resolve to { data, nextCursor }, nextCursor being null on the last page
+const request = async (endpoint, { withCursor = false, ...options } = {}) => {
   const token = getToken();
   
   const headers = {
@@ -61,6 +62,9 @@ const request = async (endpoint, options = {}) => {
     }
 
     const data = await response.json();
+    if (withCursor) {
+      return { data, nextCursor: response.headers.get('X-Next-Cursor') };
+    }
     return data;
   } catch (error) {
     console.error('[API] Request error:', error.message);
@@ -82,6 +86,14 @@ export const updateResponse = (responseId, data, bandId) => {
   });
 };
 
+// responses: [{ id, attending, comment }], applied all or nothing
+export const updateResponsesBatch = (bandId, responses) => {
+  return request('responses/batch', {
+    method: 'PATCH',
+    body: JSON.stringify({ band_id: bandId, responses })
+  });
+};
+
 // export const updateResponse = (responseId, data) => {
 //   return request(`responses/${responseId}`, {
 //     method: 'PUT',
@@ -89,9 +101,30 @@ export const updateResponse = (responseId, data, bandId) => {
 //   });
 // };
 
+// Follows a paginated listing's cursors; fetchPage(cursor) resolves to
+// { data, nextCursor }. Resolves to the rows of all pages.
+export const getAllPages = async (fetchPage) => {
+  const rows = [];
+  let cursor = null;
+  do {
+    const { data, nextCursor } = await fetchPage(cursor);
+    rows.push(...data);
+    cursor = nextCursor;
+  } while (cursor);
+  return rows;
+};
+
 // Users
-export const getUsers = () => {
-  return request('users');
+// Optional params: q (prefix of username, email or name), is_admin,
+// band_id, role, limit and cursor. Resolves to one page as { data, nextCursor }
+export const getUsers = (params = {}) => {
+  const query = new URLSearchParams(params).toString();
+  return request(query ? `users?${query}` : 'users', { withCursor: true });
+};
+
+// All users matching params, page by page
+export const getAllUsers = (params = {}) => {
+  return getAllPages(cursor => getUsers(cursor ? { ...params, cursor } : params));
 };
 
 export const getUserById = (userId) => {
@@ -184,6 +217,25 @@ export const createResponse = async (userId, rehearsalId, attending = true) => {
   });
 };
 
+// Saves changes ({ attending } and/or { comment }) to one cell of the schedule.
+// Implicit default responses have no stored row (and id: null) yet, so one is
+// created first. Resolves to the stored response.
+export const saveResponse = async (response, changes, bandId) => {
+  let responseId = response.id;
+  if (response.implicit || !responseId) {
+    const attending = 'attending' in changes ? changes.attending : response.attending;
+    const { msg, ...created } = await createResponse(response.user_id, response.rehearsal_id, attending);
+    if (!('comment' in changes)) {
+      return created;
+    }
+    responseId = created.id;
+  }
+  return updateResponse(responseId, changes, bandId);
+};
+
+// Schedule cells are keyed by (user_id, rehearsal_id), as implicit ones have no id
+export const isSameCell = (a, b) => a.user_id === b.user_id && a.rehearsal_id === b.rehearsal_id;
+
 // Add these functions to src/utils/api.js
 
 // Band management
@@ -216,12 +268,19 @@ export const removeBandMember = (bandId, userId) => {
 };
 
 // Update existing functions to include band_id parameter
-export const getRehearsals = (bandId) => {
+// Optional params: from, to, limit and cursor. Resolves to one page as { data, nextCursor }
+export const getRehearsals = (bandId, params = {}) => {
   if (!bandId) {
     console.error('Band ID is required to get rehearsals');
     return Promise.reject(new Error('Band ID is required'));
   }
-  return request(`rehearsals?band_id=${bandId}`);
+  const query = new URLSearchParams({ ...params, band_id: bandId }).toString();
+  return request(`rehearsals?${query}`, { withCursor: true });
+};
+
+// All of a band's rehearsals in the window given by params, page by page
+export const getAllRehearsals = (bandId, params = {}) => {
+  return getAllPages(cursor => getRehearsals(bandId, cursor ? { ...params, cursor } : params));
 };
 
 export const getRehearsalById = (id, bandId) => {
@@ -304,5 +363,79 @@ export const getResponses = (rehearsalId = null, bandId) => {
     ? `responses?rehearsal_id=${rehearsalId}&band_id=${bandId}` 
     : `responses?band_id=${bandId}`;
   
-  return request(url);
-};
\ No newline at end of file
+  // Listings are paginated; follow the cursor so callers still get every response
+  return getAllPages(cursor => request(cursor ? `${url}&cursor=${encodeURIComponent(cursor)}` : url, { withCursor: true }));
+};
+// Archived (past) rehearsals, newest first
+export const getArchivedRehearsals = (bandId, page = 1, perPage = 50) => {
+  return request(`bands/${bandId}/archive?page=${page}&per_page=${perPage}`);
+};
+
+export const getArchivedRehearsal = (bandId, archivedId) => {
+  return request(`bands/${bandId}/archive/${archivedId}`);
+};
+
+// Attendance matrix in columnar form (one request instead of rehearsals + responses)
+export const getSchedule = (bandId) => {
+  if (!bandId) {
+    console.error('Band ID is required to get schedule');
+    return Promise.reject(new Error('Band ID is required'));
+  }
+  return request(`bands/${bandId}/schedule`);
+};
+
+// Expands a columnar schedule into the rehearsal and response lists used by ScheduleTable
+export const unpackSchedule = (schedule) => {
+  const { rehearsals: columns, members, attendance, response_ids: responseIds, comments } = schedule;
+  
+  const rehearsals = columns.id.map((id, r) => ({
+    id,
+    date: columns.date[r],
+    start_time: columns.start_time[r],
+    end_time: columns.end_time[r],
+    title: columns.title[r],
+    recurring_id: columns.recurring_id[r]
+  }));
+  
+  const commentMap = {};
+  comments.forEach(([m, r, comment]) => {
+    commentMap[`${m}:${r}`] = comment;
+  });
+  
+  const responses = [];
+  members.id.forEach((userId, m) => {
+    rehearsals.forEach((rehearsal, r) => {
+      const state = attendance[m][r];
+      responses.push({
+        id: responseIds[m][r],
+        user_id: userId,
+        username: members.username[m],
+        rehearsal_id: rehearsal.id,
+        rehearsal_date: rehearsal.date,
+        attending: state !== 'N',
+        comment: commentMap[`${m}:${r}`] || null,
+        implicit: state === 'y'
+      });
+    });
+  });
+  
+  return { rehearsals, responses };
+};
+
+// Live band updates over server-sent events; returns a function that closes the stream.
+// EventSource can't send headers, so the token goes in the query string.
+export const subscribeToBandEvents = (bandId, onEvent) => {
+  const token = getToken();
+  const source = new EventSource(
+    `${API_URL}/bands/${bandId}/events?token=${encodeURIComponent(token || '')}`,
+    { withCredentials: true }
+  );
+  
+  ['response', 'rehearsals', 'members', 'resync'].forEach(type => {
+    source.addEventListener(type, (event) => {
+      onEvent(type, event.data ? JSON.parse(event.data) : {});
+    });
+  });
+  
+  return () => source.close();
+};